@@ -0,0 +1,185 @@
+"""
+Address parser micro-benchmark.
+
+Times utils.parse_address / utils.parse_addresses against the previous
+regex-cascade implementation (kept below as legacy_parse_address) on a
+generated corpus of addresses in the formats Elfsight and HCP produce, and
+reports how many results differ. Only the "Street Suffix City ST Zip" split
+is an intended difference; the addresses in EQUIVALENCE_CASES must parse as
+before, and the script exits 1 if any of them doesn't.
+
+Usage:
+    python benchmarks/bench_address_parsing.py --size 200000 --unique 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Optional, Dict, List, Any
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import utils  # noqa: E402
+from mock_hcp_server import make_customer  # noqa: E402
+
+
+def legacy_parse_address(address_string: str) -> Dict[str, Optional[str]]:
+    """parse_address as it was before the compiled/memoized parser"""
+    result: Dict[str, Optional[str]] = {"street": None, "city": None, "state": None, "zip": None}
+
+    if not address_string:
+        return result
+
+    address_string = address_string.strip()
+
+    pattern1 = r'^(.+?),\s*(.+?),\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$'
+    match = re.match(pattern1, address_string)
+    if match:
+        result["street"] = match.group(1).strip()
+        result["city"] = match.group(2).strip()
+        result["state"] = match.group(3).strip()
+        result["zip"] = match.group(4).strip()
+        return result
+
+    pattern2 = r'^(.+?),\s*(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$'
+    match = re.match(pattern2, address_string)
+    if match:
+        result["street"] = match.group(1).strip()
+        result["city"] = match.group(2).strip()
+        result["state"] = match.group(3).strip()
+        result["zip"] = match.group(4).strip()
+        return result
+
+    zip_match = re.search(r'\b(\d{5}(?:-\d{4})?)\b', address_string)
+    if zip_match:
+        result["zip"] = zip_match.group(1)
+        before_zip = address_string[:zip_match.start()].strip()
+
+        state_match = re.search(r'\b([A-Z]{2})\s*$', before_zip)
+        if state_match:
+            result["state"] = state_match.group(1)
+            before_state = before_zip[:state_match.start()].strip()
+
+            parts = [p.strip() for p in before_state.split(',')]
+            if len(parts) >= 2:
+                result["street"] = parts[0]
+                result["city"] = parts[1]
+            elif len(parts) == 1:
+                result["street"] = parts[0]
+
+    if not any(result.values()):
+        result["street"] = address_string
+
+    return result
+
+
+FORMATS = [
+    "{street}, {city}, {state} {zip}",
+    "{street}, {city} {state} {zip}",
+    "{street},{city},{state} {zip}",
+    "{street}, {city}, {state} {zip}-1234",
+    "{street} {city} {state} {zip}",
+    "{street}, {city}",
+    "{street}",
+    "{street}, Apt 3, {city}, {state} {zip}",
+]
+
+# Addresses without a city whose street name contains a suffix word; the
+# parser must keep them whole in street, as the legacy parser did
+EQUIVALENCE_CASES = [
+    "100 Court St CA 94102",
+    "10 Circle Dr CA 94102",
+    "7 Plaza Blvd CA 90001",
+    "12 St James Pl CA 94102",
+    "500 Park Ave S New York NY 10022",
+    "123 Main St Apt 4 CA 94102",
+]
+
+
+def make_corpus(size: int, unique: int, seed: int) -> List[str]:
+    """Build `size` address strings drawn from `unique` distinct addresses"""
+    rng = random.Random(seed)
+    distinct = []
+    for index in range(unique):
+        address = make_customer(index)["addresses"][0]
+        distinct.append(rng.choice(FORMATS).format(**address))
+    return [rng.choice(distinct) for _ in range(size)]
+
+
+def timed(func, corpus: List[str]) -> float:
+    """Seconds to parse the corpus one address at a time"""
+    started = time.perf_counter()
+    for address in corpus:
+        func(address)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark address parsing")
+    parser.add_argument("--size", type=int, default=200000, help="Addresses parsed per run (default: 200000)")
+    parser.add_argument("--unique", type=int, default=20000, help="Distinct addresses in the corpus (default: 20000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.size, args.unique, args.seed)
+    distinct = list(dict.fromkeys(corpus))
+
+    legacy_seconds = timed(legacy_parse_address, corpus)
+
+    utils._parse_address_cached.cache_clear()
+    uncached_seconds = timed(utils._parse_address_cached.__wrapped__, [a.strip() for a in corpus])
+
+    utils._parse_address_cached.cache_clear()
+    cached_seconds = timed(utils.parse_address, corpus)
+
+    utils._parse_address_cached.cache_clear()
+    started = time.perf_counter()
+    utils.parse_addresses(corpus)
+    batch_seconds = time.perf_counter() - started
+
+    differences: List[Dict[str, Any]] = []
+    for address in distinct:
+        old, new = legacy_parse_address(address), utils.parse_address(address)
+        if old != new:
+            differences.append({"address": address, "legacy": old, "current": new})
+
+    equivalence_failures = [
+        {"address": address, "legacy": legacy_parse_address(address), "current": utils.parse_address(address)}
+        for address in EQUIVALENCE_CASES
+        if legacy_parse_address(address) != utils.parse_address(address)
+    ]
+
+    def rate(seconds: float) -> float:
+        return round(len(corpus) / seconds) if seconds > 0 else 0.0
+
+    print(json.dumps({
+        "corpus_size": len(corpus),
+        "distinct_addresses": len(distinct),
+        "cache_size": utils.ADDRESS_CACHE_SIZE,
+        "addresses_per_second": {
+            "legacy": rate(legacy_seconds),
+            "parse_address_uncached": rate(uncached_seconds),
+            "parse_address": rate(cached_seconds),
+            "parse_addresses": rate(batch_seconds)
+        },
+        "speedup_vs_legacy": {
+            "parse_address_uncached": round(legacy_seconds / uncached_seconds, 2),
+            "parse_address": round(legacy_seconds / cached_seconds, 2),
+            "parse_addresses": round(legacy_seconds / batch_seconds, 2)
+        },
+        "differences": len(differences),
+        "difference_examples": differences[:5],
+        "equivalence_failures": equivalence_failures
+    }, indent=2))
+    return 1 if equivalence_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Name matching micro-benchmark and ranking comparison.
+
+Builds queries by perturbing a known customer's name (typos, dropped or
+swapped letters, reordered words, punctuation) and ranks that customer
+among random decoys with both the previous SequenceMatcher scoring and
+name_matching.score_candidates. Reports top-1 accuracy of each, how often
+they pick the same candidate, and time per candidate.
+
+Usage:
+    python benchmarks/bench_name_matching.py --queries 5000 --candidates 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import name_matching  # noqa: E402
+from mock_hcp_server import FIRST_NAMES, LAST_NAMES  # noqa: E402
+
+
+def legacy_name_similarity(name: str, candidate: Dict[str, Any]) -> float:
+    """Name similarity as CustomerMatcher computed it before name_matching"""
+    candidate_name = f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}".strip()
+    if not candidate_name:
+        return 0.0
+    return SequenceMatcher(None, name.lower(), candidate_name.lower()).ratio()
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    """Apply one realistic form-entry error to a name"""
+    kind = rng.choice(["typo", "drop", "swap", "reorder", "case", "punct", "exact"])
+    chars = list(name)
+    position = rng.randrange(1, len(chars) - 1)
+
+    if kind == "typo":
+        chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    elif kind == "drop":
+        del chars[position]
+    elif kind == "swap":
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    elif kind == "reorder":
+        return " ".join(reversed(name.split()))
+    elif kind == "case":
+        return name.upper()
+    elif kind == "punct":
+        return name.replace(" ", ", ", 1) + "."
+    return "".join(chars)
+
+
+def make_corpus(queries: int, candidates: int, seed: int) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Build (query, candidates) pairs; the true customer is always candidates[0]"""
+    rng = random.Random(seed)
+
+    def customer() -> Dict[str, Any]:
+        return {"first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES)}
+
+    corpus = []
+    for _ in range(queries):
+        group = [customer() for _ in range(candidates)]
+        truth = group[0]
+        corpus.append((perturb(f"{truth['first_name']} {truth['last_name']}", rng), group))
+    return corpus
+
+
+def top_index(scores: List[Any]) -> int:
+    """Index of the best score (first on ties, None counts as 0)"""
+    values = [score or 0.0 for score in scores]
+    return max(range(len(values)), key=values.__getitem__)
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark name matching")
+    parser.add_argument("--queries", type=int, default=5000, help="Queries to rank (default: 5000)")
+    parser.add_argument("--candidates", type=int, default=8, help="Candidates per query (default: 8)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.queries, args.candidates, args.seed)
+    comparisons = args.queries * args.candidates
+
+    started = time.perf_counter()
+    legacy_top = [top_index([legacy_name_similarity(q, c) for c in group]) for q, group in corpus]
+    legacy_seconds = time.perf_counter() - started
+
+    name_matching._pair_similarity.cache_clear()
+    name_matching._candidate_name.cache_clear()
+    name_matching.normalize_name.cache_clear()
+    started = time.perf_counter()
+    current_top = [top_index(name_matching.score_candidates(q, group)) for q, group in corpus]
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for q, group in corpus:
+        name_matching.score_candidates(q, group)
+    warm_seconds = time.perf_counter() - started
+
+    def accuracy(tops: List[int]) -> float:
+        # Decoys can share the true customer's name; count those as correct
+        hits = sum(
+            1 for top, (_, group) in zip(tops, corpus)
+            if group[top]["first_name"] == group[0]["first_name"] and group[top]["last_name"] == group[0]["last_name"]
+        )
+        return round(hits / len(corpus), 4)
+
+    print(json.dumps({
+        "queries": args.queries,
+        "candidates_per_query": args.candidates,
+        "top1_accuracy": {
+            "legacy": accuracy(legacy_top),
+            "current": accuracy(current_top)
+        },
+        "top1_agreement": round(sum(1 for a, b in zip(legacy_top, current_top) if a == b) / len(corpus), 4),
+        "microseconds_per_candidate": {
+            "legacy": round(legacy_seconds / comparisons * 1e6, 2),
+            "current_cold_cache": round(cold_seconds / comparisons * 1e6, 2),
+            "current_warm_cache": round(warm_seconds / comparisons * 1e6, 2)
+        }
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
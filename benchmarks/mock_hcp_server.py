@@ -0,0 +1,394 @@
+"""
+Local stand-in for the Housecall Pro API.
+
+Implements the endpoints used by hcp_client.py (/customers,
+/customers/{id}/addresses, /leads, /jobs and their notes/line items)
+against an in-memory customer base, with configurable latency and 429
+injection. Every request is counted so a benchmark can report HCP calls
+per lead.
+
+Usage:
+    python benchmarks/mock_hcp_server.py --port 8081 --customers 5000 --latency-ms 120
+    HCP_BASE_URL=http://localhost:8081 python main.py
+
+Counters are available at GET /_mock/stats and reset with POST /_mock/reset.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, List, Any, Tuple
+from urllib.parse import urlparse, parse_qs
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+    "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "Chen"
+]
+STREET_NAMES = [
+    "Main", "Market", "Mission", "Valencia", "Castro", "Haight", "Divisadero", "Fillmore",
+    "Geary", "Clement", "Irving", "Judah", "Noriega", "Taraval", "Ocean", "Folsom"
+]
+STREET_SUFFIXES = ["St", "Ave", "Blvd", "Way", "Ct"]
+CITIES = [("San Francisco", "94110"), ("Daly City", "94015"), ("Oakland", "94611"), ("San Mateo", "94401")]
+
+
+def make_customer(index: int) -> Dict[str, Any]:
+    """
+    Build the deterministic customer at position index of the mock customer base.
+
+    The benchmark uses the same function to generate submissions from
+    existing customers.
+    """
+    rng = random.Random(index)
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    city, zip_code = rng.choice(CITIES)
+    return {
+        "id": f"cus_{index:08d}",
+        "first_name": first,
+        "last_name": last,
+        "email": f"{first.lower()}.{last.lower()}{index}@example.com",
+        "mobile_number": f"+1415{2000000 + index:07d}",
+        "addresses": [{
+            "id": f"adr_{index:08d}_0",
+            "type": "service",
+            "street": f"{rng.randint(1, 4999)} {rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES)}",
+            "city": city,
+            "state": "CA",
+            "zip": zip_code,
+            "country": "US"
+        }],
+        "updated_at": "2024-01-01T00:00:00Z"
+    }
+
+
+class MockHCPState:
+    """In-memory customer base and request counters"""
+
+    def __init__(
+        self,
+        num_customers: int = 1000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0
+    ):
+        """
+        Initialize mock state.
+
+        Args:
+            num_customers: Size of the pre-populated customer base
+            latency_ms: Base latency added to every request
+            jitter_ms: Random extra latency (uniform 0..jitter_ms)
+            rate_limit_ratio: Fraction of requests answered with 429
+            retry_after: Retry-After header value (seconds) sent with a 429
+            seed: Seed for latency jitter and 429 injection
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+
+        self.customers: Dict[str, Dict[str, Any]] = {}
+        self._by_phone_digits: Dict[str, List[str]] = {}
+        self._by_email: Dict[str, List[str]] = {}
+        for index in range(num_customers):
+            self._add_customer(make_customer(index))
+
+    def _add_customer(self, customer: Dict[str, Any]) -> None:
+        """Store a customer and index it for search (caller holds the lock or is __init__)"""
+        self.customers[customer["id"]] = customer
+        if customer.get("mobile_number"):
+            digits = re.sub(r"\D", "", customer["mobile_number"])[-10:]
+            self._by_phone_digits.setdefault(digits, []).append(customer["id"])
+        if customer.get("email"):
+            self._by_email.setdefault(customer["email"].lower(), []).append(customer["id"])
+
+    def record(self, method: str, route: str) -> bool:
+        """
+        Count a request and decide whether to reject it with a 429.
+
+        Returns:
+            True if the request should be rate limited
+        """
+        with self._lock:
+            self.calls[f"{method} {route}"] += 1
+            limited = self.rate_limit_ratio > 0 and self._rng.random() < self.rate_limit_ratio
+            if limited:
+                self.rate_limited += 1
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return limited
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of request counters"""
+        with self._lock:
+            return {
+                "total_calls": sum(self.calls.values()),
+                "calls": dict(self.calls),
+                "rate_limited": self.rate_limited,
+                "customers": len(self.customers)
+            }
+
+    def reset(self) -> None:
+        """Zero request counters (the customer base is kept)"""
+        with self._lock:
+            self.calls.clear()
+            self.rate_limited = 0
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search customers by phone, email or name"""
+        query = query.strip().lower()
+        with self._lock:
+            if "@" in query:
+                ids = self._by_email.get(query, [])
+            else:
+                digits = re.sub(r"\D", "", query)
+                if len(digits) >= 10:
+                    ids = self._by_phone_digits.get(digits[-10:], [])
+                else:
+                    ids = [
+                        c["id"] for c in self.customers.values()
+                        if query in f"{c['first_name']} {c['last_name']}".lower()
+                    ][:25]
+            return [self.customers[i] for i in ids]
+
+    def list_page(self, page: int, page_size: int) -> Dict[str, Any]:
+        """One page of customers in insertion order"""
+        with self._lock:
+            customers = list(self.customers.values())
+        total_pages = max(1, (len(customers) + page_size - 1) // page_size)
+        start = (page - 1) * page_size
+        return {
+            "customers": customers[start:start + page_size],
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "total_items": len(customers)
+        }
+
+    def create_customer(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a customer from a POST /customers body"""
+        customer = dict(data)
+        customer["id"] = f"cus_{uuid.uuid4().hex[:16]}"
+        customer.setdefault("addresses", [])
+        for address in customer["addresses"]:
+            address.setdefault("id", f"adr_{uuid.uuid4().hex[:16]}")
+        with self._lock:
+            self._add_customer(customer)
+        return customer
+
+    def add_address(self, customer_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add an address to a customer"""
+        with self._lock:
+            customer = self.customers.get(customer_id)
+            if customer is None:
+                return None
+            address = dict(data)
+            address["id"] = f"adr_{uuid.uuid4().hex[:16]}"
+            customer.setdefault("addresses", []).append(address)
+            return address
+
+
+# (method, pattern, route label) - the label groups counters by endpoint template
+ROUTES: List[Tuple[str, "re.Pattern[str]", str]] = [
+    ("GET", re.compile(r"^/customers$"), "/customers"),
+    ("POST", re.compile(r"^/customers$"), "/customers"),
+    ("GET", re.compile(r"^/customers/(?P<cid>[^/]+)$"), "/customers/{id}"),
+    ("PUT", re.compile(r"^/customers/(?P<cid>[^/]+)$"), "/customers/{id}"),
+    ("GET", re.compile(r"^/customers/(?P<cid>[^/]+)/addresses$"), "/customers/{id}/addresses"),
+    ("POST", re.compile(r"^/customers/(?P<cid>[^/]+)/addresses$"), "/customers/{id}/addresses"),
+    ("GET", re.compile(r"^/customers/(?P<cid>[^/]+)/addresses/(?P<aid>[^/]+)$"), "/customers/{id}/addresses/{id}"),
+    ("POST", re.compile(r"^/leads$"), "/leads"),
+    ("POST", re.compile(r"^/leads/(?P<lid>[^/]+)/line_items$"), "/leads/{id}/line_items"),
+    ("POST", re.compile(r"^/leads/(?P<lid>[^/]+)/notes$"), "/leads/{id}/notes"),
+    ("POST", re.compile(r"^/jobs$"), "/jobs"),
+    ("GET", re.compile(r"^/jobs/(?P<jid>[^/]+)$"), "/jobs/{id}"),
+    ("POST", re.compile(r"^/jobs/(?P<jid>[^/]+)/notes$"), "/jobs/{id}/notes"),
+]
+
+
+class MockHCPHandler(BaseHTTPRequestHandler):
+    """Request handler dispatching to MockHCPState"""
+
+    state: MockHCPState  # set on the server-specific subclass
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging"""
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a JSON response"""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method: str) -> None:
+        """Route a request"""
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+
+        if url.path == "/_mock/stats" and method == "GET":
+            return self._send(200, self.state.stats())
+        if url.path == "/_mock/reset" and method == "POST":
+            self.state.reset()
+            return self._send(200, {"reset": True})
+
+        for route_method, pattern, label in ROUTES:
+            match = pattern.match(url.path)
+            if route_method == method and match:
+                break
+        else:
+            return self._send(404, {"error": "Not found"})
+
+        if self.state.record(method, label):
+            return self._send(429, {"error": "Too Many Requests"}, {"Retry-After": str(self.state.retry_after)})
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, response = self._handle(method, label, match.groupdict(), params, body)
+        self._send(status, response)
+
+    def _handle(
+        self,
+        method: str,
+        route: str,
+        path_args: Dict[str, str],
+        params: Dict[str, str],
+        body: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        """Produce (status, body) for a routed request"""
+        state = self.state
+        cid = path_args.get("cid")
+
+        if route == "/customers":
+            if method == "POST":
+                return 201, state.create_customer(body)
+            if "q" in params:
+                return 200, {"customers": state.search(params["q"])}
+            return 200, state.list_page(int(params.get("page", 1)), int(params.get("page_size", 10)))
+
+        if route == "/customers/{id}":
+            customer = state.customers.get(cid)
+            if customer is None:
+                return 404, {"error": "Customer not found"}
+            if method == "PUT":
+                customer.update(body)
+                return 200, {"customer": customer}
+            return 200, customer
+
+        if route == "/customers/{id}/addresses":
+            customer = state.customers.get(cid)
+            if customer is None:
+                return 404, {"error": "Customer not found"}
+            if method == "POST":
+                return 201, {"address": state.add_address(cid, body)}
+            return 200, {"addresses": customer.get("addresses", [])}
+
+        if route == "/customers/{id}/addresses/{id}":
+            customer = state.customers.get(cid) or {}
+            for address in customer.get("addresses", []):
+                if address["id"] == path_args["aid"]:
+                    return 200, address
+            return 404, {"error": "Address not found"}
+
+        if route in ("/leads", "/jobs"):
+            prefix = "lead" if route == "/leads" else "job"
+            return 201, dict(body, id=f"{prefix}_{uuid.uuid4().hex[:16]}")
+
+        if route == "/leads/{id}/line_items":
+            return 201, {"line_items": body.get("line_items", [])}
+
+        if route in ("/leads/{id}/notes", "/jobs/{id}/notes"):
+            return 201, {"note": {"id": f"note_{uuid.uuid4().hex[:16]}", "content": body.get("note")}}
+
+        if route == "/jobs/{id}":
+            return 200, {"id": path_args["jid"]}
+
+        return 404, {"error": "Not found"}
+
+
+def start_mock_server(state: MockHCPState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start the mock API on a background thread.
+
+    Args:
+        state: Mock state to serve
+        host: Bind address
+        port: Port (0 picks a free port)
+
+    Returns:
+        The running server; its URL is http://host:server.server_port
+    """
+    handler = type("BoundMockHCPHandler", (MockHCPHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="mock-hcp", daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local Housecall Pro API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--customers", type=int, default=1000, help="Pre-populated customers (default: 1000)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency (0..jitter)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429")
+    args = parser.parse_args()
+
+    state = MockHCPState(
+        num_customers=args.customers,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after
+    )
+    server = start_mock_server(state, args.host, args.port)
+    print(f"Mock HCP API listening on http://{args.host}:{server.server_port} ({args.customers} customers)")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
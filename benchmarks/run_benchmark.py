@@ -0,0 +1,298 @@
+"""
+End-to-end webhook benchmark against the local HCP mock.
+
+Starts benchmarks/mock_hcp_server.py and the Flask app in-process, points
+the app at the mock, drives /webhook with generated Elfsight payloads and
+reports latency percentiles, throughput, HCP calls per lead and peak RSS
+as JSON.
+
+Usage:
+    python benchmarks/run_benchmark.py --requests 200 --concurrency 8 --latency-ms 100
+    python benchmarks/run_benchmark.py --output results.json
+    python benchmarks/run_benchmark.py --baseline results.json   # exit 1 on regression
+
+The app's own rate limiter is disabled unless --keep-rate-limits is given,
+so the numbers reflect the service rather than the configured HCP budget.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from mock_hcp_server import MockHCPState, start_mock_server, make_customer, FIRST_NAMES, LAST_NAMES, STREET_NAMES, CITIES  # noqa: E402
+
+SERVICES = ["Water Heater", "Drain Cleaning", "Leak Repair", "Toilet Repair", "Sewer Line"]
+SERVICE_DETAILS = ["Tank water heater", "Tankless water heater", "Kitchen sink", "Main line", "Shower valve"]
+
+# Regressions beyond these ratios fail a --baseline comparison
+LOWER_IS_BETTER = ("latency_ms.p50", "latency_ms.p95", "latency_ms.p99", "hcp_calls_per_lead", "peak_rss_mb")
+HIGHER_IS_BETTER = ("leads_per_second",)
+
+
+def make_payload(rng: random.Random, index: int, num_customers: int, existing_ratio: float) -> List[Dict[str, Any]]:
+    """
+    Build one Elfsight webhook payload.
+
+    A share of submissions (existing_ratio) come from customers already in
+    the mock customer base, the rest are new.
+    """
+    if num_customers and rng.random() < existing_ratio:
+        customer = make_customer(rng.randrange(num_customers))
+        first, last = customer["first_name"], customer["last_name"]
+        email, phone = customer["email"], customer["mobile_number"][2:]
+        address = customer["addresses"][0]
+        street, city, zip_code = address["street"], address["city"], address["zip"]
+        customer_type = "Existing Customer"
+    else:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}.new{index}@example.org"
+        phone = f"650{rng.randint(2000000, 9999999)}"
+        city, zip_code = rng.choice(CITIES)
+        street = f"{rng.randint(1, 4999)} {rng.choice(STREET_NAMES)} St"
+        customer_type = "New Customer"
+
+    fields = [
+        ("First Name", first, "short_text"),
+        ("Last Name", last, "short_text"),
+        ("Email Address", email, "email"),
+        ("Phone Number", f"({phone[:3]}) {phone[3:6]}-{phone[6:]}", "phone"),
+        ("Street Address", street, "short_text"),
+        ("City", city, "short_text"),
+        ("State", "CA", "short_text"),
+        ("Postal Code", zip_code, "short_text"),
+        ("Are you a new or existing customer?", customer_type, "choice"),
+        ("Preferred Method of Contact", rng.choice(["Phone", "Email", "Text"]), "choice"),
+        ("SMS Consent", rng.choice(["true", "false"]), "checkbox"),
+        ("Service Needed", rng.choice(SERVICES), "choice"),
+        ("Service Details", ", ".join(rng.sample(SERVICE_DETAILS, 2)), "multiple_choice"),
+        ("Service Request Details", "Water is leaking under the kitchen sink since this morning.", "textarea"),
+    ]
+    return [
+        {"id": f"field{n}", "name": name, "value": value, "type": field_type}
+        for n, (name, value, field_type) in enumerate(fields, start=1)
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (mock server and app included)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit, if available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one benchmark and return the results dictionary"""
+    state = MockHCPState(
+        num_customers=args.customers,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    mock = start_mock_server(state)
+
+    # Config is read at import time, so the environment must be set first
+    os.environ["HCP_BASE_URL"] = f"http://127.0.0.1:{mock.server_port}"
+    os.environ.setdefault("HCP_API_KEY", "benchmark")
+    # Service logs go to stdout; keep them out of the JSON report
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ["WEBHOOK_ASYNC_MODE"] = "false"
+    # Measure inline processing only (no spilling to the submission queue)
+    os.environ["HCP_BREAKER_SPILL_ENABLED"] = "false"
+    os.environ["PIPELINE_CHECKPOINTS_ENABLED"] = "false"
+    if not args.keep_rate_limits:
+        os.environ["HCP_READ_RATE"] = "0"
+        os.environ["HCP_WRITE_RATE"] = "0"
+
+    import requests
+    from werkzeug.serving import make_server
+    from main import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app_server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=app_server.serve_forever, name="webhook-app", daemon=True).start()
+    webhook_url = f"http://127.0.0.1:{app_server.server_port}/webhook"
+
+    rng = random.Random(args.seed)
+    payloads = [
+        make_payload(rng, index, args.customers, args.existing_ratio)
+        for index in range(args.warmup + args.requests)
+    ]
+
+    local = threading.local()
+
+    def send(payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        response = session.post(webhook_url, json=payload, timeout=300)
+        return {"latency": time.perf_counter() - started, "status": response.status_code}
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, payloads[:args.warmup]))
+        state.reset()
+
+        started = time.perf_counter()
+        samples = list(executor.map(send, payloads[args.warmup:]))
+        elapsed = time.perf_counter() - started
+
+    mock_stats = state.stats()
+    app_server.shutdown()
+    mock.shutdown()
+
+    latencies_ms = [s["latency"] * 1000 for s in samples]
+    succeeded = sum(1 for s in samples if s["status"] == 200)
+    status_counts: Dict[str, int] = {}
+    for s in samples:
+        status_counts[str(s["status"])] = status_counts.get(str(s["status"]), 0) + 1
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "customers": args.customers,
+            "existing_ratio": args.existing_ratio,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "rate_limit_ratio": args.rate_limit_ratio,
+            "retry_after": args.retry_after,
+            "keep_rate_limits": args.keep_rate_limits,
+            "seed": args.seed
+        },
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p95": round(percentile(latencies_ms, 95), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "mean": round(statistics.fmean(latencies_ms), 2) if latencies_ms else 0.0,
+            "max": round(max(latencies_ms), 2) if latencies_ms else 0.0
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "leads_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+        "succeeded": succeeded,
+        "failed": len(samples) - succeeded,
+        "status_codes": status_counts,
+        "hcp_calls": mock_stats["total_calls"],
+        "hcp_calls_per_lead": round(mock_stats["total_calls"] / succeeded, 2) if succeeded else None,
+        "hcp_calls_by_endpoint": mock_stats["calls"],
+        "hcp_rate_limited": mock_stats["rate_limited"],
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def _lookup(results: Dict[str, Any], dotted: str) -> Optional[float]:
+    """Read a nested metric by dotted path"""
+    value: Any = results
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare results against a baseline run.
+
+    Returns:
+        Descriptions of metrics that regressed by more than tolerance
+    """
+    regressions = []
+    for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+        current, previous = _lookup(results, metric), _lookup(baseline, metric)
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        worse = change > tolerance if metric in LOWER_IS_BETTER else change < -tolerance
+        if worse:
+            regressions.append(f"{metric}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark /webhook against a local HCP mock")
+    parser.add_argument("--requests", type=int, default=200, help="Measured webhook requests (default: 200)")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests sent first (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent webhook clients (default: 8)")
+    parser.add_argument("--customers", type=int, default=5000, help="Mock customer base size (default: 5000)")
+    parser.add_argument("--existing-ratio", type=float, default=0.5,
+                        help="Share of submissions from existing customers (default: 0.5)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mock HCP latency per call (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Mock HCP latency jitter (default: 20)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0,
+                        help="Fraction of HCP calls answered with 429 (default: 0)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Keep the configured HCP_*_RATE limits instead of disabling them")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression against --baseline (default: 0.10)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    output = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
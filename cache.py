@@ -0,0 +1,127 @@
+"""
+Read-through cache for HCP API responses.
+
+Entries expire after a per-entry TTL and the cache holds at most a fixed
+number of entries, evicting the least recently used first. Keys are tuples
+whose first element is a namespace (e.g. ("search", query)), so writes can
+invalidate a whole namespace at once. Hits, misses, evictions and
+expirations are counted per namespace in hcp_cache_events_total.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from metrics import observe_cache_event
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry time-to-live"""
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 60.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+            default_ttl: TTL in seconds for entries set without one
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached value, or None on miss or expiry
+        """
+        namespace = _namespace(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                observe_cache_event(namespace, "miss")
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                observe_cache_event(namespace, "expiration")
+                observe_cache_event(namespace, "miss")
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            observe_cache_event(namespace, "hit")
+
+        # Callers get their own copy so they can't mutate the cached value
+        return copy.deepcopy(value)
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache (a copy is stored)
+            ttl: Seconds until expiry (defaults to default_ttl; 0 or less skips caching)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                observe_cache_event(_namespace(evicted), "eviction")
+
+    def invalidate(self, key: Tuple[Hashable, ...]) -> None:
+        """Remove one entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_namespace(self, namespace: Hashable) -> None:
+        """Remove every entry whose key starts with namespace"""
+        with self._lock:
+            for key in [k for k in self._entries if k and k[0] == namespace]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get this cache's statistics (all caches are exported on /metrics)"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+def _namespace(key: Tuple[Hashable, ...]) -> str:
+    """Metric label for a cache key's namespace"""
+    return str(key[0]) if key else ""
@@ -0,0 +1,114 @@
+"""
+Persisted lead pipeline checkpoints.
+
+LeadCreator runs each submission through a fixed sequence of stages and
+saves the accumulated state here after every stage, keyed by the
+submission's idempotency key. If a stage fails (or the process dies), the
+next attempt at the same submission loads the state and resumes at that
+stage, so customers, addresses and searches from earlier stages are not
+repeated. Checkpoints are deleted when the lead is created and expire after
+PIPELINE_CHECKPOINT_TTL.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """SQLite-backed pipeline state per submission"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Initialize checkpoint store.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to Config.PIPELINE_CHECKPOINT_DB_PATH)
+            ttl: Seconds a checkpoint is kept (defaults to Config.PIPELINE_CHECKPOINT_TTL)
+        """
+        self.db_path = db_path or Config.PIPELINE_CHECKPOINT_DB_PATH
+        self.ttl = ttl if ttl is not None else Config.PIPELINE_CHECKPOINT_TTL
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's database connection (one per thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        """Create the checkpoints table and drop expired checkpoints"""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.purge_expired()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the saved state of a submission.
+
+        Args:
+            key: Idempotency key of the submission
+
+        Returns:
+            State dictionary, or None if there is no (unexpired) checkpoint
+        """
+        row = self._connect().execute(
+            "SELECT state FROM checkpoints WHERE key = ? AND updated_at >= ?",
+            (key, time.time() - self.ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key: str, stage: str, state: Dict[str, Any]) -> None:
+        """
+        Save the state after a completed stage.
+
+        Args:
+            key: Idempotency key of the submission
+            stage: Stage just completed
+            state: Accumulated pipeline state (JSON-serializable)
+        """
+        self._connect().execute(
+            "INSERT INTO checkpoints (key, stage, state, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET stage = excluded.stage, state = excluded.state, "
+            "updated_at = excluded.updated_at",
+            (key, stage, json.dumps(state), time.time())
+        )
+
+    def delete(self, key: str) -> None:
+        """Drop the checkpoint of a finished submission"""
+        self._connect().execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """
+        Drop checkpoints older than the TTL.
+
+        Returns:
+            Number of checkpoints dropped
+        """
+        cursor = self._connect().execute(
+            "DELETE FROM checkpoints WHERE updated_at < ?",
+            (time.time() - self.ttl,)
+        )
+        if cursor.rowcount:
+            logger.info("Dropped %s expired pipeline checkpoints", cursor.rowcount)
+        return cursor.rowcount
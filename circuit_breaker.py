@@ -0,0 +1,224 @@
+"""
+Circuit breakers for HCP API endpoint groups.
+
+Each group of endpoints ("customers", "leads", ...) has a breaker. After
+HCP_BREAKER_FAILURE_THRESHOLD consecutive failed attempts (timeouts,
+connection errors, 408/425/429/5xx) the breaker opens and requests to that
+group fail immediately with CircuitOpenError instead of running the retry
+schedule. After HCP_BREAKER_RECOVERY_TIMEOUT seconds it lets a few probe
+requests through (half-open); a success closes it, a failure opens it again.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from config import Config
+from metrics import observe_circuit_state
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState:
+    """States of a circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker for one endpoint group"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None,
+        half_open_max_calls: Optional[int] = None
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Endpoint group name (used in logs, errors and metrics)
+            failure_threshold: Consecutive failures that open the circuit, 0 to never open
+                (defaults to Config.HCP_BREAKER_FAILURE_THRESHOLD)
+            recovery_timeout: Seconds the circuit stays open before probing
+                (defaults to Config.HCP_BREAKER_RECOVERY_TIMEOUT)
+            half_open_max_calls: Probe requests allowed at once while half-open
+                (defaults to Config.HCP_BREAKER_HALF_OPEN_MAX_CALLS)
+        """
+        self.name = name
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else Config.HCP_BREAKER_FAILURE_THRESHOLD
+        )
+        self.recovery_timeout = (
+            recovery_timeout if recovery_timeout is not None else Config.HCP_BREAKER_RECOVERY_TIMEOUT
+        )
+        self.half_open_max_calls = (
+            half_open_max_calls if half_open_max_calls is not None else Config.HCP_BREAKER_HALF_OPEN_MAX_CALLS
+        )
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        """Change state and log the transition (call with the lock held)"""
+        if state != self._state:
+            logger.warning("HCP circuit '%s': %s -> %s", self.name, self._state, state)
+            self._state = state
+            observe_circuit_state(self.name, state)
+
+    def _refresh(self, now: float) -> None:
+        """Move from open to half-open once the recovery timeout has passed (lock held)"""
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._set_state(CircuitState.HALF_OPEN)
+            self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """Current state (closed, open or half_open)"""
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent, taking a probe slot if half-open.
+
+        Every allowed request must be followed by record_success or record_failure.
+
+        Returns:
+            False if the circuit is open (or half-open with all probes in flight)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.HALF_OPEN:
+                # A probe that never reported back frees its slot after the timeout
+                if self._probes >= self.half_open_max_calls and now - self._probe_started >= self.recovery_timeout:
+                    self._probes = 0
+                if self._probes < self.half_open_max_calls:
+                    self._probes += 1
+                    self._probe_started = now
+                    return True
+
+            return False
+
+    def record_success(self) -> None:
+        """Record that HCP answered (closes a half-open circuit)"""
+        with self._lock:
+            self._failures = 0
+            if self._state != CircuitState.CLOSED:
+                self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed attempt (opens the circuit at the threshold, or from half-open)"""
+        if self.failure_threshold <= 0:
+            return
+
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._set_state(CircuitState.OPEN)
+
+    def retry_in(self) -> float:
+        """Seconds until the circuit lets a probe through (0 unless open)"""
+        with self._lock:
+            if self._state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State, consecutive failures and time until probing, for /health"""
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_in_seconds": round(self.retry_in(), 1)
+        }
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per HCP endpoint group, created on first use"""
+
+    def __init__(self, **breaker_options: Any):
+        """
+        Initialize registry.
+
+        Args:
+            **breaker_options: Passed to each CircuitBreaker (thresholds default to Config)
+        """
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def group_for(endpoint: str) -> str:
+        """
+        Get the endpoint group of an API path.
+
+        Example:
+            >>> CircuitBreakerRegistry.group_for("/customers/cus_123/addresses")
+            'customers'
+        """
+        return endpoint.strip("/").split("/", 1)[0] or "root"
+
+    def for_endpoint(self, endpoint: str) -> CircuitBreaker:
+        """Get the breaker governing an endpoint"""
+        group = self.group_for(endpoint)
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(group)
+                if breaker is None:
+                    breaker = CircuitBreaker(group, **self.breaker_options)
+                    self._breakers[group] = breaker
+        return breaker
+
+    def open_groups(self) -> List[str]:
+        """Names of groups whose circuit is open"""
+        return [name for name, breaker in list(self._breakers.items()) if breaker.state == CircuitState.OPEN]
+
+    def all_closed(self) -> bool:
+        """Whether every circuit is closed (none open or still probing)"""
+        return all(breaker.state == CircuitState.CLOSED for breaker in list(self._breakers.values()))
+
+    def retry_in(self) -> float:
+        """Seconds until every open circuit lets a probe through"""
+        return max((breaker.retry_in() for breaker in list(self._breakers.values())), default=0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every breaker used so far"""
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+
+_shared_breakers: Optional[CircuitBreakerRegistry] = None
+_shared_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """
+    Get the process-wide circuit breaker registry, creating it on first use.
+
+    Returns:
+        Shared CircuitBreakerRegistry instance
+    """
+    global _shared_breakers
+
+    if _shared_breakers is None:
+        with _shared_breakers_lock:
+            if _shared_breakers is None:
+                _shared_breakers = CircuitBreakerRegistry()
+    return _shared_breakers
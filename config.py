@@ -14,6 +14,9 @@ class Config:
     HCP_API_KEY: str = os.getenv("HCP_API_KEY", "")
     HCP_BASE_URL: str = os.getenv("HCP_BASE_URL", "https://api.housecallpro.com")
 
+    # Per-attempt request timeout
+    HCP_REQUEST_TIMEOUT: float = float(os.getenv("HCP_REQUEST_TIMEOUT", "30"))
+
     # Lead Source Configuration
     # NOTE: Lead source must exist in HCP before using.
     HCP_LEAD_SOURCE: str = os.getenv("HCP_LEAD_SOURCE", "Website")
@@ -29,17 +32,127 @@ class Config:
     DEFAULT_TIMEZONE: str = os.getenv("DEFAULT_TIMEZONE", "America/Los_Angeles")
     DEFAULT_STATE: str = os.getenv("DEFAULT_STATE", "CA")  # Default state for addresses
 
-    # Rate Limiting
-    API_RATE_LIMIT_DELAY: float = float(os.getenv("API_RATE_LIMIT_DELAY", "2.0"))
+    # Rate Limiting (token buckets shared across all request threads)
+    # Rates are requests per second; burst is how many requests may go out
+    # back-to-back after an idle period.
+    HCP_READ_RATE: float = float(os.getenv("HCP_READ_RATE", "2.0"))
+    HCP_READ_BURST: float = float(os.getenv("HCP_READ_BURST", "5"))
+    HCP_WRITE_RATE: float = float(os.getenv("HCP_WRITE_RATE", "1.0"))
+    HCP_WRITE_BURST: float = float(os.getenv("HCP_WRITE_BURST", "3"))
+    # Directory for rate-limit state shared by all worker processes on the
+    # host (required when running more than one gunicorn worker)
+    HCP_RATE_LIMIT_STATE_DIR: str = os.getenv("HCP_RATE_LIMIT_STATE_DIR", "")
+
+    # Retries (timeouts, 408/425/429 and 5xx only; other 4xx fail immediately)
+    # Backoff uses decorrelated jitter between the base and max delay (seconds).
+    # The deadline covers all attempts of one request; the budget allows
+    # retries at RATIO per request plus MIN_PER_SECOND, saving up to BURST.
+    HCP_RETRY_MAX_ATTEMPTS: int = int(os.getenv("HCP_RETRY_MAX_ATTEMPTS", "3"))
+    HCP_RETRY_BASE_DELAY: float = float(os.getenv("HCP_RETRY_BASE_DELAY", "0.5"))
+    HCP_RETRY_MAX_DELAY: float = float(os.getenv("HCP_RETRY_MAX_DELAY", "20"))
+    HCP_REQUEST_DEADLINE: float = float(os.getenv("HCP_REQUEST_DEADLINE", "60"))
+    HCP_RETRY_BUDGET_RATIO: float = float(os.getenv("HCP_RETRY_BUDGET_RATIO", "0.2"))
+    HCP_RETRY_BUDGET_MIN_PER_SECOND: float = float(os.getenv("HCP_RETRY_BUDGET_MIN_PER_SECOND", "1.0"))
+    HCP_RETRY_BUDGET_BURST: float = float(os.getenv("HCP_RETRY_BUDGET_BURST", "10"))
+
+    # Circuit Breakers (per endpoint group: customers, leads, ...)
+    # A group opens after FAILURE_THRESHOLD consecutive failed attempts (0
+    # disables), fails fast for RECOVERY_TIMEOUT seconds, then lets
+    # HALF_OPEN_MAX_CALLS probe requests through. While a circuit is open,
+    # new submissions are spilled to the submission queue (if SPILL_ENABLED)
+    # and processed once HCP recovers.
+    HCP_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("HCP_BREAKER_FAILURE_THRESHOLD", "5"))
+    HCP_BREAKER_RECOVERY_TIMEOUT: float = float(os.getenv("HCP_BREAKER_RECOVERY_TIMEOUT", "30"))
+    HCP_BREAKER_HALF_OPEN_MAX_CALLS: int = int(os.getenv("HCP_BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+    HCP_BREAKER_SPILL_ENABLED: bool = os.getenv("HCP_BREAKER_SPILL_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Read Cache (customer search, customer and address lookups)
+    HCP_CACHE_ENABLED: bool = os.getenv("HCP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    HCP_CACHE_MAX_SIZE: int = int(os.getenv("HCP_CACHE_MAX_SIZE", "1024"))
+    HCP_CACHE_TTL_SEARCH: float = float(os.getenv("HCP_CACHE_TTL_SEARCH", "60"))
+    HCP_CACHE_TTL_CUSTOMER: float = float(os.getenv("HCP_CACHE_TTL_CUSTOMER", "300"))
+    HCP_CACHE_TTL_ADDRESSES: float = float(os.getenv("HCP_CACHE_TTL_ADDRESSES", "300"))
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "json" (one object per line, for Cloud Logging) or "text"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+    # Write logs from a background thread through a queue of LOG_QUEUE_SIZE
+    # records (records are dropped, not waited for, when it is full)
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
     # Service Configuration
     PORT: int = int(os.getenv("PORT", "8080"))
 
+    # Startup
+    # The lead creator, HCP connections and caches are set up on a background
+    # thread as soon as the service starts (otherwise on the first request).
+    # HCP_WARMUP_CONNECTIONS keep-alive connections are opened ahead of the
+    # first submission; a warning is logged if startup takes longer than
+    # STARTUP_BUDGET_SECONDS.
+    STARTUP_WARMUP_ENABLED: bool = os.getenv("STARTUP_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    HCP_WARMUP_CONNECTIONS: int = int(os.getenv("HCP_WARMUP_CONNECTIONS", "2"))
+    STARTUP_BUDGET_SECONDS: float = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+    # Request Limits
+    # Bodies larger than WEBHOOK_MAX_BODY_BYTES are rejected with 413 while
+    # being read (before reading anything if Content-Length is larger);
+    # 0 disables the limit. Elfsight sends attachments as URLs, so real
+    # submissions are a few KB.
+    WEBHOOK_MAX_BODY_BYTES: int = int(os.getenv("WEBHOOK_MAX_BODY_BYTES", "1048576"))
+    WEBHOOK_MAX_FIELDS: int = int(os.getenv("WEBHOOK_MAX_FIELDS", "200"))
+
+    # Asynchronous Processing
+    # When enabled, /webhook queues submissions and returns 202 immediately;
+    # a background worker pool creates the leads.
+    WEBHOOK_ASYNC_MODE: bool = os.getenv("WEBHOOK_ASYNC_MODE", "false").lower() in ("1", "true", "yes")
+    QUEUE_DB_PATH: str = os.getenv("QUEUE_DB_PATH", "submissions.db")
+    QUEUE_WORKERS: int = int(os.getenv("QUEUE_WORKERS", "2"))
+    QUEUE_POLL_INTERVAL: float = float(os.getenv("QUEUE_POLL_INTERVAL", "1.0"))
+    QUEUE_PROCESSING_TIMEOUT: float = float(os.getenv("QUEUE_PROCESSING_TIMEOUT", "300"))
+
+    # Replay of Failed Submissions
+    # Submissions whose lead creation fails with a retryable error (inline or
+    # in the queue) are retried by the queue workers with exponential backoff
+    # between the base and max delay (seconds), up to QUEUE_MAX_ATTEMPTS
+    # attempts in total. Submissions HCP rejects (4xx) are not retried.
+    QUEUE_RETRY_FAILED: bool = os.getenv("QUEUE_RETRY_FAILED", "true").lower() in ("1", "true", "yes")
+    QUEUE_MAX_ATTEMPTS: int = int(os.getenv("QUEUE_MAX_ATTEMPTS", "6"))
+    QUEUE_RETRY_BASE_DELAY: float = float(os.getenv("QUEUE_RETRY_BASE_DELAY", "30"))
+    QUEUE_RETRY_MAX_DELAY: float = float(os.getenv("QUEUE_RETRY_MAX_DELAY", "3600"))
+
+    # Lead Pipeline Checkpoints
+    # The state after each lead pipeline stage is saved per submission, so a
+    # retry resumes at the failed stage. Checkpoints are dropped when the lead
+    # is created, or after PIPELINE_CHECKPOINT_TTL seconds.
+    PIPELINE_CHECKPOINTS_ENABLED: bool = os.getenv("PIPELINE_CHECKPOINTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    PIPELINE_CHECKPOINT_DB_PATH: str = os.getenv("PIPELINE_CHECKPOINT_DB_PATH", "checkpoints.db")
+    PIPELINE_CHECKPOINT_TTL: float = float(os.getenv("PIPELINE_CHECKPOINT_TTL", "86400"))
+
+    # Duplicate-Delivery Suppression
+    # Claims and results live in IDEMPOTENCY_DB_PATH, shared by all worker
+    # processes. A repeat waits up to IDEMPOTENCY_WAIT_TIMEOUT seconds for the
+    # first delivery, then gets 409; a claim not finished within
+    # IDEMPOTENCY_CLAIM_TTL seconds (its process died) may be taken over.
+    IDEMPOTENCY_ENABLED: bool = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() in ("1", "true", "yes")
+    IDEMPOTENCY_DB_PATH: str = os.getenv("IDEMPOTENCY_DB_PATH", "idempotency.db")
+    IDEMPOTENCY_WINDOW_SECONDS: float = float(os.getenv("IDEMPOTENCY_WINDOW_SECONDS", "900"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "120"))
+    IDEMPOTENCY_CLAIM_TTL: float = float(os.getenv("IDEMPOTENCY_CLAIM_TTL", "600"))
+
     # Customer Matching Configuration
     MATCH_CONFIDENCE_THRESHOLD: float = float(os.getenv("MATCH_CONFIDENCE_THRESHOLD", "0.8"))
+    # Threads available for running phone/email lookups in parallel
+    MATCH_LOOKUP_WORKERS: int = int(os.getenv("MATCH_LOOKUP_WORKERS", "4"))
+
+    # Local Customer Index (empty path disables the index)
+    CUSTOMER_INDEX_PATH: str = os.getenv("CUSTOMER_INDEX_PATH", "")
+    CUSTOMER_INDEX_SYNC_INTERVAL: float = float(os.getenv("CUSTOMER_INDEX_SYNC_INTERVAL", "900"))
+    # Full syncs also remove customers deleted or merged away in HCP (0 disables)
+    CUSTOMER_INDEX_FULL_SYNC_INTERVAL: float = float(os.getenv("CUSTOMER_INDEX_FULL_SYNC_INTERVAL", "86400"))
+    CUSTOMER_INDEX_PAGE_SIZE: int = int(os.getenv("CUSTOMER_INDEX_PAGE_SIZE", "100"))
 
     # Field Names (customizable based on Elfsight form)
     FORM_FIELD_NAME: str = os.getenv("FORM_FIELD_NAME", "name")
@@ -48,6 +161,8 @@ class Config:
     FORM_FIELD_ADDRESS: str = os.getenv("FORM_FIELD_ADDRESS", "address")
     FORM_FIELD_MESSAGE: str = os.getenv("FORM_FIELD_MESSAGE", "message")
     FORM_FIELD_CUSTOMER_TYPE: str = os.getenv("FORM_FIELD_CUSTOMER_TYPE", "customer_type")
+    # Optional JSON file with per-form field mappings (see form_mapping.py)
+    FORM_FIELD_MAPPING_FILE: str = os.getenv("FORM_FIELD_MAPPING_FILE", "")
 
     # Service Detail to HCP Service Name Mapping
     SERVICE_DETAIL_MAPPING: dict[str, str] = {
@@ -108,10 +223,3 @@ class Config:
         endpoint = endpoint.lstrip("/")
         return f"{base}/{endpoint}"
 
-
-# Validate configuration on import
-is_valid, error = Config.validate()
-if not is_valid:
-    import sys
-    print(f"Configuration error: {error}", file=sys.stderr)
-    # Don't exit in case we're running tests or in development
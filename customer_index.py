@@ -0,0 +1,517 @@
+"""
+Local customer index for zero-round-trip customer matching.
+
+Keeps a SQLite copy of HCP customers keyed by normalized phone number and
+lowercased email. The index is bulk-loaded by paging /customers and kept
+fresh with periodic incremental syncs; CustomerMatcher consults it before
+falling back to the HCP search API.
+
+The sync watermark only advances after a complete pass, so a failed page is
+fetched again by the next sync. Incremental syncs cannot see customers that
+were deleted or merged away in HCP; full syncs (every
+CUSTOMER_INDEX_FULL_SYNC_INTERVAL) remove them from the index.
+
+With several worker processes, only the one holding the index's sync lock
+file (<CUSTOMER_INDEX_PATH>.sync.lock) syncs; if it exits, another worker
+takes the lock at its next interval.
+
+Usage:
+    python customer_index.py            # incremental sync (full load if empty)
+    python customer_index.py --full     # reload every customer
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable, Set
+from config import Config
+from logging_setup import configure_logging
+from utils import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+PHONE_FIELDS = ("mobile_number", "home_number", "work_number")
+
+
+class CustomerIndexSyncError(Exception):
+    """A sync could not fetch every page; the watermark was left unchanged"""
+    pass
+
+
+class CustomerIndex:
+    """SQLite-backed lookup table of HCP customers by phone and email"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize customer index.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to Config.CUSTOMER_INDEX_PATH)
+        """
+        self.db_path = db_path or Config.CUSTOMER_INDEX_PATH
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's database connection (one per thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        """Create index tables if they do not exist"""
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS customers (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS customer_phones (
+                phone TEXT NOT NULL,
+                customer_id TEXT NOT NULL,
+                PRIMARY KEY (phone, customer_id)
+            );
+            CREATE TABLE IF NOT EXISTS customer_emails (
+                email TEXT NOT NULL,
+                customer_id TEXT NOT NULL,
+                PRIMARY KEY (email, customer_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_customer_phones_customer ON customer_phones (customer_id);
+            CREATE INDEX IF NOT EXISTS idx_customer_emails_customer ON customer_emails (customer_id);
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+
+    def upsert_customers(self, customers: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace customers and their phone/email keys.
+
+        Args:
+            customers: Customer dictionaries as returned by the HCP API
+
+        Returns:
+            Number of customers written
+        """
+        conn = self._connect()
+        count = 0
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for customer in customers:
+                customer_id = customer.get("id")
+                if not customer_id:
+                    continue
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO customers (id, data, updated_at) VALUES (?, ?, ?)",
+                    (customer_id, json.dumps(customer), customer.get("updated_at"))
+                )
+                conn.execute("DELETE FROM customer_phones WHERE customer_id = ?", (customer_id,))
+                conn.execute("DELETE FROM customer_emails WHERE customer_id = ?", (customer_id,))
+
+                for phone in customer_phones(customer):
+                    conn.execute(
+                        "INSERT OR IGNORE INTO customer_phones (phone, customer_id) VALUES (?, ?)",
+                        (phone, customer_id)
+                    )
+
+                email = (customer.get("email") or "").lower().strip()
+                if email:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO customer_emails (email, customer_id) VALUES (?, ?)",
+                        (email, customer_id)
+                    )
+
+                count += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return count
+
+    def remove_customers_except(self, keep_ids: Set[str]) -> int:
+        """
+        Delete indexed customers that are not in keep_ids.
+
+        Args:
+            keep_ids: IDs of every customer HCP still has
+
+        Returns:
+            Number of customers removed
+        """
+        conn = self._connect()
+        stale = [row["id"] for row in conn.execute("SELECT id FROM customers") if row["id"] not in keep_ids]
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for customer_id in stale:
+                conn.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+                conn.execute("DELETE FROM customer_phones WHERE customer_id = ?", (customer_id,))
+                conn.execute("DELETE FROM customer_emails WHERE customer_id = ?", (customer_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return len(stale)
+
+    def add_address(self, customer_id: str, address: Dict[str, Any]) -> None:
+        """
+        Append a newly created address to an indexed customer.
+
+        Args:
+            customer_id: HCP customer ID
+            address: Address data as returned by the HCP API
+        """
+        customer = self.get_customer(customer_id)
+        if customer is None:
+            return
+
+        customer.setdefault("addresses", []).append(address)
+        self.upsert_customers([customer])
+
+    def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Get an indexed customer by ID"""
+        row = self._connect().execute(
+            "SELECT data FROM customers WHERE id = ?",
+            (customer_id,)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def find_by_phone(self, phone: str) -> List[Dict[str, Any]]:
+        """
+        Find indexed customers by phone number.
+
+        Args:
+            phone: Normalized phone number (E.164)
+
+        Returns:
+            List of matching customers (empty on miss)
+        """
+        rows = self._connect().execute(
+            "SELECT c.data FROM customer_phones p JOIN customers c ON c.id = p.customer_id "
+            "WHERE p.phone = ?",
+            (phone,)
+        ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def find_by_email(self, email: str) -> List[Dict[str, Any]]:
+        """
+        Find indexed customers by email address.
+
+        Args:
+            email: Email address (case-insensitive)
+
+        Returns:
+            List of matching customers (empty on miss)
+        """
+        rows = self._connect().execute(
+            "SELECT c.data FROM customer_emails e JOIN customers c ON c.id = e.customer_id "
+            "WHERE e.email = ?",
+            (email.lower().strip(),)
+        ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def count(self) -> int:
+        """Number of indexed customers"""
+        return self._connect().execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read an index metadata value"""
+        row = self._connect().execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Write an index metadata value"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+            (key, value)
+        )
+
+    def full_sync(self, hcp_client, page_size: Optional[int] = None) -> int:
+        """
+        Load every HCP customer into the index.
+
+        Customers in the index that HCP no longer lists (deleted, or merged
+        into another customer) are removed.
+
+        Args:
+            hcp_client: HCPClient instance
+            page_size: Customers per page (defaults to Config.CUSTOMER_INDEX_PAGE_SIZE)
+
+        Returns:
+            Number of customers loaded
+
+        Raises:
+            CustomerIndexSyncError: If a page could not be fetched (customers
+                from earlier pages are kept; nothing is removed and the
+                watermark is unchanged)
+        """
+        page_size = page_size or Config.CUSTOMER_INDEX_PAGE_SIZE
+        started = time.time()
+        total = 0
+        page = 1
+        newest = self.get_meta("last_updated_at")
+        seen: Set[str] = set()
+
+        while True:
+            response = hcp_client.list_customers(page=page, page_size=page_size)
+            if response is None:
+                raise CustomerIndexSyncError(f"Full sync stopped at page {page}: request failed")
+
+            customers = response.get("customers", [])
+            total += self.upsert_customers(customers)
+            newest = _max_updated_at(customers, newest)
+            seen.update(customer["id"] for customer in customers if customer.get("id"))
+
+            if not customers or page >= (response.get("total_pages") or page):
+                break
+            page += 1
+
+        removed = self.remove_customers_except(seen)
+
+        if newest:
+            self.set_meta("last_updated_at", newest)
+        self.set_meta("last_synced_at", str(time.time()))
+        self.set_meta("last_full_sync_at", str(time.time()))
+
+        logger.info(
+            "Customer index full sync: %s customers in %.1fs, %s no longer in HCP removed",
+            total, time.time() - started, removed
+        )
+        return total
+
+    def incremental_sync(self, hcp_client, page_size: Optional[int] = None) -> int:
+        """
+        Load customers changed since the last sync.
+
+        Pages through /customers newest-first by updated_at and stops at the
+        first page that reaches the stored watermark. Customers updated at
+        the watermark itself are loaded again. Falls back to a full
+        sync if the index has never been loaded. Deleted customers are not
+        seen here (see full_sync).
+
+        Args:
+            hcp_client: HCPClient instance
+            page_size: Customers per page (defaults to Config.CUSTOMER_INDEX_PAGE_SIZE)
+
+        Returns:
+            Number of customers loaded
+
+        Raises:
+            CustomerIndexSyncError: If a page could not be fetched (customers
+                from earlier pages are kept, but the watermark is unchanged so
+                the next sync fetches the missed changes)
+        """
+        watermark = self.get_meta("last_updated_at")
+        if not watermark:
+            return self.full_sync(hcp_client, page_size)
+
+        page_size = page_size or Config.CUSTOMER_INDEX_PAGE_SIZE
+        total = 0
+        page = 1
+        newest = watermark
+
+        while True:
+            response = hcp_client.list_customers(
+                page=page,
+                page_size=page_size,
+                sort_by="updated_at",
+                sort_direction="desc"
+            )
+            if response is None:
+                raise CustomerIndexSyncError(f"Incremental sync stopped at page {page}: request failed")
+
+            customers = response.get("customers", [])
+            # >= so a customer updated in the watermark's own timestamp after
+            # the last sync read it is not missed (upserts are idempotent)
+            changed = [c for c in customers if (c.get("updated_at") or "") >= watermark]
+            total += self.upsert_customers(changed)
+            newest = _max_updated_at(changed, newest)
+
+            reached_watermark = len(changed) < len(customers)
+            if reached_watermark or not customers or page >= (response.get("total_pages") or page):
+                break
+            page += 1
+
+        self.set_meta("last_updated_at", newest)
+        self.set_meta("last_synced_at", str(time.time()))
+
+        logger.info("Customer index incremental sync: %s customers updated", total)
+        return total
+
+
+class CustomerIndexSyncer:
+    """Background thread that keeps the customer index fresh (in one process per index)"""
+
+    def __init__(
+        self,
+        index: CustomerIndex,
+        hcp_client,
+        interval: Optional[float] = None,
+        full_sync_interval: Optional[float] = None,
+        lock_path: Optional[str] = None
+    ):
+        """
+        Initialize syncer.
+
+        Args:
+            index: CustomerIndex to refresh
+            hcp_client: HCPClient instance
+            interval: Seconds between incremental syncs (defaults to
+                Config.CUSTOMER_INDEX_SYNC_INTERVAL)
+            full_sync_interval: Seconds between full syncs, which also remove
+                deleted customers (defaults to Config.CUSTOMER_INDEX_FULL_SYNC_INTERVAL;
+                0 disables)
+            lock_path: File locked by the process that syncs (defaults to
+                the index path + ".sync.lock")
+        """
+        self.index = index
+        self.hcp_client = hcp_client
+        self.interval = interval or Config.CUSTOMER_INDEX_SYNC_INTERVAL
+        self.full_sync_interval = (
+            full_sync_interval if full_sync_interval is not None else Config.CUSTOMER_INDEX_FULL_SYNC_INTERVAL
+        )
+        self.lock_path = lock_path or f"{index.db_path}.sync.lock"
+        self._lock_fd: Optional[int] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start syncing in the background (first sync runs immediately)"""
+        if self._thread:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="customer-index-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sync thread"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _run(self) -> None:
+        """Sync loop"""
+        while not self._stopping.is_set():
+            try:
+                if self._acquire_sync_lock():
+                    if self._full_sync_due():
+                        self.index.full_sync(self.hcp_client)
+                    else:
+                        self.index.incremental_sync(self.hcp_client)
+            except CustomerIndexSyncError as e:
+                logger.error("Customer index sync incomplete, will retry: %s", e)
+            except Exception as e:
+                logger.exception("Customer index sync failed: %s", e)
+
+            self._stopping.wait(self.interval)
+
+    def _acquire_sync_lock(self) -> bool:
+        """
+        Take the index's sync lock, held until this process exits.
+
+        Every worker process starts a syncer; only the lock holder syncs, so
+        HCP is paged once per interval however many workers there are.
+
+        Returns:
+            True if this process holds the lock
+        """
+        if self._lock_fd is not None:
+            return True
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            logger.debug("Customer index is synced by another process")
+            return False
+
+        self._lock_fd = fd
+        logger.info("This process syncs the customer index")
+        return True
+
+    def _full_sync_due(self) -> bool:
+        """Whether the last full sync is older than the full sync interval"""
+        if not self.full_sync_interval:
+            return False
+        last_full_sync = float(self.index.get_meta("last_full_sync_at") or 0)
+        return time.time() - last_full_sync >= self.full_sync_interval
+
+
+def customer_phones(customer: Dict[str, Any]) -> List[str]:
+    """Get all normalized phone numbers for a customer"""
+    phones = []
+    for field in PHONE_FIELDS:
+        phone = normalize_phone(customer.get(field) or "")
+        if phone and phone not in phones:
+            phones.append(phone)
+    return phones
+
+
+def _max_updated_at(customers: List[Dict[str, Any]], current: Optional[str]) -> Optional[str]:
+    """Get the newest updated_at timestamp (ISO 8601 strings sort chronologically)"""
+    newest = current
+    for customer in customers:
+        updated_at = customer.get("updated_at")
+        if updated_at and (newest is None or updated_at > newest):
+            newest = updated_at
+    return newest
+
+
+def main() -> int:
+    """Command-line entry point for loading the index"""
+    parser = argparse.ArgumentParser(description="Sync the local HCP customer index")
+    parser.add_argument("--full", action="store_true", help="Reload every customer instead of syncing changes")
+    parser.add_argument("--db", help="Index database path (defaults to CUSTOMER_INDEX_PATH)")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    db_path = args.db or Config.CUSTOMER_INDEX_PATH
+    if not db_path:
+        logger.error("No index path: set CUSTOMER_INDEX_PATH or pass --db")
+        return 1
+
+    from hcp_client import HCPClient
+
+    index = CustomerIndex(db_path)
+    client = HCPClient()
+
+    try:
+        if args.full:
+            index.full_sync(client)
+        else:
+            index.incremental_sync(client)
+    except CustomerIndexSyncError as e:
+        logger.error("%s", e)
+        return 1
+
+    logger.info("Index contains %s customers", index.count())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
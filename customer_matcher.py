@@ -4,10 +4,13 @@ Customer matching logic for determining if a form submission matches an existing
 Implements smart matching based on phone, email, and name with confidence scoring.
 """
 
+import contextvars
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Any, Tuple
-from difflib import SequenceMatcher
-from utils import normalize_phone, parse_address, compare_addresses
+from utils import normalize_phone, parse_address, compare_address_to_candidates
+from name_matching import name_similarity, score_candidates
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -46,14 +49,22 @@ class MatchResult:
 class CustomerMatcher:
     """Handles customer matching logic"""
 
-    def __init__(self, hcp_client):
+    def __init__(self, hcp_client, lookup_workers: Optional[int] = None, customer_index=None):
         """
         Initialize customer matcher.
 
         Args:
             hcp_client: HCPClient instance
+            lookup_workers: Max concurrent background searches shared by all
+                requests (defaults to Config.MATCH_LOOKUP_WORKERS)
+            customer_index: Optional CustomerIndex consulted before the HCP search API
         """
         self.hcp_client = hcp_client
+        self.customer_index = customer_index
+        self._lookup_executor = ThreadPoolExecutor(
+            max_workers=lookup_workers or Config.MATCH_LOOKUP_WORKERS,
+            thread_name_prefix="customer-lookup"
+        )
 
     def find_matching_customer(
         self,
@@ -84,27 +95,16 @@ class CustomerMatcher:
            - If new: Create new customer with warning
         4. No match: Create new customer
         """
-        logger.info(f"Searching for customer: phone={phone}, email={email}, name={name}")
+        logger.info("Searching for customer: phone=%s, email=%s, name=%s", phone, email, name)
 
-        phone_matches = []
-        email_matches = []
-
-        # Search by phone
-        if phone:
-            phone_matches = self.hcp_client.search_customers(phone)
-            logger.info(f"Found {len(phone_matches)} customers by phone")
-
-        # Search by email
-        if email:
-            email_matches = self.hcp_client.search_customers(email)
-            logger.info(f"Found {len(email_matches)} customers by email")
+        phone_matches, email_matches = self._search_phone_and_email(phone, email)
 
         # Find intersection (exact matches)
         exact_matches = self._find_exact_matches(phone_matches, email_matches)
 
         if exact_matches:
             # Exact match found
-            logger.info(f"Found {len(exact_matches)} exact matches")
+            logger.info("Found %s exact matches", len(exact_matches))
             best_match = self._select_best_match(exact_matches, name, address)
 
             return MatchResult(
@@ -121,7 +121,7 @@ class CustomerMatcher:
 
         if all_matches:
             # Partial match found
-            logger.info(f"Found {len(all_matches)} partial matches")
+            logger.info("Found %s partial matches", len(all_matches))
             best_match = self._select_best_match(all_matches, name, address)
 
             # Calculate confidence based on what matched
@@ -179,6 +179,64 @@ class CustomerMatcher:
             should_create_new=True
         )
 
+    def _search_phone_and_email(
+        self,
+        phone: Optional[str],
+        email: Optional[str]
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Search customers by phone and email concurrently.
+
+        The local customer index is checked first; only misses go to the HCP
+        search API. When both lookups need the API, the phone search runs on
+        the lookup executor while the email search runs on the calling thread,
+        so the two round trips overlap. Both still draw from the HCP client's
+        shared rate limiter.
+
+        Args:
+            phone: Normalized phone number
+            email: Email address
+
+        Returns:
+            Tuple of (phone_matches, email_matches)
+        """
+        phone_matches = []
+        email_matches = []
+
+        if self.customer_index is not None:
+            if phone:
+                phone_matches = self.customer_index.find_by_phone(phone)
+            if email:
+                email_matches = self.customer_index.find_by_email(email)
+            if phone_matches or email_matches:
+                logger.info("Customer index hits: %s by phone, %s by email", len(phone_matches), len(email_matches))
+
+        search_phone = bool(phone) and not phone_matches
+        search_email = bool(email) and not email_matches
+
+        phone_future = None
+        if search_phone and search_email:
+            # Run in a copy of this context so the search logs keep the request ID
+            phone_future = self._lookup_executor.submit(
+                contextvars.copy_context().run, self.hcp_client.search_customers, phone
+            )
+        elif search_phone:
+            phone_matches = self.hcp_client.search_customers(phone)
+
+        # Search by email
+        if search_email:
+            email_matches = self.hcp_client.search_customers(email)
+
+        if phone_future is not None:
+            phone_matches = phone_future.result()
+
+        if phone:
+            logger.info("Found %s customers by phone", len(phone_matches))
+        if email:
+            logger.info("Found %s customers by email", len(email_matches))
+
+        return phone_matches, email_matches
+
     def _find_exact_matches(
         self,
         phone_matches: List[Dict],
@@ -244,22 +302,19 @@ class CustomerMatcher:
             return candidates[0]
 
         # Score each candidate
+        name_scores = score_candidates(name, candidates)
         scored = []
-        for candidate in candidates:
+        for candidate, name_score in zip(candidates, name_scores):
             score = 0.0
 
             # Name similarity
-            if name:
-                candidate_name = f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}".strip()
-                if candidate_name:
-                    name_similarity = SequenceMatcher(None, name.lower(), candidate_name.lower()).ratio()
-                    score += name_similarity * 0.5
+            if name_score is not None:
+                score += name_score * 0.5
 
-            # Address similarity
+            # Address similarity (best of the candidate's addresses)
             if address and candidate.get("addresses"):
-                for cand_addr in candidate["addresses"]:
-                    addr_similarity = compare_addresses(address, cand_addr)
-                    score = max(score, score + addr_similarity * 0.5)
+                addr_similarity = max(compare_address_to_candidates(address, candidate["addresses"]))
+                score += addr_similarity * 0.5
 
             scored.append((score, candidate))
 
@@ -301,13 +356,13 @@ class CustomerMatcher:
             if self._customer_has_email(customer, email):
                 score += 0.4
 
-        # Name similarity (20% weight)
+        # Name similarity (20% weight; recomputed here, but the pair score
+        # computed in _select_best_match is served from the name_matching memo)
         if name:
             factors += 1
-            customer_name = f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip()
-            if customer_name:
-                name_similarity = SequenceMatcher(None, name.lower(), customer_name.lower()).ratio()
-                score += name_similarity * 0.2
+            similarity = name_similarity(name, customer)
+            if similarity is not None:
+                score += similarity * 0.2
 
         return score
 
@@ -344,11 +399,10 @@ class CustomerMatcher:
             return True
 
         # Check if address is similar to any existing address
-        for existing_addr in existing_addresses:
-            similarity = compare_addresses(new_address, existing_addr)
-            if similarity > 0.8:  # 80% similar
-                logger.info(f"Address is {similarity:.0%} similar to existing, not creating new")
-                return False
+        similarity = max(compare_address_to_candidates(new_address, existing_addresses))
+        if similarity > 0.8:  # 80% similar
+            logger.info("Address is %.0f%% similar to existing, not creating new", similarity * 100)
+            return False
 
         # Address is different enough, create new one
         logger.info("Address is different from existing addresses, will create new")
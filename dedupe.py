@@ -0,0 +1,315 @@
+"""
+Offline duplicate-customer detection.
+
+Streams every HCP customer (or an export.py NDJSON file), groups customers
+into blocks that share a normalized phone number, an email address, or a
+zip code and house number, and scores each pair within a block by contact
+details, name similarity (name_matching) and address similarity
+(utils.compare_address_to_candidates). Only customers that share a block are
+compared, so the work grows with the number of customers rather than its
+square. Pairs scoring at least --min-score are written as a ranked
+merge-candidate report.
+
+Blocks larger than --max-block-size (shared office numbers, placeholder
+emails such as "none@none.com") are skipped; they rarely hold real
+duplicates and would dominate the run time.
+
+Usage:
+    python dedupe.py merge_candidates.csv
+    python dedupe.py merge_candidates.ndjson --input customers.ndjson.gz --min-score 0.7
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from logging_setup import configure_logging
+from customer_index import customer_phones
+from name_matching import name_similarity
+from utils import compare_address_to_candidates
+
+logger = logging.getLogger(__name__)
+
+# Weight of each kind of evidence in a pair's score (sums to 1)
+SCORE_WEIGHTS = {
+    "phone": 0.25,
+    "email": 0.25,
+    "name": 0.3,
+    "address": 0.2,
+}
+
+DEFAULT_MIN_SCORE = 0.5
+DEFAULT_MAX_BLOCK_SIZE = 100
+
+REPORT_FIELDS = [
+    "score", "customer_id_a", "customer_id_b", "name_a", "name_b", "email_a", "email_b",
+    "matched", "name_similarity", "address_similarity", "created_at_a", "created_at_b",
+]
+
+
+class MergeCandidate:
+    """Two customers that are likely the same person"""
+
+    def __init__(
+        self,
+        score: float,
+        customer_a: Dict[str, Any],
+        customer_b: Dict[str, Any],
+        matched: List[str],
+        name_score: Optional[float],
+        address_score: float
+    ):
+        self.score = score
+        self.customer_a = customer_a  # Older record (the likely merge target)
+        self.customer_b = customer_b
+        self.matched = matched  # Identifiers the customers share ("phone", "email")
+        self.name_score = name_score
+        self.address_score = address_score
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a report row"""
+        return {
+            "score": round(self.score, 3),
+            "customer_id_a": self.customer_a["id"],
+            "customer_id_b": self.customer_b["id"],
+            "name_a": self.customer_a["name"],
+            "name_b": self.customer_b["name"],
+            "email_a": self.customer_a["email"],
+            "email_b": self.customer_b["email"],
+            "matched": ",".join(self.matched),
+            "name_similarity": round(self.name_score, 3) if self.name_score is not None else None,
+            "address_similarity": round(self.address_score, 3),
+            "created_at_a": self.customer_a["created_at"],
+            "created_at_b": self.customer_b["created_at"],
+        }
+
+
+def customer_record(customer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce an HCP customer to the fields used for deduplication.
+
+    Args:
+        customer: Customer dictionary from the HCP API
+
+    Returns:
+        Compact record with id, name, email, phones, addresses and created_at
+    """
+    first_name = customer.get("first_name") or ""
+    last_name = customer.get("last_name") or ""
+    return {
+        "id": customer.get("id"),
+        "first_name": first_name,
+        "last_name": last_name,
+        "name": f"{first_name} {last_name}".strip(),
+        "email": (customer.get("email") or "").lower().strip(),
+        "phones": customer_phones(customer),
+        "addresses": [
+            {field: address.get(field) for field in ("street", "city", "state", "zip")}
+            for address in customer.get("addresses") or []
+        ],
+        "created_at": customer.get("created_at") or "",
+    }
+
+
+def block_keys(record: Dict[str, Any]) -> List[str]:
+    """
+    Get the blocks a customer belongs to.
+
+    Example:
+        >>> block_keys({"phones": ["+14155551234"], "email": "a@b.com",
+        ...             "addresses": [{"street": "12 Main St", "zip": "94105-1234"}]})
+        ['phone:+14155551234', 'email:a@b.com', 'address:94105:12']
+    """
+    keys = [f"phone:{phone}" for phone in record["phones"]]
+    if record["email"]:
+        keys.append(f"email:{record['email']}")
+
+    for address in record["addresses"]:
+        zip_code = (address.get("zip") or "").strip()[:5]
+        street = (address.get("street") or "").split()
+        if zip_code and street and street[0].isdigit():
+            key = f"address:{zip_code}:{street[0]}"
+            if key not in keys:
+                keys.append(key)
+
+    return keys
+
+
+def score_pair(a: Dict[str, Any], b: Dict[str, Any]) -> MergeCandidate:
+    """
+    Score how likely two customer records are the same person.
+
+    Args:
+        a: Customer record (see customer_record)
+        b: Customer record
+
+    Returns:
+        MergeCandidate with the older record first
+    """
+    if b["created_at"] and (not a["created_at"] or b["created_at"] < a["created_at"]):
+        a, b = b, a
+
+    matched = []
+    if set(a["phones"]) & set(b["phones"]):
+        matched.append("phone")
+    if a["email"] and a["email"] == b["email"]:
+        matched.append("email")
+
+    name_score = name_similarity(a["name"], b)
+
+    address_score = 0.0
+    if b["addresses"]:
+        for address in a["addresses"]:
+            address_score = max(address_score, *compare_address_to_candidates(address, b["addresses"]))
+
+    score = (
+        sum(SCORE_WEIGHTS[field] for field in matched)
+        + SCORE_WEIGHTS["name"] * (name_score or 0.0)
+        + SCORE_WEIGHTS["address"] * address_score
+    )
+    return MergeCandidate(score, a, b, matched, name_score, address_score)
+
+
+def find_merge_candidates(
+    customers: Iterable[Dict[str, Any]],
+    min_score: float = DEFAULT_MIN_SCORE,
+    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE
+) -> List[MergeCandidate]:
+    """
+    Find likely duplicate customers.
+
+    Args:
+        customers: HCP customer dictionaries (consumed once; only compact
+            records are kept)
+        min_score: Lowest score reported
+        max_block_size: Blocks with more customers than this are skipped
+
+    Returns:
+        Merge candidates, highest score first
+    """
+    started = time.time()
+    records: List[Dict[str, Any]] = []
+    blocks: Dict[str, List[int]] = defaultdict(list)
+
+    for customer in customers:
+        record = customer_record(customer)
+        for key in block_keys(record):
+            blocks[key].append(len(records))
+        records.append(record)
+
+    logger.info("Loaded %s customers into %s blocks in %.1fs", len(records), len(blocks), time.time() - started)
+
+    seen: set = set()
+    candidates: List[MergeCandidate] = []
+    skipped = []
+
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block_size:
+            skipped.append((len(members), key))
+            continue
+
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                if (i, j) in seen:
+                    continue
+                seen.add((i, j))
+
+                candidate = score_pair(records[i], records[j])
+                if candidate.score >= min_score:
+                    candidates.append(candidate)
+
+    if skipped:
+        skipped.sort(reverse=True)
+        logger.warning(
+            "Skipped %s blocks larger than %s customers, largest: %s",
+            len(skipped), max_block_size, ", ".join(f"{key} ({size})" for size, key in skipped[:5])
+        )
+
+    candidates.sort(key=lambda c: (-c.score, c.customer_a["id"] or "", c.customer_b["id"] or ""))
+    logger.info(
+        "Compared %s pairs, found %s merge candidates in %.1fs",
+        len(seen), len(candidates), time.time() - started
+    )
+    return candidates
+
+
+def read_customers(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream customers from an NDJSON export (see export.py).
+
+    Args:
+        path: NDJSON file, gzip-compressed if it ends in .gz
+
+    Yields:
+        Customer dictionaries
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_report(candidates: List[MergeCandidate], path: str) -> None:
+    """
+    Write merge candidates as CSV, or NDJSON for .ndjson/.jsonl paths.
+
+    Args:
+        candidates: Ranked merge candidates
+        path: Output path
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".ndjson", ".jsonl")):
+            for candidate in candidates:
+                f.write(json.dumps(candidate.to_dict()) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            for candidate in candidates:
+                writer.writerow(candidate.to_dict())
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Report likely duplicate HCP customers")
+    parser.add_argument("output", help="Report file (.csv, or .ndjson/.jsonl)")
+    parser.add_argument("--input", help="NDJSON customer export to read instead of the HCP API")
+    parser.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE,
+                        help=f"Lowest score reported, 0-1 (default: {DEFAULT_MIN_SCORE})")
+    parser.add_argument("--max-block-size", type=int, default=DEFAULT_MAX_BLOCK_SIZE,
+                        help=f"Skip blocks with more customers than this (default: {DEFAULT_MAX_BLOCK_SIZE})")
+    parser.add_argument("--page-size", type=int, default=100, help="Customers per HCP request (default: 100)")
+    parser.add_argument("--base-url", help="HCP API base URL (e.g. a local HCP stand-in)")
+    parser.add_argument("--api-key", help="HCP API key (default: HCP_API_KEY)")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    from hcp_client import HCPAPIError, HCPClient
+
+    if args.input:
+        customers = read_customers(args.input)
+    else:
+        client = HCPClient(api_key=args.api_key, base_url=args.base_url)
+        customers = client.iter_customers(page_size=args.page_size)
+
+    try:
+        candidates = find_merge_candidates(customers, args.min_score, args.max_block_size)
+    except HCPAPIError as e:
+        logger.error("Could not load every customer: %s", e)
+        return 1
+
+    write_report(candidates, args.output)
+    logger.info("Wrote %s merge candidates to %s", len(candidates), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Bulk export of HCP customers, leads or jobs.
+
+Streams records through HCPClient.iter_customers/iter_leads/iter_jobs and
+writes them as they arrive, so memory use stays bounded regardless of how
+many records HCP holds.
+
+Output formats:
+    ndjson  - one JSON record per line (gzip-compressed if the path ends in .gz)
+    parquet - columnar file written in row groups of --batch-size records;
+              top-level fields become columns, nested objects and lists are
+              stored as JSON strings. Requires pyarrow (pip install pyarrow).
+
+Usage:
+    python export.py customers customers.ndjson
+    python export.py leads leads.ndjson.gz --page-size 200
+    python export.py jobs jobs.parquet --batch-size 50000
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, IO, Iterable, List, Optional
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ("customers", "leads", "jobs")
+
+# Log progress every this many records
+PROGRESS_INTERVAL = 10000
+
+
+def _open_text(path: str) -> IO[str]:
+    """Open an output file for writing text, gzip-compressed for .gz paths"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def _log_progress(collection: str, count: int, started: float) -> None:
+    """Log the running record count at PROGRESS_INTERVAL"""
+    if count % PROGRESS_INTERVAL == 0:
+        logger.info("Exported %s %s (%.0f/s)", count, collection, count / (time.time() - started))
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], path: str, collection: str = "records") -> int:
+    """
+    Write records as newline-delimited JSON.
+
+    Args:
+        records: Records to write (consumed lazily)
+        path: Output path (.gz for gzip compression)
+        collection: Record kind, for progress logs
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    started = time.time()
+
+    with _open_text(path) as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":"), default=str))
+            f.write("\n")
+            count += 1
+            _log_progress(collection, count, started)
+
+    return count
+
+
+def _flatten(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep scalar fields, JSON-encode nested objects and lists"""
+    return {
+        key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+        for key, value in record.items()
+    }
+
+
+def write_parquet(
+    records: Iterable[Dict[str, Any]],
+    path: str,
+    collection: str = "records",
+    batch_size: int = 10000
+) -> int:
+    """
+    Write records as a Parquet file, one row group per batch.
+
+    The schema is taken from the first batch; fields that first appear later
+    are dropped (with a warning) and missing fields are written as nulls.
+
+    Args:
+        records: Records to write (consumed lazily)
+        path: Output path
+        collection: Record kind, for progress logs
+        batch_size: Records held in memory and written per row group
+
+    Returns:
+        Number of records written
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    count = 0
+    started = time.time()
+    writer = None
+    schema = None
+    dropped: set = set()
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal writer, schema
+        if schema is None:
+            # Fields that were null throughout the first batch default to strings
+            inferred = pa.Table.from_pylist(batch).schema
+            schema = pa.schema([
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                for field in inferred
+            ])
+            writer = pq.ParquetWriter(path, schema)
+
+        new_fields = {key for row in batch for key in row} - set(schema.names) - dropped
+        if new_fields:
+            logger.warning("Dropping fields not in the first batch: %s", sorted(new_fields))
+            dropped.update(new_fields)
+
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        batch.clear()
+
+    try:
+        for record in records:
+            batch.append(_flatten(record))
+            count += 1
+            _log_progress(collection, count, started)
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        logger.warning("No %s to export; %s was not written", collection, path)
+    return count
+
+
+def run_export(
+    hcp_client,
+    collection: str,
+    path: str,
+    output_format: Optional[str] = None,
+    page_size: int = 100,
+    batch_size: int = 10000,
+    sort_by: Optional[str] = None,
+    sort_direction: Optional[str] = None
+) -> int:
+    """
+    Export one HCP collection to a file.
+
+    Args:
+        hcp_client: HCPClient instance
+        collection: "customers", "leads" or "jobs"
+        path: Output path
+        output_format: "ndjson" or "parquet" (detected from the extension if omitted)
+        page_size: Records per HCP request
+        batch_size: Records per Parquet row group
+        sort_by: Optional sort field (e.g. "updated_at")
+        sort_direction: Optional sort direction ("asc" or "desc")
+
+    Returns:
+        Number of records exported
+
+    Raises:
+        HCPAPIError: If a page could not be fetched
+    """
+    output_format = output_format or ("parquet" if path.lower().endswith(".parquet") else "ndjson")
+    records = hcp_client.iter_records(collection, page_size, sort_by=sort_by, sort_direction=sort_direction)
+    started = time.time()
+
+    if output_format == "parquet":
+        count = write_parquet(records, path, collection, batch_size)
+    else:
+        count = write_ndjson(records, path, collection)
+
+    logger.info("Exported %s %s to %s in %.1fs", count, collection, path, time.time() - started)
+    return count
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Export HCP customers, leads or jobs")
+    parser.add_argument("collection", choices=COLLECTIONS, help="Records to export")
+    parser.add_argument("output", help="Output file (.ndjson, .ndjson.gz or .parquet)")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], help="Output format (default: from file extension)")
+    parser.add_argument("--page-size", type=int, default=100, help="Records per HCP request (default: 100)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Records per Parquet row group (default: 10000)")
+    parser.add_argument("--sort-by", help="Sort field, e.g. updated_at")
+    parser.add_argument("--sort-direction", choices=["asc", "desc"], help="Sort direction")
+    parser.add_argument("--base-url", help="HCP API base URL (e.g. a local HCP stand-in)")
+    parser.add_argument("--api-key", help="HCP API key (default: HCP_API_KEY)")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    from hcp_client import HCPAPIError, HCPClient
+
+    try:
+        run_export(
+            HCPClient(api_key=args.api_key, base_url=args.base_url),
+            args.collection,
+            args.output,
+            output_format=args.format,
+            page_size=args.page_size,
+            batch_size=args.batch_size,
+            sort_by=args.sort_by,
+            sort_direction=args.sort_direction
+        )
+    except ImportError:
+        logger.error("Parquet export requires pyarrow (pip install pyarrow)")
+        return 1
+    except HCPAPIError as e:
+        logger.error("Export incomplete: %s", e)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Elfsight form field mapping.
+
+Maps Elfsight field labels ("First Name", "Email Address", ...) to the
+form_data keys used by LeadCreator. The mapping is a declarative rule table
+compiled once into an exact-name dict plus a single regex; each distinct
+(field name, field type) is resolved once and memoized.
+
+Forms with different labels can be mapped without code changes through a
+JSON file named by FORM_FIELD_MAPPING_FILE:
+
+    {
+        "default": {"fields": {"full name": "name"}},
+        "quote-form": {
+            "fields": {"your email": "email"},
+            "rules": [{"key": "service_needed", "contains": ["what do you need"]}]
+        }
+    }
+
+"fields" maps exact (case-insensitive) labels to keys; "rules" are checked
+before the built-in rules. "default" applies to every form; other entries
+apply to submissions posted to /webhook?form=<id>.
+"""
+
+import json
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+FIELD_CACHE_SIZE = 1024
+
+
+class FieldRule:
+    """Map a field to a key when its (lowercased) name contains the given text"""
+
+    def __init__(
+        self,
+        key: str,
+        contains: Sequence[str],
+        also_contains: Sequence[str] = (),
+        not_contains: Sequence[str] = ()
+    ):
+        """
+        Initialize field rule.
+
+        Args:
+            key: form_data key the field maps to
+            contains: Name must contain at least one of these
+            also_contains: Name must also contain all of these
+            not_contains: Name must contain none of these
+        """
+        self.key = key
+        self.contains = tuple(contains)
+        self.also_contains = tuple(also_contains)
+        self.not_contains = tuple(not_contains)
+
+
+# Built-in rules, in priority order (first match wins)
+DEFAULT_FIELD_RULES: List[FieldRule] = [
+    FieldRule("first_name", ["first name"]),
+    FieldRule("last_name", ["last name"]),
+    FieldRule("email", ["email"]),
+    FieldRule("phone", ["phone"]),
+    FieldRule("street_line_2", ["street address line 2"]),
+    FieldRule("street", ["street address"]),
+    FieldRule("city", ["city"]),
+    # Capture state field (but not "service_request_details")
+    FieldRule("state", ["state"], not_contains=["service"]),
+    FieldRule("zip", ["postal", "zip"]),
+    FieldRule("customer_type", ["new or existing", "are you"]),
+    FieldRule("preferred_contact", ["preferred method", "contact method"]),
+    FieldRule("sms_consent", ["sms"], also_contains=["consent"]),
+    FieldRule("service_needed", ["service needed"]),
+    FieldRule("service_details", ["service details"]),
+    FieldRule("service_request_details", ["service request details", "request details"]),
+    FieldRule("file_attachments", ["images", "plans", "specs"]),
+]
+
+# Field types that map to a key regardless of name (checked after the rules)
+DEFAULT_TYPE_KEYS: Dict[str, str] = {
+    "file": "file_attachments"
+}
+
+
+# Exact field names, checked before the rules
+DEFAULT_EXACT_FIELDS: Dict[str, str] = {
+    "first_name": "first_name",
+    "last_name": "last_name"
+}
+
+
+def _configured_fields() -> Dict[str, str]:
+    """Config.FORM_FIELD_* names, used for fields no rule or type recognizes"""
+    return {
+        Config.FORM_FIELD_NAME.lower().strip(): "name",
+        Config.FORM_FIELD_EMAIL.lower().strip(): "email",
+        Config.FORM_FIELD_PHONE.lower().strip(): "phone",
+        Config.FORM_FIELD_ADDRESS.lower().strip(): "address",
+        Config.FORM_FIELD_MESSAGE.lower().strip(): "message",
+        Config.FORM_FIELD_CUSTOMER_TYPE.lower().strip(): "customer_type",
+    }
+
+
+def _to_bool(value: Any) -> bool:
+    """Consent checkbox - value is boolean or string "true"/"false" """
+    return value in [True, "true", "True", "yes", "Yes"]
+
+
+def _to_list(value: Any) -> Optional[List[Any]]:
+    """File attachments - value might be array of URLs or single URL"""
+    if isinstance(value, list):
+        return value
+    return [value] if value else None
+
+
+def _to_split_list(value: Any) -> Optional[List[Any]]:
+    """Multi-select field - value might be array or comma-separated string"""
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in value.split(",")] if value else None
+
+
+# Value conversions by key; a None result leaves the key unset
+VALUE_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "sms_consent": _to_bool,
+    "service_details": _to_split_list,
+    "file_attachments": _to_list,
+}
+
+
+def compile_rules(rules: Sequence[FieldRule]) -> "re.Pattern[str]":
+    """
+    Compile rules into one anchored regex.
+
+    Each rule becomes a branch of lookaheads followed by an empty named
+    group; branches are tried in order, so the first matching rule wins.
+    """
+    branches = []
+    for index, rule in enumerate(rules):
+        branch = "(?=.*?(?:%s))" % "|".join(re.escape(text) for text in rule.contains)
+        branch += "".join("(?=.*?%s)" % re.escape(text) for text in rule.also_contains)
+        branch += "".join("(?!.*?%s)" % re.escape(text) for text in rule.not_contains)
+        branches.append(f"{branch}(?P<r{index}>)")
+    return re.compile("^(?:%s)" % "|".join(branches), re.DOTALL)
+
+
+class FieldMapper:
+    """Compiled field-name-to-key mapping for one form"""
+
+    def __init__(
+        self,
+        exact_fields: Optional[Dict[str, str]] = None,
+        rules: Optional[Sequence[FieldRule]] = None,
+        type_keys: Optional[Dict[str, str]] = None,
+        named_fields: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize field mapper.
+
+        Args:
+            exact_fields: Field names mapped to keys, checked first
+                (defaults to DEFAULT_EXACT_FIELDS)
+            rules: Substring rules in priority order (defaults to DEFAULT_FIELD_RULES)
+            type_keys: Field types mapped to keys when no rule matches
+                (defaults to DEFAULT_TYPE_KEYS)
+            named_fields: Field names mapped to keys when nothing else matches
+                (defaults to the Config.FORM_FIELD_* names)
+        """
+        self.exact_fields = {
+            k.lower().strip(): v for k, v in (exact_fields if exact_fields is not None else DEFAULT_EXACT_FIELDS).items()
+        }
+        self.rules = list(rules) if rules is not None else list(DEFAULT_FIELD_RULES)
+        self.type_keys = type_keys if type_keys is not None else DEFAULT_TYPE_KEYS
+        self.named_fields = named_fields if named_fields is not None else _configured_fields()
+        self._pattern = compile_rules(self.rules) if self.rules else None
+        self._rule_keys = {f"r{index}": rule.key for index, rule in enumerate(self.rules)}
+        self.map_field = lru_cache(maxsize=FIELD_CACHE_SIZE)(self._resolve)
+
+    def _resolve(self, field_name: str, field_type: str) -> str:
+        """Resolve a lowercased, stripped field name (memoized as map_field)"""
+        key = self.exact_fields.get(field_name)
+        if key is not None:
+            return key
+
+        if self._pattern is not None:
+            match = self._pattern.match(field_name)
+            if match:
+                return self._rule_keys[match.lastgroup]
+
+        key = self.type_keys.get(field_type) or self.named_fields.get(field_name)
+        if key is not None:
+            return key
+
+        # Store other fields with their original name (cleaned)
+        return field_name.replace(" ", "_")
+
+    def parse(self, fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Map a list of Elfsight field objects to form data.
+
+        Args:
+            fields: Elfsight payload ({"name", "value", "type"} objects)
+
+        Returns:
+            Form data dictionary
+        """
+        form_data: Dict[str, Any] = {}
+
+        for field in fields:
+            # Cache keys must be hashable; a list or dict name/type is matched as text
+            key = self.map_field(_text(field.get("name")).lower().strip(), _text(field.get("type")))
+            value = field.get("value", "")
+
+            convert = VALUE_CONVERTERS.get(key)
+            if convert is not None:
+                value = convert(value)
+                if value is None:
+                    continue
+
+            form_data[key] = value
+
+        return form_data
+
+
+def _text(value: Any) -> str:
+    """A field's name or type as a string (None becomes "")"""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def build_field_mapper(override: Optional[Dict[str, Any]] = None) -> FieldMapper:
+    """
+    Build a mapper from the built-in table plus a per-form override.
+
+    Args:
+        override: {"fields": {name: key}, "rules": [{"key", "contains", ...}]}
+
+    Returns:
+        FieldMapper
+    """
+    override = override or {}
+    exact_fields = dict(DEFAULT_EXACT_FIELDS)
+    exact_fields.update({k.lower().strip(): v for k, v in override.get("fields", {}).items()})
+
+    rules = [
+        FieldRule(
+            key=rule["key"],
+            contains=[text.lower() for text in rule["contains"]],
+            also_contains=[text.lower() for text in rule.get("also_contains", [])],
+            not_contains=[text.lower() for text in rule.get("not_contains", [])]
+        )
+        for rule in override.get("rules", [])
+    ]
+
+    return FieldMapper(exact_fields=exact_fields, rules=rules + DEFAULT_FIELD_RULES)
+
+
+def load_field_mappers(path: Optional[str] = None) -> Tuple[FieldMapper, Dict[str, FieldMapper]]:
+    """
+    Build the default mapper and per-form mappers.
+
+    Args:
+        path: JSON mapping file (defaults to Config.FORM_FIELD_MAPPING_FILE;
+            empty means built-in mapping only)
+
+    Returns:
+        Tuple of (default mapper, {form_id: mapper})
+    """
+    path = path if path is not None else Config.FORM_FIELD_MAPPING_FILE
+    overrides: Dict[str, Any] = {}
+
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        logger.info("Loaded field mapping for %s forms from %s", len(overrides), path)
+
+    default_override = overrides.pop("default", {})
+    default = build_field_mapper(default_override)
+
+    forms = {}
+    for form_id, override in overrides.items():
+        merged = {
+            "fields": {**default_override.get("fields", {}), **override.get("fields", {})},
+            "rules": override.get("rules", []) + default_override.get("rules", [])
+        }
+        forms[form_id] = build_field_mapper(merged)
+
+    return default, forms
+
+
+_mappers: Optional[Tuple[FieldMapper, Dict[str, FieldMapper]]] = None
+_mappers_lock = threading.Lock()
+
+
+def get_field_mapper(form_id: Optional[str] = None) -> FieldMapper:
+    """
+    Get the field mapper for a form, loading the mapping on first use.
+
+    Args:
+        form_id: Form ID from /webhook?form=<id> (None for the default mapping)
+
+    Returns:
+        FieldMapper for the form (the default one if the form has no override)
+    """
+    global _mappers
+
+    if _mappers is None:
+        with _mappers_lock:
+            if _mappers is None:
+                _mappers = load_field_mappers()
+
+    default, forms = _mappers
+    if form_id and form_id not in forms:
+        logger.warning("No field mapping for form '%s', using default", form_id)
+    return forms.get(form_id, default) if form_id else default
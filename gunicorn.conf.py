@@ -0,0 +1,37 @@
+"""
+Gunicorn settings.
+
+Workers default to 1; set WEB_CONCURRENCY to run more processes on one
+host. Extra workers share the HCP rate-limit budget through
+HCP_RATE_LIMIT_STATE_DIR and report metrics through PROMETHEUS_MULTIPROC_DIR.
+"""
+
+import os
+import shutil
+
+bind = f":{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 0
+
+
+def on_starting(server):
+    """Start each deployment with empty shared state directories"""
+    for name in ("PROMETHEUS_MULTIPROC_DIR", "HCP_RATE_LIMIT_STATE_DIR"):
+        path = os.getenv(name)
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+
+    if workers > 1 and not os.getenv("HCP_RATE_LIMIT_STATE_DIR"):
+        server.log.warning(
+            f"{workers} workers without HCP_RATE_LIMIT_STATE_DIR: "
+            "each worker rate-limits on its own and together they can exceed the HCP quota"
+        )
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live metric samples"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
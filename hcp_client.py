@@ -5,35 +5,163 @@ Provides methods for interacting with the Housecall Pro API.
 Based on patterns from existing HCP integration scripts and API documentation.
 """
 
+import contextvars
 import time
 import logging
 import requests
-from typing import Optional, Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Iterator
 from config import Config
+from rate_limiter import RateLimiter, get_rate_limiter
+from retry_policy import RetryPolicy, get_retry_policy, is_retryable_status, parse_retry_after
+from circuit_breaker import CircuitBreakerRegistry, CircuitState, get_circuit_breakers
+from cache import TTLCache
+from logging_setup import get_request_id
+from metrics import observe_hcp_request, observe_rate_limit_sleep, observe_retry, time_stage
 
 logger = logging.getLogger(__name__)
 
+# Error of the last HCP request made in the current thread (see HCPClient.last_error)
+_last_error: contextvars.ContextVar[Optional["HCPAPIError"]] = contextvars.ContextVar("hcp_last_error", default=None)
+
 
 class HCPAPIError(Exception):
     """Custom exception for HCP API errors"""
-    pass
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = True):
+        super().__init__(message)
+        self.status = status  # HTTP status of the final response (None if there was none)
+        self.retryable = retryable  # False if HCP rejected the request itself (4xx other than 408/425/429)
+
+
+class CircuitOpenError(HCPAPIError):
+    """Request not sent because the endpoint group's circuit breaker is open"""
+
+    def __init__(self, group: str, retry_in: float):
+        super().__init__(f"HCP circuit '{group}' is open; retry in {retry_in:.0f}s")
+        self.group = group
+        self.retry_in = retry_in
 
 
 class HCPClient:
     """Client for Housecall Pro API"""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[TTLCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None
+    ):
         """
         Initialize HCP API client.
 
         Args:
             api_key: HCP API key (defaults to Config.HCP_API_KEY)
             base_url: HCP API base URL (defaults to Config.HCP_BASE_URL)
+            rate_limiter: RateLimiter to draw from (defaults to the shared process-wide limiter)
+            cache: Read-through cache for customer/address reads (created from
+                Config.HCP_CACHE_* if not provided; disabled if HCP_CACHE_ENABLED is false)
+            retry_policy: RetryPolicy to follow (defaults to the shared process-wide policy)
+            breakers: Circuit breakers per endpoint group (defaults to the shared process-wide registry)
         """
         self.api_key = api_key or Config.HCP_API_KEY
         self.base_url = base_url or Config.HCP_BASE_URL
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.breakers = breakers or get_circuit_breakers()
+        if cache is None and Config.HCP_CACHE_ENABLED:
+            cache = TTLCache(max_size=Config.HCP_CACHE_MAX_SIZE)
+        self.cache = cache
         self.session = requests.Session()
-        self.session.headers.update(Config.get_hcp_headers())
+        self.session.headers.update(self._headers())
+
+    def _url(self, endpoint: str) -> str:
+        """Construct full API URL for this client's base URL"""
+        return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+
+    def _headers(self) -> Dict[str, str]:
+        """Headers for HCP API requests using this client's API key"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+    def _request_headers(self) -> Optional[Dict[str, str]]:
+        """Per-request headers: the correlation ID of the request being handled, if any"""
+        request_id = get_request_id()
+        return {"X-Request-ID": request_id} if request_id else None
+
+    def _cache_get(self, key: tuple) -> Optional[Any]:
+        """Look up a cached read (None on miss or when caching is disabled)"""
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _cache_set(self, key: tuple, value: Any, ttl: float) -> None:
+        """Store a successful read"""
+        if self.cache is not None:
+            self.cache.set(key, value, ttl)
+
+    def _invalidate_customer(self, customer_id: Optional[str] = None) -> None:
+        """
+        Drop cached reads affected by a customer write.
+
+        Search results embed customer data and addresses, so any customer
+        write invalidates every cached search.
+        """
+        if self.cache is None:
+            return
+
+        self.cache.invalidate_namespace("search")
+        if customer_id:
+            self.cache.invalidate(("customer", customer_id))
+            self.cache.invalidate(("addresses", customer_id))
+
+    def preconnect(self, connections: int = 1, timeout: float = 5.0) -> int:
+        """
+        Open keep-alive connections to HCP before they are needed.
+
+        Sends HEAD requests to the base URL in parallel, so the TCP and TLS
+        handshakes are done and the connections are waiting in the session's
+        pool when the first submission arrives. The requests bypass the rate
+        limiter, retries and circuit breakers; any response will do.
+
+        Args:
+            connections: Connections to open (the matcher uses two at once)
+            timeout: Seconds to wait for each connection
+
+        Returns:
+            Number of connections opened
+        """
+        def connect(_) -> bool:
+            try:
+                self.session.head(self.base_url, timeout=timeout, allow_redirects=False).close()
+                return True
+            except requests.exceptions.RequestException as e:
+                logger.warning("Could not pre-connect to HCP: %s", e)
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="hcp-preconnect") as executor:
+            opened = sum(executor.map(connect, range(connections)))
+
+        logger.debug("Pre-connected %s/%s connections to %s", opened, connections, self.base_url)
+        return opened
+
+    def last_error(self) -> Optional[HCPAPIError]:
+        """
+        Get the error of the last HCP request made by the calling thread.
+
+        Endpoint methods log failures and return None or an empty result;
+        this tells the caller why, e.g. whether trying again could succeed.
+
+        Returns:
+            HCPAPIError, or None if the last request succeeded
+        """
+        return _last_error.get()
 
     def _request(
         self,
@@ -41,78 +169,120 @@ class HCPClient:
         endpoint: str,
         params: Optional[Dict] = None,
         json_data: Optional[Dict] = None,
-        retry_count: int = 3
+        retry_count: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Make HTTP request to HCP API with rate limiting and retries.
 
+        Timeouts, connection errors, 408/425/429 and 5xx responses are retried
+        as the retry policy allows; other 4xx responses fail immediately.
+        Requests to an endpoint group whose circuit breaker is open fail
+        without being sent.
+
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (e.g., "/customers")
             params: Query parameters
             json_data: JSON body data
-            retry_count: Number of retries on failure
+            retry_count: Maximum attempts (defaults to the retry policy's)
 
         Returns:
-            Response JSON data
+            Response JSON data ({} for an empty body)
 
         Raises:
-            HCPAPIError: If request fails after retries
+            CircuitOpenError: If the endpoint group's circuit is open
+            HCPAPIError: If the request fails, or retries are exhausted
         """
-        url = Config.get_api_url(endpoint)
+        url = self._url(endpoint)
+        retry = self.retry_policy.begin(retry_count)
+        breaker = self.breakers.for_endpoint(endpoint)
 
-        for attempt in range(retry_count):
-            try:
-                logger.debug(f"{method} {url} (attempt {attempt + 1}/{retry_count})")
-
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=json_data,
-                    timeout=30
-                )
-
-                # Log response for debugging
-                logger.debug(f"Response status: {response.status_code}")
-
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 5))
-                    logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-                    time.sleep(retry_after)
-                    continue
-
-                # Raise for HTTP errors
-                response.raise_for_status()
-
-                # Rate limiting: wait between requests
-                time.sleep(Config.API_RATE_LIMIT_DELAY)
-
-                return response.json()
-
-            except requests.exceptions.HTTPError as e:
-                logger.error(f"HTTP error: {e}")
-                if e.response is not None:
-                    logger.error(f"Response status: {e.response.status_code}")
-                    logger.error(f"Response body: {e.response.text}")
-                else:
-                    logger.error("No response received")
-
-                if attempt == retry_count - 1:
-                    raise HCPAPIError(f"HTTP error after {retry_count} attempts: {e}")
-
-                time.sleep(2 ** attempt)  # Exponential backoff
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error: {e}")
+        started = time.perf_counter()
+        status = "error"
+        _last_error.set(None)
 
-                if attempt == retry_count - 1:
-                    raise HCPAPIError(f"Request failed after {retry_count} attempts: {e}")
-
-                time.sleep(2 ** attempt)  # Exponential backoff
-
-        raise HCPAPIError(f"Request failed after {retry_count} attempts")
+        try:
+            while True:
+                if not breaker.allow():
+                    status = "circuit_open"
+                    raise CircuitOpenError(breaker.name, breaker.retry_in())
+
+                retry.start_attempt()
+                retry_after = None
+
+                # Rate limiting: wait for budget before sending
+                waited = self.rate_limiter.acquire(method)
+                observe_rate_limit_sleep(method, endpoint, "limiter", waited)
+
+                logger.debug("%s %s (attempt %s/%s)", method, url, retry.attempts, retry.max_attempts)
+
+                try:
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        json=json_data,
+                        headers=self._request_headers(),
+                        timeout=min(Config.HCP_REQUEST_TIMEOUT, max(retry.remaining(), 1))
+                    )
+                except requests.exceptions.RequestException as e:
+                    response = None
+                    status = "error"
+                    error = f"Request error: {e}"
+                else:
+                    # Log response for debugging
+                    logger.debug("Response status: %s", response.status_code)
+                    status = str(response.status_code)
+
+                    if response.status_code < 400:
+                        breaker.record_success()
+                        if not response.content:
+                            return {}
+                        try:
+                            return response.json()
+                        except ValueError as e:
+                            # HCP accepted the request; sending it again could repeat a write
+                            error = f"HTTP {response.status_code} with invalid JSON body: {e}"
+                            logger.error("%s %s failed: %s", method, endpoint, error)
+                            raise HCPAPIError(error, status=response.status_code, retryable=False)
+
+                    error = f"HTTP {response.status_code}: {response.text}"
+                    if not is_retryable_status(response.status_code):
+                        # HCP is up; the request itself was rejected
+                        breaker.record_success()
+                        logger.error("%s %s failed: %s", method, endpoint, error)
+                        raise HCPAPIError(error, status=response.status_code, retryable=False)
+
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+                breaker.record_failure()
+                if breaker.state == CircuitState.OPEN:
+                    # Don't keep retrying into an outage
+                    logger.error("%s %s failed: %s; circuit '%s' is open", method, endpoint, error, breaker.name)
+                    raise CircuitOpenError(breaker.name, breaker.retry_in())
+
+                delay = retry.next_delay(retry_after)
+                observe_retry(method, endpoint, status, delay, retry.give_up_reason)
+
+                if delay is None:
+                    logger.error(
+                        "%s %s failed after %s attempts (retry %s exhausted): %s",
+                        method, endpoint, retry.attempts, retry.give_up_reason, error
+                    )
+                    raise HCPAPIError(
+                        f"{error} (after {retry.attempts} attempts)",
+                        status=response.status_code if response is not None else None
+                    )
+
+                logger.warning("%s %s: %s; retrying in %.2fs", method, endpoint, error, delay)
+                if retry_after is not None:
+                    observe_rate_limit_sleep(method, endpoint, "retry_after", delay)
+                time.sleep(delay)
+        except HCPAPIError as e:
+            _last_error.set(e)
+            raise
+        finally:
+            observe_hcp_request(method, endpoint, status, retry.retries, time.perf_counter() - started)
 
     def search_customers(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -128,6 +298,11 @@ class HCPClient:
             >>> client.search_customers("john@example.com")
             [{"id": "abc123", "email": "john@example.com", ...}]
         """
+        cached = self._cache_get(("search", query))
+        if cached is not None:
+            logger.info("Found %s customers matching '%s' (cached)", len(cached), query)
+            return cached
+
         try:
             response = self._request(
                 method="GET",
@@ -136,13 +311,173 @@ class HCPClient:
             )
 
             customers = response.get("customers", [])
-            logger.info(f"Found {len(customers)} customers matching '{query}'")
+            logger.info("Found %s customers matching '%s'", len(customers), query)
+            self._cache_set(("search", query), customers, Config.HCP_CACHE_TTL_SEARCH)
             return customers
 
         except HCPAPIError as e:
-            logger.error(f"Error searching customers: {e}")
+            logger.error("Error searching customers: %s", e)
             return []
 
+    def _list_page(
+        self,
+        collection: str,
+        page: int = 1,
+        page_size: int = 100,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of a collection endpoint (/customers, /leads, /jobs).
+
+        Args:
+            collection: Collection name, which is also the list key in the response
+            page: Page number (1-based)
+            page_size: Records per page
+            sort_by: Optional sort field (e.g. "updated_at")
+            sort_direction: Optional sort direction ("asc" or "desc")
+
+        Returns:
+            Response with the records under `collection`, 'page', 'total_pages'
+            and 'total_items', or None on failure
+        """
+        params: Dict[str, Any] = {"page": page, "page_size": page_size}
+        if sort_by:
+            params["sort_by"] = sort_by
+        if sort_direction:
+            params["sort_direction"] = sort_direction
+
+        try:
+            response = self._request(
+                method="GET",
+                endpoint=f"/{collection}",
+                params=params
+            )
+
+            logger.debug("Listed %s page %s: %s %s", collection, page, len(response.get(collection, [])), collection)
+            return response
+
+        except HCPAPIError as e:
+            logger.error("Error listing %s page %s: %s", collection, page, e)
+            return None
+
+    def list_customers(
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of customers.
+
+        Args:
+            page: Page number (1-based)
+            page_size: Customers per page
+            sort_by: Optional sort field (e.g. "updated_at")
+            sort_direction: Optional sort direction ("asc" or "desc")
+
+        Returns:
+            Response with 'customers', 'page', 'total_pages' and 'total_items',
+            or None on failure
+        """
+        return self._list_page("customers", page, page_size, sort_by, sort_direction)
+
+    def list_leads(
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get one page of leads (see list_customers; records are under 'leads')"""
+        return self._list_page("leads", page, page_size, sort_by, sort_direction)
+
+    def list_jobs(
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get one page of jobs (see list_customers; records are under 'jobs')"""
+        return self._list_page("jobs", page, page_size, sort_by, sort_direction)
+
+    def iter_records(
+        self,
+        collection: str,
+        page_size: int = 100,
+        sort_by: Optional[str] = None,
+        sort_direction: Optional[str] = None,
+        prefetch: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every record of a collection endpoint, page by page.
+
+        While the records of one page are consumed, the next page is fetched
+        on a background thread, so at most two pages are held in memory.
+        Stopping iteration early cancels the pending fetch.
+
+        Args:
+            collection: "customers", "leads" or "jobs"
+            page_size: Records per request
+            sort_by: Optional sort field (e.g. "updated_at")
+            sort_direction: Optional sort direction ("asc" or "desc")
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Record dictionaries
+
+        Raises:
+            HCPAPIError: If a page could not be fetched (records before it
+                have already been yielded)
+        """
+        def fetch(page: int) -> Dict[str, Any]:
+            response = self._list_page(collection, page, page_size, sort_by, sort_direction)
+            if response is None:
+                raise HCPAPIError(f"Listing {collection} failed at page {page}")
+            return response
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hcp-prefetch") if prefetch else None
+        try:
+            page = 1
+            response = fetch(page)
+            while True:
+                records = response.get(collection, [])
+                last_page = not records or page >= (response.get("total_pages") or page)
+
+                upcoming = None
+                if not last_page and executor is not None:
+                    upcoming = executor.submit(contextvars.copy_context().run, fetch, page + 1)
+
+                yield from records
+
+                if last_page:
+                    return
+                page += 1
+                response = upcoming.result() if upcoming is not None else fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_customers(self, page_size: int = 100, **options: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every customer (see iter_records for options).
+
+        Example:
+            >>> for customer in client.iter_customers(page_size=200):
+            ...     print(customer["id"])
+        """
+        return self.iter_records("customers", page_size, **options)
+
+    def iter_leads(self, page_size: int = 100, **options: Any) -> Iterator[Dict[str, Any]]:
+        """Stream every lead (see iter_records for options)"""
+        return self.iter_records("leads", page_size, **options)
+
+    def iter_jobs(self, page_size: int = 100, **options: Any) -> Iterator[Dict[str, Any]]:
+        """Stream every job (see iter_records for options)"""
+        return self.iter_records("jobs", page_size, **options)
+
     def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """
         Get customer by ID.
@@ -153,6 +488,10 @@ class HCPClient:
         Returns:
             Customer data or None if not found
         """
+        cached = self._cache_get(("customer", customer_id))
+        if cached is not None:
+            return cached
+
         try:
             response = self._request(
                 method="GET",
@@ -160,10 +499,11 @@ class HCPClient:
             )
             # GET endpoints might return data directly or wrapped
             # Return the response as-is
+            self._cache_set(("customer", customer_id), response, Config.HCP_CACHE_TTL_CUSTOMER)
             return response
 
         except HCPAPIError as e:
-            logger.error(f"Error getting customer {customer_id}: {e}")
+            logger.error("Error getting customer %s: %s", customer_id, e)
             return None
 
     def create_customer(self, customer_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -186,26 +526,27 @@ class HCPClient:
             ... })
         """
         try:
-            logger.debug(f"Creating customer with data: {customer_data}")
+            logger.debug("Creating customer with data: %s", customer_data)
             response = self._request(
                 method="POST",
                 endpoint="/customers",
                 json_data=customer_data
             )
 
-            logger.debug(f"Create customer response: {response}")
+            logger.debug("Create customer response: %s", response)
+            self._invalidate_customer()
 
             # HCP returns customer data directly (no wrapper key)
             # Response has 'id' field if successful
             if response and response.get("id"):
-                logger.info(f"Created customer: {response.get('id')}")
+                logger.info("Created customer: %s", response.get('id'))
                 return response
             else:
-                logger.warning(f"No customer ID in response. Full response: {response}")
+                logger.warning("No customer ID in response. Full response: %s", response)
                 return None
 
         except HCPAPIError as e:
-            logger.error(f"Error creating customer: {e}")
+            logger.error("Error creating customer: %s", e)
             return None
 
     def add_customer_address(
@@ -238,14 +579,15 @@ class HCPClient:
                 endpoint=f"/customers/{customer_id}/addresses",
                 json_data=address_data
             )
+            self._invalidate_customer(customer_id)
 
             address = response.get("address")
             if address:
-                logger.info(f"Added address to customer {customer_id}")
+                logger.info("Added address to customer %s", customer_id)
             return address
 
         except HCPAPIError as e:
-            logger.error(f"Error adding address to customer {customer_id}: {e}")
+            logger.error("Error adding address to customer %s: %s", customer_id, e)
             return None
 
     def create_job(self, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -276,14 +618,14 @@ class HCPClient:
 
             # HCP returns job data directly (no wrapper key)
             if response and response.get("id"):
-                logger.info(f"Created job: {response.get('id')}")
+                logger.info("Created job: %s", response.get('id'))
                 return response
             else:
-                logger.warning(f"No job ID in response. Full response: {response}")
+                logger.warning("No job ID in response. Full response: %s", response)
                 return None
 
         except HCPAPIError as e:
-            logger.error(f"Error creating job: {e}")
+            logger.error("Error creating job: %s", e)
             return None
 
     def add_job_note(
@@ -315,11 +657,11 @@ class HCPClient:
 
             note_data = response.get("note")
             if note_data:
-                logger.info(f"Added note to job {job_id}")
+                logger.info("Added note to job %s", job_id)
             return note_data
 
         except HCPAPIError as e:
-            logger.error(f"Error adding note to job {job_id}: {e}")
+            logger.error("Error adding note to job %s: %s", job_id, e)
             return None
 
     def create_lead(self, lead_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -340,24 +682,24 @@ class HCPClient:
             ... })
         """
         try:
-            logger.debug(f"Creating lead with data: {lead_data}")
+            logger.debug("Creating lead with data: %s", lead_data)
             response = self._request(
                 method="POST",
                 endpoint="/leads",
                 json_data=lead_data
             )
 
-            logger.debug(f"Create lead response: {response}")
+            logger.debug("Create lead response: %s", response)
             # HCP returns lead data directly (no wrapper key)
             if response and response.get("id"):
-                logger.info(f"Created lead: {response.get('id')}")
+                logger.info("Created lead: %s", response.get('id'))
                 return response
             else:
-                logger.warning(f"No lead ID in response. Full response: {response}")
+                logger.warning("No lead ID in response. Full response: %s", response)
                 return None
 
         except HCPAPIError as e:
-            logger.error(f"Error creating lead: {e}")
+            logger.error("Error creating lead: %s", e)
             return None
 
     def add_lead_line_items(
@@ -383,21 +725,21 @@ class HCPClient:
             ... }])
         """
         try:
-            logger.debug(f"Adding {len(line_items)} line items to lead {lead_id}")
+            logger.debug("Adding %s line items to lead %s", len(line_items), lead_id)
             response = self._request(
                 method="POST",
                 endpoint=f"/leads/{lead_id}/line_items",
                 json_data={"line_items": line_items}
             )
 
-            logger.debug(f"Add line items response: {response}")
+            logger.debug("Add line items response: %s", response)
             created_items = response.get("line_items", [])
             if created_items:
-                logger.info(f"Added {len(created_items)} line items to lead {lead_id}")
+                logger.info("Added %s line items to lead %s", len(created_items), lead_id)
             return created_items
 
         except HCPAPIError as e:
-            logger.error(f"Error adding line items to lead {lead_id}: {e}")
+            logger.error("Error adding line items to lead %s: %s", lead_id, e)
             return None
 
     def add_lead_note(
@@ -429,11 +771,11 @@ class HCPClient:
 
             note_data = response.get("note")
             if note_data:
-                logger.info(f"Added note to lead {lead_id}")
+                logger.info("Added note to lead %s", lead_id)
             return note_data
 
         except HCPAPIError as e:
-            logger.error(f"Error adding note to lead {lead_id}: {e}")
+            logger.error("Error adding note to lead %s: %s", lead_id, e)
             return None
 
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
@@ -456,9 +798,10 @@ class HCPClient:
             return response
 
         except HCPAPIError as e:
-            logger.error(f"Error getting job {job_id}: {e}")
+            logger.error("Error getting job %s: %s", job_id, e)
             return None
 
+    @time_stage("get_addresses")
     def get_customer_addresses(self, customer_id: str) -> List[Dict[str, Any]]:
         """
         Get all addresses for a customer.
@@ -469,6 +812,11 @@ class HCPClient:
         Returns:
             List of address dictionaries with IDs
         """
+        cached = self._cache_get(("addresses", customer_id))
+        if cached is not None:
+            logger.info("Found %s addresses for customer %s (cached)", len(cached), customer_id)
+            return cached
+
         try:
             response = self._request(
                 method="GET",
@@ -476,11 +824,12 @@ class HCPClient:
             )
 
             addresses = response.get("addresses", [])
-            logger.info(f"Found {len(addresses)} addresses for customer {customer_id}")
+            logger.info("Found %s addresses for customer %s", len(addresses), customer_id)
+            self._cache_set(("addresses", customer_id), addresses, Config.HCP_CACHE_TTL_ADDRESSES)
             return addresses
 
         except HCPAPIError as e:
-            logger.error(f"Error getting addresses for customer {customer_id}: {e}")
+            logger.error("Error getting addresses for customer %s: %s", customer_id, e)
             return []
 
     def get_address_by_id(
@@ -498,17 +847,22 @@ class HCPClient:
         Returns:
             Address dictionary with all fields, or None on failure
         """
+        cached = self._cache_get(("address", customer_id, address_id))
+        if cached is not None:
+            return cached
+
         try:
             response = self._request(
                 method="GET",
                 endpoint=f"/customers/{customer_id}/addresses/{address_id}"
             )
 
-            logger.info(f"Retrieved address {address_id} for customer {customer_id}")
+            logger.info("Retrieved address %s for customer %s", address_id, customer_id)
+            self._cache_set(("address", customer_id, address_id), response, Config.HCP_CACHE_TTL_ADDRESSES)
             return response
 
         except HCPAPIError as e:
-            logger.error(f"Error getting address {address_id} for customer {customer_id}: {e}")
+            logger.error("Error getting address %s for customer %s: %s", address_id, customer_id, e)
             return None
 
     def update_customer(
@@ -532,12 +886,13 @@ class HCPClient:
                 endpoint=f"/customers/{customer_id}",
                 json_data=customer_data
             )
+            self._invalidate_customer(customer_id)
 
             customer = response.get("customer")
             if customer:
-                logger.info(f"Updated customer: {customer_id}")
+                logger.info("Updated customer: %s", customer_id)
             return customer
 
         except HCPAPIError as e:
-            logger.error(f"Error updating customer {customer_id}: {e}")
+            logger.error("Error updating customer %s: %s", customer_id, e)
             return None
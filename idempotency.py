@@ -0,0 +1,256 @@
+"""
+Duplicate-delivery suppression for form submissions.
+
+Elfsight retries a webhook delivery when our response times out, which
+would otherwise create a second customer and lead. Submissions are keyed
+by an explicit submission ID or a content hash of the normalized form
+data; a repeat inside the time window gets the first result back, and a
+repeat that arrives while the first is still running waits for it.
+
+Claims and results are kept in SQLite, so all worker processes on a host
+(WEB_CONCURRENCY > 1) see each other's submissions. A repeat that is still
+waiting after IDEMPOTENCY_WAIT_TIMEOUT raises SubmissionInProgress rather
+than running the submission a second time.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks while a repeat waits for the first delivery
+_POLL_INTERVAL = 0.2
+
+
+class SubmissionInProgress(Exception):
+    """A repeat delivery timed out waiting for the first one to finish"""
+
+
+def make_idempotency_key(form_data: Dict[str, Any], submission_id: Optional[str] = None) -> str:
+    """
+    Build the idempotency key for a submission.
+
+    Args:
+        form_data: Parsed form data
+        submission_id: Explicit submission ID (e.g. Idempotency-Key header), used if given
+
+    Returns:
+        Key string
+    """
+    if submission_id:
+        return f"id:{submission_id}"
+
+    canonical = json.dumps(_normalize(form_data), sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize form values so trivial differences hash the same"""
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v not in (None, "", [])}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class IdempotencyStore:
+    """SQLite-backed, time-windowed record of submission claims and results"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        window_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        wait_timeout: Optional[float] = None,
+        claim_ttl: Optional[float] = None
+    ):
+        """
+        Initialize idempotency store.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to Config.IDEMPOTENCY_DB_PATH)
+            window_seconds: How long a completed result is replayed for repeats
+                (defaults to Config.IDEMPOTENCY_WINDOW_SECONDS)
+            max_entries: Maximum remembered completed submissions, oldest
+                dropped first (defaults to Config.IDEMPOTENCY_MAX_ENTRIES)
+            wait_timeout: Seconds a duplicate waits for an in-flight first
+                attempt (defaults to Config.IDEMPOTENCY_WAIT_TIMEOUT)
+            claim_ttl: Seconds after which an unfinished claim is considered
+                abandoned (e.g. its process died) and may be taken over
+                (defaults to Config.IDEMPOTENCY_CLAIM_TTL)
+        """
+        self.db_path = db_path or Config.IDEMPOTENCY_DB_PATH
+        self.window_seconds = window_seconds if window_seconds is not None else Config.IDEMPOTENCY_WINDOW_SECONDS
+        self.max_entries = max_entries or Config.IDEMPOTENCY_MAX_ENTRIES
+        self.wait_timeout = wait_timeout if wait_timeout is not None else Config.IDEMPOTENCY_WAIT_TIMEOUT
+        self.claim_ttl = claim_ttl if claim_ttl is not None else Config.IDEMPOTENCY_CLAIM_TTL
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's database connection (one per thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly where needed
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        """Create the submissions table and drop expired entries"""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                key TEXT PRIMARY KEY,
+                claimed_at REAL NOT NULL,
+                completed_at REAL,
+                result TEXT
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_completed ON submissions (completed_at)")
+        self.purge_expired()
+
+    def run(
+        self,
+        key: str,
+        func: Callable[[], Any],
+        is_success: Callable[[Any], bool] = lambda result: True,
+        dump: Callable[[Any], Any] = lambda result: result,
+        load: Callable[[Any], Any] = lambda data: data
+    ) -> Tuple[Any, bool]:
+        """
+        Run func once per key within the window.
+
+        Only successful results are remembered; after a failure the next
+        repeat runs func again.
+
+        Args:
+            key: Idempotency key
+            func: Work to run for the first delivery
+            is_success: Decides whether a result should be replayed to repeats
+            dump: Converts a result to JSON-serializable data for storage
+            load: Converts stored data back to a result
+
+        Returns:
+            Tuple of (result, is_duplicate)
+
+        Raises:
+            SubmissionInProgress: The first delivery was still running after wait_timeout
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            token, stored = self._claim(key)
+            if token is not None:
+                break
+            if stored is not None:
+                logger.info("Duplicate submission %s...: returning prior result", key[:20])
+                return load(stored), True
+            if time.monotonic() >= deadline:
+                logger.warning("Duplicate submission %s... still running after %ss", key[:20], self.wait_timeout)
+                raise SubmissionInProgress(key)
+            time.sleep(_POLL_INTERVAL)
+
+        try:
+            result = func()
+        except BaseException:
+            self._release(key, token)
+            raise
+
+        try:
+            if is_success(result):
+                self._complete(key, token, dump(result))
+            else:
+                self._release(key, token)
+        except sqlite3.Error as e:
+            # The work is done; a failed write only affects later repeats
+            logger.warning("Could not record result of submission %s...: %s", key[:20], e)
+
+        return result, False
+
+    def _claim(self, key: str) -> Tuple[Optional[float], Any]:
+        """
+        Claim a key for processing.
+
+        Returns:
+            Tuple of (claim token or None, stored result or None); neither is
+            set while another delivery holds the claim
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT claimed_at, completed_at, result FROM submissions WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                claimed_at, completed_at, result = row
+                if completed_at is not None and completed_at >= now - self.window_seconds:
+                    conn.execute("COMMIT")
+                    return None, json.loads(result)
+                if completed_at is None and claimed_at >= now - self.claim_ttl:
+                    conn.execute("COMMIT")
+                    return None, None
+                if completed_at is None:
+                    logger.warning("Taking over abandoned claim on submission %s...", key[:20])
+
+            conn.execute(
+                "INSERT INTO submissions (key, claimed_at, completed_at, result) VALUES (?, ?, NULL, NULL) "
+                "ON CONFLICT(key) DO UPDATE SET claimed_at = excluded.claimed_at, completed_at = NULL, result = NULL",
+                (key, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return now, None
+
+    def _complete(self, key: str, token: float, data: Any) -> None:
+        """Record a successful result and drop the oldest completed entries over max_entries"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE submissions SET completed_at = ?, result = ? WHERE key = ? AND claimed_at = ?",
+            (time.time(), json.dumps(data), key, token)
+        )
+        # Only completed entries are evicted; in-flight claims stay until released
+        conn.execute(
+            "DELETE FROM submissions WHERE key IN ("
+            "SELECT key FROM submissions WHERE completed_at IS NOT NULL "
+            "ORDER BY completed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def _release(self, key: str, token: float) -> None:
+        """Forget a failed attempt so the next repeat runs it again"""
+        self._connect().execute(
+            "DELETE FROM submissions WHERE key = ? AND claimed_at = ? AND completed_at IS NULL",
+            (key, token)
+        )
+
+    def purge_expired(self) -> int:
+        """
+        Drop results older than the window and abandoned claims.
+
+        Returns:
+            Number of entries dropped
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "DELETE FROM submissions WHERE completed_at < ? OR (completed_at IS NULL AND claimed_at < ?)",
+            (now - self.window_seconds, now - self.claim_ttl)
+        )
+        if cursor.rowcount:
+            logger.info("Dropped %s expired idempotency entries", cursor.rowcount)
+        return cursor.rowcount
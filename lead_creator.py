@@ -2,17 +2,40 @@
 Lead creation orchestration.
 
 Handles the complete workflow of creating leads/jobs from Elfsight form submissions.
+The workflow runs as a pipeline of stages (PIPELINE_STAGES); the state after
+each stage is checkpointed per submission, so a retried submission resumes at
+the stage that failed instead of repeating HCP writes that already succeeded.
 """
 
+import copy
 import logging
-from typing import Dict, Any, Optional, List
-from hcp_client import HCPClient
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+from hcp_client import HCPAPIError, HCPClient
 from customer_matcher import CustomerMatcher, MatchResult
-from utils import normalize_phone, parse_name, parse_address, format_note, sanitize_string
+from customer_index import CustomerIndex
+from idempotency import IdempotencyStore, SubmissionInProgress, make_idempotency_key
+from checkpoints import CheckpointStore
+from metrics import time_stage
+from form_mapping import get_field_mapper
+from utils import normalize_phone, parse_name, parse_address, compare_address_to_candidates, format_lead_note, sanitize_string
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Lead pipeline stages, in order (each is a LeadCreator._stage_<name> method and
+# a lead_stage_duration_seconds label); parsing happens before the pipeline,
+# when the webhook is received
+PIPELINE_STAGES = (
+    "normalize",
+    "match",
+    "ensure_customer",
+    "ensure_address",
+    "build_payload",
+    "create_lead",
+)
+
 
 class LeadCreationResult:
     """Result of lead creation operation"""
@@ -24,7 +47,12 @@ class LeadCreationResult:
         job_id: Optional[str] = None,
         message: str = "",
         warnings: Optional[list] = None,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        api_calls_avoided: int = 0,
+        duplicate: bool = False,
+        customer_created: bool = False,
+        retryable: bool = True,
+        in_progress: bool = False
     ):
         self.success = success
         self.customer_id = customer_id
@@ -32,6 +60,11 @@ class LeadCreationResult:
         self.message = message
         self.warnings = warnings or []
         self.error = error
+        self.api_calls_avoided = api_calls_avoided  # HCP reads skipped by reusing address data
+        self.duplicate = duplicate  # True if this is the replayed result of an earlier delivery
+        self.customer_created = customer_created  # True if customer_id was created for this submission
+        self.retryable = retryable  # False if HCP rejected the submission (trying again can't succeed)
+        self.in_progress = in_progress  # True if an earlier delivery is still being processed
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -41,24 +74,56 @@ class LeadCreationResult:
             "job_id": self.job_id,
             "message": self.message,
             "warnings": self.warnings,
-            "error": self.error
+            "error": self.error,
+            "api_calls_avoided": self.api_calls_avoided,
+            "duplicate": self.duplicate,
+            "customer_created": self.customer_created,
+            "retryable": self.retryable,
+            "in_progress": self.in_progress
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LeadCreationResult":
+        """Create from a dictionary produced by to_dict"""
+        return cls(**data)
+
 
 class LeadCreator:
     """Handles lead creation from form submissions"""
 
-    def __init__(self, hcp_client: Optional[HCPClient] = None):
+    def __init__(
+        self,
+        hcp_client: Optional[HCPClient] = None,
+        customer_index: Optional[CustomerIndex] = None,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        checkpoint_store: Optional[CheckpointStore] = None
+    ):
         """
         Initialize lead creator.
 
         Args:
             hcp_client: HCPClient instance (creates new one if not provided)
+            customer_index: Local customer index (opened from Config.CUSTOMER_INDEX_PATH
+                if not provided and the path is set)
+            idempotency_store: Store used to suppress duplicate deliveries
+                (created from Config.IDEMPOTENCY_* if not provided and enabled)
+            checkpoint_store: Store for pipeline checkpoints
+                (created from Config.PIPELINE_CHECKPOINT_* if not provided and enabled)
         """
         self.hcp_client = hcp_client or HCPClient()
-        self.matcher = CustomerMatcher(self.hcp_client)
-
-    def parse_elfsight_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if customer_index is None and Config.CUSTOMER_INDEX_PATH:
+            customer_index = CustomerIndex()
+        self.customer_index = customer_index
+        self.matcher = CustomerMatcher(self.hcp_client, customer_index=self.customer_index)
+        if idempotency_store is None and Config.IDEMPOTENCY_ENABLED:
+            idempotency_store = IdempotencyStore()
+        self.idempotency_store = idempotency_store
+        if checkpoint_store is None and Config.PIPELINE_CHECKPOINTS_ENABLED:
+            checkpoint_store = CheckpointStore()
+        self.checkpoint_store = checkpoint_store
+
+    @time_stage("parse")
+    def parse_elfsight_payload(self, payload: Dict[str, Any], form_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Parse Elfsight webhook payload into structured form data.
 
@@ -71,6 +136,7 @@ class LeadCreator:
 
         Args:
             payload: Raw Elfsight webhook payload
+            form_id: Optional form ID selecting a per-form field mapping
 
         Returns:
             Parsed form data dictionary
@@ -79,58 +145,8 @@ class LeadCreator:
 
         # If payload is a list (Elfsight format)
         if isinstance(payload, list):
-            for field in payload:
-                field_name = field.get("name", "").lower().strip()
-                field_value = field.get("value", "")
-                field_type = field.get("type", "")
-
-                # Map field names to our standard keys
-                if "first name" in field_name or field_name == "first_name":
-                    form_data["first_name"] = field_value
-                elif "last name" in field_name or field_name == "last_name":
-                    form_data["last_name"] = field_value
-                elif "email" in field_name:
-                    form_data["email"] = field_value
-                elif "phone" in field_name:
-                    form_data["phone"] = field_value
-                elif "street address line 2" in field_name:
-                    form_data["street_line_2"] = field_value
-                elif "street address" in field_name:
-                    form_data["street"] = field_value
-                elif "city" in field_name:
-                    form_data["city"] = field_value
-                elif "state" in field_name and "service" not in field_name:
-                    # Capture state field (but not "service_request_details")
-                    form_data["state"] = field_value
-                elif "postal" in field_name or "zip" in field_name:
-                    form_data["zip"] = field_value
-                elif "new or existing" in field_name or "are you" in field_name:
-                    form_data["customer_type"] = field_value
-                elif "preferred method" in field_name or "contact method" in field_name:
-                    form_data["preferred_contact"] = field_value
-                elif "sms" in field_name and "consent" in field_name:
-                    # Consent checkbox - value is boolean or string "true"/"false"
-                    form_data["sms_consent"] = field_value in [True, "true", "True", "yes", "Yes"]
-                elif "service needed" in field_name:
-                    form_data["service_needed"] = field_value
-                elif "service details" in field_name:
-                    # Multi-select field - value might be array or comma-separated string
-                    if isinstance(field_value, list):
-                        form_data["service_details"] = field_value
-                    elif field_value:
-                        form_data["service_details"] = [v.strip() for v in field_value.split(",")]
-                elif "service request details" in field_name or "request details" in field_name:
-                    form_data["service_request_details"] = field_value
-                elif "images" in field_name or "plans" in field_name or "specs" in field_name or field_type == "file":
-                    # File attachments - value might be array of URLs or single URL
-                    if isinstance(field_value, list):
-                        form_data["file_attachments"] = field_value
-                    elif field_value:
-                        form_data["file_attachments"] = [field_value]
-                else:
-                    # Store other fields with their original name (cleaned)
-                    clean_key = field_name.replace(" ", "_")
-                    form_data[clean_key] = field_value
+            # Map field names to our standard keys
+            form_data = get_field_mapper(form_id).parse(payload)
 
         # If payload is a dict (alternative format for testing)
         elif isinstance(payload, dict):
@@ -154,192 +170,327 @@ class LeadCreator:
             if address_parts:
                 form_data["address"] = ", ".join(address_parts)
 
-        logger.info(f"Parsed form data: {list(form_data.keys())}")
+        logger.info("Parsed form data: %s", list(form_data.keys()))
         return form_data
 
-    def create_lead(self, form_data: Dict[str, Any]) -> LeadCreationResult:
+    def create_lead(
+        self,
+        form_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        customer_id: Optional[str] = None
+    ) -> LeadCreationResult:
         """
         Create lead from form submission.
 
+        Repeat deliveries of the same submission (same idempotency key, or
+        same normalized form data) within the idempotency window return the
+        first successful result instead of creating another customer and lead.
+        A repeat that arrives while the first is still running waits for it;
+        if the first is still running after IDEMPOTENCY_WAIT_TIMEOUT, the
+        repeat fails with in_progress set instead of being processed again.
+
+        A submission whose earlier attempt failed part-way resumes from its
+        checkpoint at the failed stage (see PIPELINE_STAGES).
+
         Args:
             form_data: Parsed form data
+            idempotency_key: Optional submission ID; defaults to a hash of form_data
+            customer_id: Customer an earlier attempt at this submission created
+                (result.customer_created); matching and customer creation are
+                skipped so a retry doesn't create a second customer
 
         Returns:
             LeadCreationResult with outcome
         """
+        key = make_idempotency_key(form_data, idempotency_key)
+        if self.idempotency_store is None:
+            return self._create_lead(form_data, key, customer_id)
+
         try:
-            # Extract and normalize data
-            raw_phone = form_data.get("phone", "")
-            email = sanitize_string(form_data.get("email", "")).lower()
-
-            # Get name from first_name + last_name or fallback to "name"
-            first_name = form_data.get("first_name", "")
-            last_name = form_data.get("last_name", "")
-            name = form_data.get("name", "")
-            if not name and (first_name or last_name):
-                name = f"{first_name} {last_name}".strip()
-            elif not first_name and name:
-                first_name, last_name = parse_name(name)
-
-            # Address and other fields
-            raw_address = form_data.get("address", "")
-            customer_type = sanitize_string(form_data.get("customer_type", "")).lower()
-
-            # New fields for notifications
-            sms_consent = form_data.get("sms_consent", False)
-
-            # Normalize phone
-            phone = normalize_phone(raw_phone, Config.DEFAULT_AREA_CODE)
-            if not phone:
-                logger.warning(f"Could not normalize phone: {raw_phone}")
-
-            # Parse address - check if we have individual fields or combined string
-            if form_data.get("street") or form_data.get("city") or form_data.get("zip"):
-                # Use individual fields directly (better than parsing)
-                parsed_address = {
-                    "street": form_data.get("street"),
-                    "city": form_data.get("city"),
-                    "state": form_data.get("state") or Config.DEFAULT_STATE,  # Default to CA
-                    "zip": form_data.get("zip")
-                }
-            else:
-                # Fall back to parsing combined address string
-                parsed_address = parse_address(raw_address)
+            result, is_duplicate = self.idempotency_store.run(
+                key,
+                lambda: self._create_lead(form_data, key, customer_id),
+                is_success=lambda r: r.success,
+                dump=LeadCreationResult.to_dict,
+                load=LeadCreationResult.from_dict
+            )
+        except SubmissionInProgress:
+            return LeadCreationResult(
+                success=False,
+                error="Submission is already being processed",
+                duplicate=True,
+                in_progress=True
+            )
+
+        if is_duplicate:
+            result = copy.copy(result)
+            result.duplicate = True
+        return result
+
+    def _create_lead(
+        self,
+        form_data: Dict[str, Any],
+        key: str,
+        created_customer_id: Optional[str] = None
+    ) -> LeadCreationResult:
+        """
+        Run the lead creation pipeline for one submission.
 
-            # Determine if customer indicated they're existing
-            is_existing_customer = "existing" in customer_type or "returning" in customer_type
+        Each stage reads and extends a state dictionary, which is checkpointed
+        after the stage completes. Stages already recorded in the submission's
+        checkpoint are skipped.
 
-            logger.info(f"Processing lead: {name} ({email}, {phone}), Existing: {is_existing_customer}")
+        Args:
+            form_data: Parsed form data
+            key: Idempotency key the checkpoint is stored under
+            created_customer_id: Customer created by an earlier attempt (see create_lead)
 
-            # Find matching customer
-            match_result = self.matcher.find_matching_customer(
-                phone=phone,
-                email=email,
-                name=name,
-                address=parsed_address,
-                is_existing_customer=is_existing_customer
+        Returns:
+            LeadCreationResult with outcome
+        """
+        state = self._load_checkpoint(key) or {"done": []}
+        if state["done"]:
+            resume_at = next((stage for stage in PIPELINE_STAGES if stage not in state["done"]), None)
+            logger.info("Resuming submission at stage '%s' from checkpoint", resume_at)
+        elif created_customer_id:
+            # An earlier attempt created the customer; continue as for a new customer
+            state.update(
+                match=MatchResult(match_type="none", confidence=0.0, should_create_new=True).to_dict(),
+                customer_id=created_customer_id,
+                customer_created=True,
+                done=["match", "ensure_customer"]
             )
+            logger.info("Resuming with customer %s created by an earlier attempt", created_customer_id)
 
-            logger.info(f"Match result: {match_result.match_type}, confidence: {match_result.confidence:.0%}")
-
-            # Determine customer ID
-            customer_id = None
-            new_address_id = None  # Track newly created address ID
-
-            if match_result.should_create_new:
-                # Create new customer
-                logger.info("Creating new customer")
-                customer_id = self._create_customer(
-                    first_name=first_name,
-                    last_name=last_name,
-                    email=email,
-                    phone=phone,
-                    address=parsed_address,
-                    sms_consent=sms_consent
-                )
+        try:
+            for stage in PIPELINE_STAGES:
+                if stage in state["done"]:
+                    continue
 
-                if not customer_id:
-                    return LeadCreationResult(
-                        success=False,
-                        error="Failed to create customer"
-                    )
+                with time_stage(stage):
+                    failure = getattr(self, f"_stage_{stage}")(form_data, state)
+                if failure is not None:
+                    return failure
 
-            else:
-                # Use existing customer
-                customer_id = match_result.customer_id
-                logger.info(f"Using existing customer: {customer_id}")
-
-                # Check if we need to add new address and capture the address_id
-                if parsed_address and match_result.customer_data:
-                    if self.matcher.should_create_new_address(match_result.customer_data, parsed_address):
-                        new_address_id = self._add_address_to_customer(customer_id, parsed_address)
-                        if new_address_id:
-                            logger.info(f"Created new address with ID: {new_address_id}")
-
-            # Build line items before creating lead
-            line_items = None
-            service_details = form_data.get("service_details", [])
-            if service_details:
-                logger.info(f"Building {len(service_details)} line items for lead")
-                service_request_details = form_data.get("service_request_details", "")
-                line_items = self._build_line_items(
-                    service_details=service_details,
-                    service_request_details=service_request_details
-                )
+                state["done"].append(stage)
+                self._save_checkpoint(key, stage, state)
+
+        except Exception as e:
+            logger.exception("Error creating lead: %s", e)
+            return LeadCreationResult(
+                success=False,
+                customer_id=state.get("customer_id"),
+                error=str(e),
+                customer_created=state.get("customer_created", False),
+                retryable=e.retryable if isinstance(e, HCPAPIError) else True
+            )
 
-            # Build note text before creating lead
-            from utils import format_lead_note
-            note_text = format_lead_note(form_data, match_result.to_dict())
+        self._delete_checkpoint(key)
+
+        match_result = MatchResult(**state["match"])
+        return LeadCreationResult(
+            success=True,
+            customer_id=state["customer_id"],
+            job_id=state["lead_id"],  # Using job_id field for lead_id (backwards compatible)
+            message=f"Lead created successfully (match type: {match_result.match_type})",
+            warnings=match_result.warnings,
+            api_calls_avoided=state["api_calls_avoided"],
+            customer_created=state.get("customer_created", False)
+        )
+
+    def _load_checkpoint(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the saved pipeline state of a submission, if any"""
+        if self.checkpoint_store is None:
+            return None
+        try:
+            return self.checkpoint_store.load(key)
+        except sqlite3.Error as e:
+            logger.warning("Could not load pipeline checkpoint: %s", e)
+            return None
 
-            # Determine address_id and address fields for lead
-            address_id = None
-            address_for_lead = None
+    def _save_checkpoint(self, key: str, stage: str, state: Dict[str, Any]) -> None:
+        """Save the pipeline state after a stage (a failed save only loses the resume point)"""
+        if self.checkpoint_store is None:
+            return
+        try:
+            self.checkpoint_store.save(key, stage, state)
+        except sqlite3.Error as e:
+            logger.warning("Could not save pipeline checkpoint after '%s': %s", stage, e)
+
+    def _delete_checkpoint(self, key: str) -> None:
+        """Drop the checkpoint of a submission whose lead was created"""
+        if self.checkpoint_store is None:
+            return
+        try:
+            self.checkpoint_store.delete(key)
+        except sqlite3.Error as e:
+            logger.warning("Could not delete pipeline checkpoint: %s", e)
+
+    def _stage_normalize(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Extract and normalize contact details and the service address"""
+        raw_phone = form_data.get("phone", "")
+        email = sanitize_string(form_data.get("email", "")).lower()
+
+        # Get name from first_name + last_name or fallback to "name"
+        first_name = form_data.get("first_name", "")
+        last_name = form_data.get("last_name", "")
+        name = form_data.get("name", "")
+        if not name and (first_name or last_name):
+            name = f"{first_name} {last_name}".strip()
+        elif not first_name and name:
+            first_name, last_name = parse_name(name)
+
+        # Address and other fields
+        raw_address = form_data.get("address", "")
+        customer_type = sanitize_string(form_data.get("customer_type", "")).lower()
+
+        # Normalize phone
+        phone = normalize_phone(raw_phone, Config.DEFAULT_AREA_CODE)
+        if not phone:
+            logger.warning("Could not normalize phone: %s", raw_phone)
+
+        # Parse address - check if we have individual fields or combined string
+        if form_data.get("street") or form_data.get("city") or form_data.get("zip"):
+            # Use individual fields directly (better than parsing)
+            parsed_address = {
+                "street": form_data.get("street"),
+                "city": form_data.get("city"),
+                "state": form_data.get("state") or Config.DEFAULT_STATE,  # Default to CA
+                "zip": form_data.get("zip")
+            }
+        else:
+            # Fall back to parsing combined address string
+            parsed_address = parse_address(raw_address)
+
+        # Determine if customer indicated they're existing
+        is_existing_customer = "existing" in customer_type or "returning" in customer_type
+
+        logger.info("Processing lead: %s (%s, %s), Existing: %s", name, email, phone, is_existing_customer)
+
+        state.update(
+            first_name=first_name,
+            last_name=last_name,
+            name=name,
+            email=email,
+            phone=phone,
+            parsed_address=parsed_address,
+            is_existing_customer=is_existing_customer,
+            sms_consent=form_data.get("sms_consent", False)
+        )
+        return None
 
-            # For NEW customers: use parsed address directly (no address_id)
-            if match_result.should_create_new:
-                address_for_lead = self._build_address_dict(parsed_address)
-                logger.info("Using parsed address for new customer lead")
+    def _stage_match(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Find the HCP customer the submission belongs to"""
+        match_result = self.matcher.find_matching_customer(
+            phone=state["phone"],
+            email=state["email"],
+            name=state["name"],
+            address=state["parsed_address"],
+            is_existing_customer=state["is_existing_customer"]
+        )
+
+        logger.info("Match result: %s, confidence: %.0f%%", match_result.match_type, match_result.confidence * 100)
+        state["match"] = match_result.to_dict()
+        return None
 
-            # For EXISTING customers: get address_id and fetch full address details
-            else:
-                # If we just created a new address, use that
-                if new_address_id:
-                    address_id = new_address_id
-                    logger.info(f"Using newly created address_id: {address_id}")
-                # Otherwise, try to find matching existing address
-                elif customer_id and parsed_address:
-                    # Fetch customer's addresses with IDs from API
-                    customer_addresses = self.hcp_client.get_customer_addresses(customer_id)
-                    if customer_addresses:
-                        matched_address = self._find_matching_address_from_list(
-                            customer_addresses,
-                            parsed_address
-                        )
-                        if matched_address:
-                            address_id = matched_address.get("id")
-                            logger.info(f"Using existing address_id: {address_id}")
-
-                # If we have an address_id, fetch the full address details
-                if address_id and customer_id:
-                    full_address = self.hcp_client.get_address_by_id(customer_id, address_id)
-                    if full_address:
-                        address_for_lead = self._build_address_dict_from_api(full_address)
-                        logger.info("Fetched full address details for lead")
-
-            # Create LEAD with line items, note, and address included
-            logger.info(f"Creating lead for customer {customer_id}")
-            lead_id = self._create_lead_with_job_type(
-                customer_id=customer_id,
-                form_data=form_data,
-                line_items=line_items,
-                note=note_text,
-                address_id=address_id,
-                address=address_for_lead
+    def _stage_ensure_customer(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Create the customer unless an existing one matched"""
+        match = state["match"]
+
+        if match["should_create_new"]:
+            logger.info("Creating new customer")
+            customer_id = self._create_customer(
+                first_name=state["first_name"],
+                last_name=state["last_name"],
+                email=state["email"],
+                phone=state["phone"],
+                address=state["parsed_address"],
+                sms_consent=state["sms_consent"]
             )
 
-            if not lead_id:
+            if not customer_id:
                 return LeadCreationResult(
                     success=False,
-                    customer_id=customer_id,
-                    error="Failed to create lead"
+                    error="Failed to create customer",
+                    retryable=self._hcp_failure_retryable()
                 )
+            state["customer_created"] = True
 
-            # Success!
-            return LeadCreationResult(
-                success=True,
-                customer_id=customer_id,
-                job_id=lead_id,  # Using job_id field for lead_id (backwards compatible)
-                message=f"Lead created successfully (match type: {match_result.match_type})",
-                warnings=match_result.warnings
+        else:
+            customer_id = match["customer_id"]
+            logger.info("Using existing customer: %s", customer_id)
+
+        state["customer_id"] = customer_id
+        return None
+
+    def _stage_ensure_address(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Pick the lead's service address, adding it to an existing customer if new"""
+        match = state["match"]
+        address_id = None
+        api_calls_avoided = 0
+
+        # For NEW customers: use parsed address directly (no address_id)
+        if match["should_create_new"]:
+            address_for_lead = self._build_address_dict(state["parsed_address"])
+            logger.info("Using parsed address for new customer lead")
+
+        # For EXISTING customers: reuse a matching address or add a new one
+        else:
+            address_id, address_for_lead, api_calls_avoided = self._resolve_existing_address(
+                customer_id=state["customer_id"],
+                customer_data=match["customer_data"],
+                parsed_address=state["parsed_address"]
             )
 
-        except Exception as e:
-            logger.exception(f"Error creating lead: {e}")
+        state.update(address_id=address_id, address_for_lead=address_for_lead, api_calls_avoided=api_calls_avoided)
+        return None
+
+    def _stage_build_payload(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Build the create-lead request with line items, note and address"""
+        line_items = None
+        service_details = form_data.get("service_details", [])
+        if service_details:
+            logger.info("Building %s line items for lead", len(service_details))
+            service_request_details = form_data.get("service_request_details", "")
+            line_items = self._build_line_items(
+                service_details=service_details,
+                service_request_details=service_request_details
+            )
+
+        state["lead_data"] = self._build_lead_data(
+            customer_id=state["customer_id"],
+            form_data=form_data,
+            line_items=line_items,
+            note=format_lead_note(form_data, state["match"]),
+            address_id=state["address_id"],
+            address=state["address_for_lead"]
+        )
+        return None
+
+    def _stage_create_lead(self, form_data: Dict[str, Any], state: Dict[str, Any]) -> Optional[LeadCreationResult]:
+        """Create the lead in HCP"""
+        logger.info("Creating lead for customer %s", state['customer_id'])
+        result = self.hcp_client.create_lead(state["lead_data"])
+        lead_id = result.get("id") if result else None
+
+        if not lead_id:
             return LeadCreationResult(
                 success=False,
-                error=str(e)
+                customer_id=state["customer_id"],
+                error="Failed to create lead",
+                customer_created=state.get("customer_created", False),
+                retryable=self._hcp_failure_retryable()
             )
 
+        state["lead_id"] = lead_id
+        return None
+
+    def _hcp_failure_retryable(self) -> bool:
+        """Whether the HCP write that just failed could succeed if tried again"""
+        error = self.hcp_client.last_error()
+        return error.retryable if error is not None else True
+
+    @time_stage("create_customer")
     def _create_customer(
         self,
         first_name: str,
@@ -414,6 +565,12 @@ class LeadCreator:
 
         result = self.hcp_client.create_customer(customer_data)
         if result:
+            # Write through so the next submission from this customer hits the index
+            if self.customer_index is not None:
+                try:
+                    self.customer_index.upsert_customers([result])
+                except sqlite3.Error as e:
+                    logger.warning("Could not add customer to index: %s", e)
             return result.get("id")
         return None
 
@@ -479,6 +636,57 @@ class LeadCreator:
 
         return address if address else None
 
+    def _resolve_existing_address(
+        self,
+        customer_id: Optional[str],
+        customer_data: Optional[Dict[str, Any]],
+        parsed_address: Dict[str, Optional[str]]
+    ) -> Tuple[Optional[str], Optional[Dict[str, str]], int]:
+        """
+        Resolve the service address for an existing customer's lead.
+
+        Reuses addresses already embedded in the matched customer record
+        (customer search results include them) and only fetches the address
+        list when it is missing. The address dicts returned by the list and by
+        address creation are complete, so no single address is re-fetched.
+
+        Args:
+            customer_id: Existing customer ID
+            customer_data: Matched customer record
+            parsed_address: Parsed address from form
+
+        Returns:
+            Tuple of (address_id, address dict for lead, HCP reads avoided)
+        """
+        if not customer_id or not parsed_address or not any(parsed_address.values()):
+            return None, None, 0
+
+        calls_avoided = 0
+
+        known_addresses = (customer_data or {}).get("addresses")
+        if known_addresses is None:
+            known_addresses = self.hcp_client.get_customer_addresses(customer_id)
+        else:
+            calls_avoided += 1
+            logger.info("Reusing %s addresses from customer record", len(known_addresses))
+
+        if self.matcher.should_create_new_address({"addresses": known_addresses}, parsed_address):
+            address = self._add_address_to_customer(customer_id, parsed_address)
+            if address:
+                logger.info("Created new address with ID: %s", address.get('id'))
+        else:
+            address = self._find_matching_address_from_list(known_addresses, parsed_address)
+            if address:
+                logger.info("Using existing address_id: %s", address.get('id'))
+
+        if not address:
+            return None, None, calls_avoided
+
+        # We already hold the full address; skip the get_address_by_id round trip
+        calls_avoided += 1
+        logger.info("Resolved lead address without re-fetching (%s HCP calls avoided)", calls_avoided)
+        return address.get("id"), self._build_address_dict_from_api(address), calls_avoided
+
     def _find_matching_address_from_list(
         self,
         addresses: List[Dict[str, Any]],
@@ -494,36 +702,28 @@ class LeadCreator:
         Returns:
             Matching address dict with 'id' field, or None if no match
         """
-        from utils import compare_addresses
-
         if not addresses:
             return None
 
-        # Compare new address with each existing address
-        for existing_addr in addresses:
-            # Convert existing address format to match parsed format
-            existing_parsed = {
-                "street": existing_addr.get("street"),
-                "city": existing_addr.get("city"),
-                "state": existing_addr.get("state"),
-                "zip": existing_addr.get("zip")
-            }
-
-            similarity = compare_addresses(existing_parsed, new_address)
-            logger.debug(f"Address similarity: {similarity:.2f} for address {existing_addr.get('id')}")
+        # Compare new address with all existing addresses at once
+        similarities = compare_address_to_candidates(new_address, addresses)
+        best_index = max(range(len(addresses)), key=similarities.__getitem__)
+        similarity = similarities[best_index]
+        logger.debug("Best address similarity: %.2f for address %s", similarity, addresses[best_index].get('id'))
 
-            # If similarity is high (80%+), consider it a match
-            if similarity >= 0.8:
-                logger.info(f"Found matching address with {similarity:.0%} similarity")
-                return existing_addr
+        # If similarity is high (80%+), consider it a match
+        if similarity >= 0.8:
+            logger.info("Found matching address with %.0f%% similarity", similarity * 100)
+            return addresses[best_index]
 
         return None
 
+    @time_stage("add_address")
     def _add_address_to_customer(
         self,
         customer_id: str,
         address: Dict[str, Optional[str]]
-    ) -> Optional[str]:
+    ) -> Optional[Dict[str, Any]]:
         """
         Add address to existing customer.
 
@@ -532,7 +732,7 @@ class LeadCreator:
             address: Parsed address
 
         Returns:
-            Address ID if successful, None otherwise
+            Created address data (with 'id') if successful, None otherwise
         """
         if not address or not any(address.values()):
             return None
@@ -559,7 +759,12 @@ class LeadCreator:
 
         result = self.hcp_client.add_customer_address(customer_id, address_data)
         if result:
-            return result.get("id")
+            if self.customer_index is not None:
+                try:
+                    self.customer_index.add_address(customer_id, result)
+                except sqlite3.Error as e:
+                    logger.warning("Could not add address to index: %s", e)
+            return result
         return None
 
     def _create_job(
@@ -610,7 +815,7 @@ class LeadCreator:
             return result.get("id")
         return None
 
-    def _create_lead_with_job_type(
+    def _build_lead_data(
         self,
         customer_id: str,
         form_data: Dict[str, Any],
@@ -618,9 +823,9 @@ class LeadCreator:
         note: Optional[str] = None,
         address_id: Optional[str] = None,
         address: Optional[Dict[str, str]] = None
-    ) -> Optional[str]:
+    ) -> Dict[str, Any]:
         """
-        Create lead for customer with appropriate job_type mapping.
+        Build the create-lead request for a customer with appropriate job_type mapping.
 
         According to HCP API docs, line_items, note, and address can be included
         directly in the create lead request.
@@ -634,14 +839,14 @@ class LeadCreator:
             address: Optional address dict with full address fields
 
         Returns:
-            Lead ID or None on failure
+            Lead data for HCPClient.create_lead
         """
         # Map "Service Needed" to job_type
         service_needed = form_data.get("service_needed", "")
         job_type = Config.JOB_TYPE_MAPPING.get(service_needed, "")
 
         if not job_type:
-            logger.warning(f"No job_type mapping for: {service_needed}")
+            logger.warning("No job_type mapping for: %s", service_needed)
             job_type = "Plumbing Demand Maintenance"  # Default fallback
 
         lead_data = {
@@ -652,17 +857,17 @@ class LeadCreator:
         # Add assigned employee for website leads
         if Config.HCP_ASSIGNED_EMPLOYEE_ID:
             lead_data["assigned_employee_id"] = Config.HCP_ASSIGNED_EMPLOYEE_ID
-            logger.debug(f"Assigning to employee: {Config.HCP_ASSIGNED_EMPLOYEE_ID}")
+            logger.debug("Assigning to employee: %s", Config.HCP_ASSIGNED_EMPLOYEE_ID)
 
         # Add address_id if provided (for existing customer with address)
         if address_id:
             lead_data["address_id"] = address_id
-            logger.debug(f"Including address_id: {address_id}")
+            logger.debug("Including address_id: %s", address_id)
 
         # Add address fields if provided
         if address:
             lead_data["address"] = address
-            logger.debug(f"Including address: {address.get('street')}, {address.get('city')}, {address.get('state')} {address.get('zip')}")
+            logger.debug("Including address: %s, %s, %s %s", address.get('street'), address.get('city'), address.get('state'), address.get('zip'))
 
         # Add tags only if configured (not empty strings)
         tags = []
@@ -680,18 +885,15 @@ class LeadCreator:
         # Include line items if provided
         if line_items:
             lead_data["line_items"] = line_items
-            logger.debug(f"Including {len(line_items)} line items in lead creation")
+            logger.debug("Including %s line items in lead creation", len(line_items))
 
         # Include note if provided
         if note:
             lead_data["note"] = note
             logger.debug("Including note in lead creation")
 
-        logger.debug(f"Creating lead with job_type: {job_type}")
-        result = self.hcp_client.create_lead(lead_data)
-        if result:
-            return result.get("id")
-        return None
+        logger.debug("Creating lead with job_type: %s", job_type)
+        return lead_data
 
     def _build_line_items(
         self,
@@ -722,7 +924,7 @@ class LeadCreator:
             hcp_service_name = Config.SERVICE_DETAIL_MAPPING.get(service_detail)
 
             if not hcp_service_name:
-                logger.warning(f"No mapping found for service: {service_detail}")
+                logger.warning("No mapping found for service: %s", service_detail)
                 hcp_service_name = service_detail  # Use original if no mapping
 
             line_item = {
@@ -736,5 +938,29 @@ class LeadCreator:
 
             line_items.append(line_item)
 
-        logger.debug(f"Built {len(line_items)} line items: {[item['name'] for item in line_items]}")
+        logger.debug("Built %s line items: %s", len(line_items), [item['name'] for item in line_items])
         return line_items
+
+
+_shared_lead_creator: Optional[LeadCreator] = None
+_shared_lead_creator_lock = threading.Lock()
+
+
+def get_lead_creator() -> LeadCreator:
+    """
+    Get the process-wide lead creator, creating it on first use.
+
+    Creating it opens the HCP session and the local SQLite stores, so the
+    web service does it on a background thread at startup (see main.py)
+    rather than at import; a request that arrives first waits for it.
+
+    Returns:
+        Shared LeadCreator instance
+    """
+    global _shared_lead_creator
+
+    if _shared_lead_creator is None:
+        with _shared_lead_creator_lock:
+            if _shared_lead_creator is None:
+                _shared_lead_creator = LeadCreator()
+    return _shared_lead_creator
@@ -0,0 +1,229 @@
+"""
+Logging configuration and per-request correlation IDs.
+
+configure_logging() installs one root handler for the process:
+
+- Records are put on a bounded in-memory queue and written to stdout by a
+  background thread (logging.handlers.QueueListener), so request threads
+  never block on stdout. If the queue is full the record is dropped and
+  counted in log_records_dropped_total rather than stalling the request.
+- LOG_FORMAT=json writes one JSON object per line with "severity" and
+  "message" fields that Cloud Logging understands; "text" keeps the
+  human-readable format for local development.
+- Log calls use %-style arguments, so messages below LOG_LEVEL are never
+  formatted, and enabled ones are formatted only once.
+
+The correlation ID of the current request (and any other bound fields) is
+kept in a context variable and added to every record logged while it is
+set, including by LeadCreator, CustomerMatcher and HCPClient. HCPClient also
+sends it to HCP as X-Request-ID.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+from config import Config
+from metrics import observe_log_dropped
+
+# Fields bound to the current request or submission (request_id, submission_id, ...)
+_log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else on a record is an extra field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_request_id() -> str:
+    """Generate a correlation ID"""
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    """Correlation ID of the current request, if one is bound"""
+    return _log_context.get().get("request_id")
+
+
+def bind_log_context(**fields: Any) -> contextvars.Token:
+    """
+    Add fields to every record logged in the current context.
+
+    Args:
+        **fields: Fields to bind, e.g. request_id="..." (None values are skipped)
+
+    Returns:
+        Token for reset_log_context
+    """
+    context = dict(_log_context.get())
+    context.update({key: value for key, value in fields.items() if value is not None})
+    return _log_context.set(context)
+
+
+def reset_log_context(token: contextvars.Token) -> None:
+    """Restore the fields bound before bind_log_context"""
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Bind fields for the duration of a block.
+
+    Example:
+        >>> with log_context(request_id="abc", submission_id="123"):
+        ...     logger.info("Processing")   # record carries both IDs
+    """
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copy the bound context fields onto each record.
+
+    Runs on the thread that logs, because that is where the context variables
+    are set. It must stay on the root handler (the QueueHandler in async mode);
+    on the listener's output handler it would run in the listener thread and
+    every record would lose its correlation ID.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            setattr(record, key, value)
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_") and value != "-":
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Freeze a record for another thread.
+
+        The message is merged with its arguments here (the arguments may
+        change after the call returns); everything else, including JSON
+        encoding, happens on the listener thread.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            observe_log_dropped()
+
+
+def build_formatter(log_format: Optional[str] = None) -> logging.Formatter:
+    """
+    Get the formatter for a log format.
+
+    Args:
+        log_format: "json" or "text" (defaults to Config.LOG_FORMAT)
+
+    Returns:
+        JsonFormatter or the text formatter
+    """
+    if (log_format or Config.LOG_FORMAT) == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    async_logging: Optional[bool] = None,
+    stream=None
+) -> None:
+    """
+    Install the process's root log handler (replacing any existing ones).
+
+    Args:
+        level: Log level name (defaults to Config.LOG_LEVEL)
+        log_format: "json" or "text" (defaults to Config.LOG_FORMAT)
+        async_logging: Write from a background thread (defaults to Config.LOG_ASYNC)
+        stream: Output stream (defaults to stdout)
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(build_formatter(log_format))
+
+    async_logging = async_logging if async_logging is not None else Config.LOG_ASYNC
+    if async_logging:
+        handler: logging.Handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+        _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=False)
+        _listener.start()
+    else:
+        handler = output
+    # On the calling thread's handler, not the listener's (see ContextFilter)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, (level or Config.LOG_LEVEL).upper()))
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the background writer"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -3,28 +3,193 @@ Elfsight to HCP Lead Creation Webhook.
 
 Flask application that receives Elfsight form submissions and creates
 leads/jobs in Housecall Pro.
+
+Nothing that talks to HCP or opens the local stores is created at import:
+a background thread creates the lead creator, starts the workers, opens
+connections to HCP and loads the field mappings as soon as the process
+starts, and times each step against STARTUP_BUDGET_SECONDS (see startup.py).
+A request that arrives before it has finished waits for the lead creator.
 """
 
+import time
+
+# Module imports are the first phase of the startup report
+_IMPORTS_STARTED = time.perf_counter()
+
+import json
 import logging
+import re
 import sys
-from flask import Flask, request, jsonify
-from lead_creator import LeadCreator
+import threading
+from flask import Flask, Response, g, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from lead_creator import LeadCreator, get_lead_creator
+from submission_queue import SubmissionQueue, SubmissionWorkerPool, retry_delay
+from customer_index import CustomerIndexSyncer
+from circuit_breaker import get_circuit_breakers
+from form_mapping import get_field_mapper
+from metrics import render_metrics
+from startup import StartupReport
+from logging_setup import bind_log_context, configure_logging, new_request_id, reset_log_context
 from config import Config
 
 # Configure logging
-logging.basicConfig(
-    level=getattr(logging, Config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Request bodies are read this many bytes at a time
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Accepted caller-supplied X-Request-ID values (anything else gets a fresh ID)
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
 # Initialize Flask app
 app = Flask(__name__)
 
-# Initialize lead creator
-lead_creator = LeadCreator()
+# HCP circuit breakers (shared by every HCP client in the process)
+circuit_breakers = get_circuit_breakers()
+
+# Opened by start_services(): the submission queue (async mode, or to hold
+# submissions spilled while an HCP circuit is open or queued for retry) with
+# its workers, and the customer index syncer if the index is enabled
+submission_queue = None
+index_syncer = None
+worker_pool = None
+_services_started = False
+_services_lock = threading.Lock()
+
+startup_report = StartupReport()
+startup_report.record("imports", time.perf_counter() - _IMPORTS_STARTED)
+
+
+def start_services() -> LeadCreator:
+    """
+    Get the lead creator, starting the services that use it on first call.
+
+    The submission queue and its workers and the customer index syncer are
+    started once, by the warm-up thread or, if warm-up is disabled, by the
+    first request.
+
+    Returns:
+        Shared LeadCreator instance
+    """
+    global submission_queue, index_syncer, worker_pool, _services_started
+
+    lead_creator = get_lead_creator()
+
+    if not _services_started:
+        with _services_lock:
+            if not _services_started:
+                # Keep the local customer index fresh (if enabled)
+                if lead_creator.customer_index is not None:
+                    index_syncer = CustomerIndexSyncer(lead_creator.customer_index, lead_creator.hcp_client)
+                    index_syncer.start()
+
+                if Config.WEBHOOK_ASYNC_MODE or Config.HCP_BREAKER_SPILL_ENABLED or Config.QUEUE_RETRY_FAILED:
+                    submission_queue = SubmissionQueue()
+                    worker_pool = SubmissionWorkerPool(submission_queue, lead_creator)
+                    worker_pool.start()
+
+                _services_started = True
+
+    return lead_creator
+
+
+def warm_up() -> None:
+    """
+    Set up everything the first submission needs (runs on a background thread).
+
+    Each step is timed in startup_report; a failed step is logged and done
+    again on first use.
+    """
+    is_valid = False
+    with startup_report.phase("config"):
+        is_valid, error = Config.validate()
+        if not is_valid:
+            logger.error("Configuration error: %s", error)
+
+    with startup_report.phase("lead_creator"):
+        get_lead_creator()
+
+    with startup_report.phase("services"):
+        start_services()
+
+    if is_valid and Config.HCP_WARMUP_CONNECTIONS > 0:
+        with startup_report.phase("hcp_connections"):
+            get_lead_creator().hcp_client.preconnect(Config.HCP_WARMUP_CONNECTIONS)
+
+    with startup_report.phase("caches"):
+        get_field_mapper()
+        customer_index = get_lead_creator().customer_index
+        if customer_index is not None:
+            # Reads the whole table once, so its pages are in the OS cache
+            logger.info("Customer index holds %s customers", customer_index.count())
+
+    startup_report.finish()
+
+
+@app.before_request
+def bind_request_id():
+    """Bind the request's correlation ID (caller's X-Request-ID or a new one) to its logs"""
+    request_id = request.headers.get("X-Request-ID", "")
+    if not REQUEST_ID_PATTERN.match(request_id):
+        request_id = new_request_id()
+    g.request_id = request_id
+    g.log_context_token = bind_log_context(request_id=request_id)
+
+
+@app.after_request
+def add_request_id_header(response):
+    """Echo the correlation ID so callers can find the request's logs"""
+    if "request_id" in g:
+        response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+@app.teardown_request
+def unbind_request_id(exc):
+    """Drop the request's log context"""
+    token = g.pop("log_context_token", None)
+    if token is not None:
+        reset_log_context(token)
+
+
+def _read_json_body():
+    """
+    Read and decode a JSON request body, rejecting oversized bodies early.
+
+    A Content-Length over WEBHOOK_MAX_BODY_BYTES is rejected before anything
+    is read; a chunked body is read in chunks and rejected as soon as it
+    passes the limit, so no request buffers more than the limit. The raw
+    body is not kept once decoded.
+
+    Returns:
+        Decoded JSON, or None for an empty, non-JSON or malformed body
+
+    Raises:
+        RequestEntityTooLarge: If the body is over the limit
+    """
+    if not request.is_json:
+        return None
+
+    limit = Config.WEBHOOK_MAX_BODY_BYTES
+    if limit and (request.content_length or 0) > limit:
+        raise RequestEntityTooLarge()
+
+    body = bytearray()
+    while True:
+        chunk = request.stream.read(BODY_CHUNK_SIZE)
+        if not chunk:
+            break
+        body += chunk
+        if limit and len(body) > limit:
+            raise RequestEntityTooLarge()
+
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
 
 
 @app.route("/", methods=["GET"])
@@ -44,17 +209,44 @@ def health():
     is_valid, error = Config.validate()
 
     if not is_valid:
-        logger.error(f"Configuration error: {error}")
+        logger.error("Configuration error: %s", error)
         return jsonify({
             "status": "unhealthy",
             "error": error
         }), 500
 
+    # An open circuit means HCP is failing; this service still accepts
+    # (and spills) submissions, so it stays healthy but reports degraded
     return jsonify({
-        "status": "healthy"
+        "status": "degraded" if circuit_breakers.open_groups() else "healthy",
+        "circuit_breakers": circuit_breakers.snapshot(),
+        "startup": startup_report.snapshot()
     })
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness check for startup probes.
+
+    Returns:
+        200: Startup warm-up has finished (with the startup report)
+        503: Still warming up
+    """
+    status = 200 if startup_report.finished else 503
+    return jsonify({
+        "ready": startup_report.finished,
+        "startup": startup_report.snapshot()
+    }), status
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics (per-stage and HCP request latency)"""
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
+
+
 @app.route("/webhook", methods=["POST"])
 def webhook():
     """
@@ -72,14 +264,21 @@ def webhook():
         {"id": "field6", "name": "Customer Type", "value": "New Customer", "type": "choice"}
     ]
 
+    Query parameters:
+        form: Optional form ID selecting a field mapping from FORM_FIELD_MAPPING_FILE
+
     Returns:
         200: Success (with customer_id and job_id)
+        202: Accepted for background processing (async mode, or HCP unavailable;
+             with submission_id)
         400: Bad request (invalid payload)
+        409: An earlier delivery of the same submission is still being processed
+        413: Body over WEBHOOK_MAX_BODY_BYTES, or more than WEBHOOK_MAX_FIELDS fields
         500: Server error
     """
     try:
         # Get payload
-        payload = request.get_json(silent=True)
+        payload = _read_json_body()
 
         if not payload:
             logger.warning("Received empty payload")
@@ -88,11 +287,19 @@ def webhook():
                 "error": "Empty payload"
             }), 400
 
-        logger.info(f"Received webhook payload: {len(payload) if isinstance(payload, list) else 'dict'} fields")
-        logger.debug(f"Payload: {payload}")
+        if isinstance(payload, list) and Config.WEBHOOK_MAX_FIELDS and len(payload) > Config.WEBHOOK_MAX_FIELDS:
+            logger.warning("Rejected payload with %s fields (limit %s)", len(payload), Config.WEBHOOK_MAX_FIELDS)
+            return jsonify({
+                "success": False,
+                "error": f"Too many fields (limit {Config.WEBHOOK_MAX_FIELDS})"
+            }), 413
 
-        # Parse payload
-        form_data = lead_creator.parse_elfsight_payload(payload)
+        logger.info("Received webhook payload: %s fields", len(payload) if isinstance(payload, list) else 'dict')
+        logger.debug("Payload: %s", payload)
+
+        # Parse payload (?form=<id> selects a per-form field mapping)
+        lead_creator = start_services()
+        form_data = lead_creator.parse_elfsight_payload(payload, form_id=request.args.get("form"))
 
         # Validate required fields
         if not form_data.get("name") and not form_data.get("email") and not form_data.get("phone"):
@@ -102,11 +309,48 @@ def webhook():
                 "error": "Missing required fields: at least one of name, email, or phone is required"
             }), 400
 
-        # Create lead
-        result = lead_creator.create_lead(form_data)
+        # Optional client-supplied submission ID for duplicate suppression
+        idempotency_key = request.headers.get("Idempotency-Key")
+
+        # Async mode: queue submission and return immediately
+        if Config.WEBHOOK_ASYNC_MODE:
+            submission_id = submission_queue.enqueue(form_data, idempotency_key)
+            worker_pool.notify()
+
+            return jsonify({
+                "success": True,
+                "message": "Submission accepted for processing",
+                "submission_id": submission_id,
+                "status_url": f"/submissions/{submission_id}"
+            }), 202
+
+        # HCP circuit open: spill instead of tying up a request thread
+        if Config.HCP_BREAKER_SPILL_ENABLED and circuit_breakers.open_groups():
+            return _spill(form_data, idempotency_key)
+
+        # Create lead (repeat deliveries return the first result)
+        result = lead_creator.create_lead(form_data, idempotency_key)
+
+        # An earlier delivery of this submission is still running: don't run it twice
+        if result.in_progress:
+            logger.warning("Submission still being processed by an earlier delivery")
+            return jsonify({
+                "success": False,
+                "duplicate": True,
+                "error": result.error
+            }), 409
+
+        # Failed: hand over to the queue workers rather than lose the submission
+        # (unless HCP rejected it, which no retry can fix)
+        if not result.success and result.retryable and (
+            Config.QUEUE_RETRY_FAILED
+            or (Config.HCP_BREAKER_SPILL_ENABLED and not circuit_breakers.all_closed())
+        ):
+            logger.warning("Lead creation failed, queueing for retry: %s", result.error)
+            return _spill(form_data, idempotency_key, result)
 
         if result.success:
-            logger.info(f"Lead created successfully: customer={result.customer_id}, job={result.job_id}")
+            logger.info("Lead created successfully: customer=%s, job=%s", result.customer_id, result.job_id)
 
             response_data = {
                 "success": True,
@@ -115,26 +359,103 @@ def webhook():
                 "job_id": result.job_id
             }
 
+            if result.duplicate:
+                response_data["duplicate"] = True
+
             if result.warnings:
                 response_data["warnings"] = result.warnings
 
             return jsonify(response_data), 200
 
         else:
-            logger.error(f"Failed to create lead: {result.error}")
+            logger.error("Failed to create lead: %s", result.error)
             return jsonify({
                 "success": False,
                 "error": result.error
             }), 500
 
+    except RequestEntityTooLarge:
+        raise
+
     except Exception as e:
-        logger.exception(f"Unexpected error in webhook handler: {e}")
+        logger.exception("Unexpected error in webhook handler: %s", e)
         return jsonify({
             "success": False,
             "error": "Internal server error"
         }), 500
 
 
+def _spill(form_data, idempotency_key, failed_result=None):
+    """
+    Queue a submission for the background workers; returns a 202 response.
+
+    Used while HCP circuits are open (the submission waits for them to
+    recover) and after a failed attempt (retried with backoff, resuming
+    from the customer the attempt created, if any).
+    """
+    unavailable = not circuit_breakers.all_closed()
+    delay = circuit_breakers.retry_in()
+    attempts = 0
+    customer_id = None
+    error = None
+
+    if failed_result is not None:
+        error = failed_result.error
+        if failed_result.customer_created:
+            customer_id = failed_result.customer_id
+        if not unavailable:
+            # Failures during an outage don't count towards QUEUE_MAX_ATTEMPTS
+            attempts = 1
+            delay = retry_delay(attempts)
+
+    submission_id = submission_queue.enqueue(
+        form_data,
+        idempotency_key,
+        delay=delay,
+        customer_id=customer_id,
+        attempts=attempts,
+        error=error
+    )
+
+    if unavailable:
+        logger.warning("HCP unavailable: spilled submission %s (retry in %.0fs)", submission_id, delay)
+        message = "HCP is temporarily unavailable; submission queued for processing"
+    else:
+        message = "Lead creation failed; submission queued for retry"
+
+    return jsonify({
+        "success": True,
+        "message": message,
+        "submission_id": submission_id,
+        "status_url": f"/submissions/{submission_id}"
+    }), 202
+
+
+@app.route("/submissions/<submission_id>", methods=["GET"])
+def submission_status(submission_id):
+    """
+    Status endpoint for submissions queued in async mode or spilled while
+    HCP was unavailable.
+
+    Returns:
+        200: Submission status (queued, processing, succeeded, failed) and result
+        404: Unknown submission ID, or no submission queue (async mode and spilling disabled)
+    """
+    start_services()
+    if submission_queue is None:
+        return jsonify({
+            "error": "Submission queue is not enabled"
+        }), 404
+
+    status = submission_queue.get_status(submission_id)
+    if status is None:
+        return jsonify({
+            "error": "Submission not found"
+        }), 404
+
+    return jsonify(status)
+
+
 @app.route("/test", methods=["POST"])
 def test():
     """
@@ -151,7 +472,7 @@ def test():
     }
     """
     try:
-        payload = request.get_json(silent=True)
+        payload = _read_json_body()
 
         if not payload:
             return jsonify({
@@ -162,15 +483,19 @@ def test():
         logger.info("Test endpoint called")
 
         # Parse payload
-        form_data = lead_creator.parse_elfsight_payload(payload)
+        lead_creator = start_services()
+        form_data = lead_creator.parse_elfsight_payload(payload, form_id=request.args.get("form"))
 
         # Create lead
         result = lead_creator.create_lead(form_data)
 
         return jsonify(result.to_dict())
 
+    except RequestEntityTooLarge:
+        raise
+
     except Exception as e:
-        logger.exception(f"Error in test endpoint: {e}")
+        logger.exception("Error in test endpoint: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
@@ -182,29 +507,46 @@ def not_found(error):
     """Handle 404 errors"""
     return jsonify({
         "error": "Endpoint not found",
-        "available_endpoints": ["/", "/health", "/webhook", "/test"]
+        "available_endpoints": ["/", "/health", "/ready", "/metrics", "/webhook", "/submissions/<id>", "/test"]
     }), 404
 
 
+@app.errorhandler(413)
+def request_too_large(error):
+    """Handle bodies over WEBHOOK_MAX_BODY_BYTES"""
+    logger.warning("Rejected request body over %s bytes", Config.WEBHOOK_MAX_BODY_BYTES)
+    return jsonify({
+        "success": False,
+        "error": f"Request body too large (limit {Config.WEBHOOK_MAX_BODY_BYTES} bytes)"
+    }), 413
+
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    logger.error(f"Internal server error: {error}")
+    logger.error("Internal server error: %s", error)
     return jsonify({
         "error": "Internal server error"
     }), 500
 
 
+# Warm up in the background so the first request doesn't pay for it
+if Config.STARTUP_WARMUP_ENABLED:
+    threading.Thread(target=warm_up, name="startup-warm-up", daemon=True).start()
+else:
+    startup_report.finish()
+
+
 if __name__ == "__main__":
     # Validate configuration on startup
     is_valid, error = Config.validate()
     if not is_valid:
-        logger.error(f"Configuration error: {error}")
+        logger.error("Configuration error: %s", error)
         sys.exit(1)
 
     logger.info("Starting Elfsight webhook service...")
-    logger.info(f"Port: {Config.PORT}")
-    logger.info(f"Log level: {Config.LOG_LEVEL}")
+    logger.info("Port: %s", Config.PORT)
+    logger.info("Log level: %s", Config.LOG_LEVEL)
 
     # Run Flask app
     app.run(
@@ -0,0 +1,265 @@
+"""
+Prometheus metrics for the webhook service.
+
+Per-stage latency of the lead creation workflow and per-request latency of
+HCP API calls, exposed by main.py at /metrics.
+
+With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR so each process
+writes its samples there and /metrics aggregates all of them (see
+gunicorn.conf.py).
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+# Multiprocess mode writes samples to files in this directory
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Buckets sized for calls to a remote API (tens of ms to tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_DURATION = Histogram(
+    "lead_stage_duration_seconds",
+    "Time spent in each stage of lead creation",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+HCP_REQUEST_DURATION = Histogram(
+    "hcp_request_duration_seconds",
+    "HCP API request latency including retries and rate-limit waits",
+    ["method", "endpoint", "status", "retries"],
+    buckets=LATENCY_BUCKETS
+)
+
+HCP_REQUESTS = Counter(
+    "hcp_requests_total",
+    "HCP API requests by final outcome",
+    ["method", "endpoint", "status", "retries"]
+)
+
+HCP_RATE_LIMIT_SLEEP = Counter(
+    "hcp_rate_limit_sleep_seconds_total",
+    "Time spent waiting on the local rate limiter or an HCP Retry-After",
+    ["method", "endpoint", "reason"]
+)
+
+HCP_RETRIES = Counter(
+    "hcp_retries_total",
+    "HCP API retries by the failure that caused them",
+    ["method", "endpoint", "cause"]
+)
+
+HCP_RETRY_GIVE_UPS = Counter(
+    "hcp_retry_give_ups_total",
+    "HCP API requests that failed with a retryable error but were not retried",
+    ["method", "endpoint", "reason"]
+)
+
+HCP_CIRCUIT_STATE = Gauge(
+    "hcp_circuit_state",
+    "HCP circuit breaker state by endpoint group (0 closed, 1 half-open, 2 open)",
+    ["group"],
+    multiprocess_mode="max"
+)
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+STARTUP_PHASE_DURATION = Gauge(
+    "startup_phase_seconds",
+    "Time spent in each phase of service startup (imports, lead_creator, ...)",
+    ["phase"],
+    multiprocess_mode="max"
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full"
+)
+
+HCP_CACHE_EVENTS = Counter(
+    "hcp_cache_events_total",
+    "HCP response cache lookups and removals (hit, miss, eviction, expiration) by key namespace",
+    ["namespace", "event"]
+)
+
+QUEUE_DEPTH = Gauge(
+    "submission_queue_depth",
+    "Unfinished submissions in the local queue (ready, delayed, processing)",
+    ["state"],
+    multiprocess_mode="max"
+)
+
+QUEUE_PROCESSED = Counter(
+    "submission_queue_processed_total",
+    "Submissions taken off the queue by outcome (rate() of succeeded is the drain rate)",
+    ["outcome"]
+)
+
+# Path segments that follow these collections are IDs
+_ID_SEGMENT = re.compile(r"/(customers|addresses|leads|jobs)/[^/]+")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Replace IDs in an HCP endpoint path so it can be used as a label.
+
+    Example:
+        >>> endpoint_template("/customers/cus_123/addresses")
+        '/customers/{id}/addresses'
+    """
+    return _ID_SEGMENT.sub(r"/\1/{id}", endpoint)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """
+    Record the duration of a lead creation stage.
+
+    Usable as a context manager or a decorator:
+
+        @time_stage("match")
+        def find_matching_customer(...): ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+def observe_hcp_request(method: str, endpoint: str, status: str, retries: int, duration: float) -> None:
+    """
+    Record one HCP API request.
+
+    Args:
+        method: HTTP method
+        endpoint: Endpoint path (IDs are templated here)
+        status: Final HTTP status code, or "error" if no response was received
+        retries: Attempts made after the first one
+        duration: Total seconds spent, including retries and waits
+    """
+    labels = {
+        "method": method,
+        "endpoint": endpoint_template(endpoint),
+        "status": status,
+        "retries": str(retries)
+    }
+    HCP_REQUEST_DURATION.labels(**labels).observe(duration)
+    HCP_REQUESTS.labels(**labels).inc()
+
+
+def observe_rate_limit_sleep(method: str, endpoint: str, reason: str, seconds: float) -> None:
+    """
+    Record time spent sleeping for rate limiting.
+
+    Args:
+        method: HTTP method
+        endpoint: Endpoint path (IDs are templated here)
+        reason: "limiter" for the local token bucket, "retry_after" for an HCP 429
+        seconds: Seconds slept
+    """
+    if seconds > 0:
+        HCP_RATE_LIMIT_SLEEP.labels(
+            method=method,
+            endpoint=endpoint_template(endpoint),
+            reason=reason
+        ).inc(seconds)
+
+
+def observe_retry(method: str, endpoint: str, cause: str, delay: Optional[float], give_up_reason: Optional[str]) -> None:
+    """
+    Record the retry decision after a retryable failure.
+
+    Args:
+        method: HTTP method
+        endpoint: Endpoint path (IDs are templated here)
+        cause: HTTP status code, or "error" for timeouts and connection errors
+        delay: Seconds until the retry, or None if the request gave up
+        give_up_reason: "attempts", "deadline" or "budget" when delay is None
+    """
+    endpoint = endpoint_template(endpoint)
+    if delay is None:
+        HCP_RETRY_GIVE_UPS.labels(method=method, endpoint=endpoint, reason=give_up_reason).inc()
+    else:
+        HCP_RETRIES.labels(method=method, endpoint=endpoint, cause=cause).inc()
+
+
+def observe_circuit_state(group: str, state: str) -> None:
+    """
+    Record a circuit breaker state change.
+
+    Args:
+        group: Endpoint group
+        state: "closed", "half_open" or "open"
+    """
+    HCP_CIRCUIT_STATE.labels(group=group).set(_CIRCUIT_STATE_VALUES[state])
+
+
+def observe_cache_event(namespace: str, event: str) -> None:
+    """
+    Record an HCP response cache event.
+
+    Args:
+        namespace: First element of the cache key (e.g. "search", "customer")
+        event: "hit", "miss", "eviction" or "expiration"
+    """
+    HCP_CACHE_EVENTS.labels(namespace=namespace, event=event).inc()
+
+
+def observe_queue_depth(depth: Dict[str, int]) -> None:
+    """
+    Record submission queue depth.
+
+    Args:
+        depth: Count per state (SubmissionQueue.depth_by_state)
+    """
+    for state, count in depth.items():
+        QUEUE_DEPTH.labels(state=state).set(count)
+
+
+def observe_queue_outcome(outcome: str) -> None:
+    """
+    Record a processed queue item.
+
+    Args:
+        outcome: "succeeded", "retried", "deferred" or "failed"
+    """
+    QUEUE_PROCESSED.labels(outcome=outcome).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def observe_log_dropped() -> None:
+    """Record a log record dropped by the queue handler"""
+    LOG_RECORDS_DROPPED.inc()
+
+
+def observe_startup_phase(phase: str, seconds: float) -> None:
+    """
+    Record how long a startup phase took.
+
+    Args:
+        phase: Phase name (see startup.StartupReport)
+        seconds: Duration in seconds
+    """
+    STARTUP_PHASE_DURATION.labels(phase=phase).set(seconds)
@@ -0,0 +1,192 @@
+"""
+Fuzzy name similarity for customer matching.
+
+Names are normalized once (lowercase, punctuation dropped, whitespace
+collapsed) and compared word by word with Jaro-Winkler, which is cheaper
+than difflib's matching-block search and weights the common prefix that
+typos in short names usually leave intact. Word scores, normalized
+candidate names and pair scores are memoized, so a customer scored while
+ranking is not scored again for the confidence calculation.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+NAME_CACHE_SIZE = 4096
+
+_NON_NAME_CHARS = re.compile(r"[^\w\s]")
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for comparison.
+
+    Examples:
+        >>> normalize_name("  O'Brien,  Mary-Jane ")
+        'obrien maryjane'
+    """
+    return " ".join(_NON_NAME_CHARS.sub("", name.lower()).split())
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _candidate_name(first_name: Any, last_name: Any) -> str:
+    """Normalized "first last" of an HCP customer"""
+    return normalize_name(f"{first_name or ''} {last_name or ''}")
+
+
+def customer_name_key(customer: Dict[str, Any]) -> str:
+    """
+    Get the normalized full name of an HCP customer record.
+
+    Args:
+        customer: Customer dictionary with first_name/last_name
+
+    Returns:
+        Normalized name ("" if the customer has no name)
+    """
+    return _candidate_name(customer.get("first_name"), customer.get("last_name"))
+
+
+def jaro_winkler(s1: str, s2: str, prefix_scale: float = 0.1) -> float:
+    """
+    Jaro-Winkler similarity of two strings.
+
+    Args:
+        s1: First string
+        s2: Second string
+        prefix_scale: Boost per matching leading character (max 4 characters)
+
+    Returns:
+        Similarity between 0 and 1
+    """
+    if s1 == s2:
+        return 1.0
+
+    len1, len2 = len(s1), len(s2)
+    if not len1 or not len2:
+        return 0.0
+
+    window = max(0, max(len1, len2) // 2 - 1)
+    # Characters match if equal and no further apart than the window
+    matched = bytearray(len2)
+    s1_matches = []
+    find = s2.find
+    for i, char in enumerate(s1):
+        start = i - window if i > window else 0
+        end = i + window + 1
+        j = find(char, start, end)
+        while j != -1 and matched[j]:
+            j = find(char, j + 1, end)
+        if j != -1:
+            matched[j] = 1
+            s1_matches.append(char)
+
+    matches = len(s1_matches)
+    if not matches:
+        return 0.0
+
+    # Matched characters that appear in a different order
+    transpositions = 0
+    k = 0
+    for j, flag in enumerate(matched):
+        if flag:
+            if s2[j] != s1_matches[k]:
+                transpositions += 1
+            k += 1
+    transpositions //= 2
+
+    jaro = (matches / len1 + matches / len2 + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for a, b in zip(s1[:4], s2[:4]):
+        if a != b:
+            break
+        prefix += 1
+
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _tokens(name: str) -> Tuple[str, ...]:
+    """Words of a normalized name"""
+    return tuple(name.split())
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE * 4)
+def _token_similarity(token: str, other: str) -> float:
+    """Jaro-Winkler of two name words (the vocabulary of names is small, so this mostly hits)"""
+    return jaro_winkler(token, other)
+
+
+def _aligned_similarity(tokens: Tuple[str, ...], others: Tuple[str, ...]) -> float:
+    """Length-weighted mean similarity of word pairs in order"""
+    total = weight = 0
+    for token, other in zip(tokens, others):
+        pair_weight = len(token) + len(other)
+        total += _token_similarity(token, other) * pair_weight
+        weight += pair_weight
+    return total / weight
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _pair_similarity(name: str, candidate: str) -> float:
+    """Similarity of two normalized names"""
+    if name == candidate:
+        return 1.0
+
+    tokens, others = _tokens(name), _tokens(candidate)
+    if len(tokens) != len(others) or not tokens:
+        # Words added, dropped or run together: compare whole strings
+        return jaro_winkler(name, candidate)
+
+    score = _aligned_similarity(tokens, others)
+    if len(tokens) == 2 and score < 1.0:
+        # "Smith John" vs "John Smith"
+        score = max(score, _aligned_similarity(tokens, others[::-1]))
+    return score
+
+
+def name_similarity(name: Optional[str], customer: Dict[str, Any]) -> Optional[float]:
+    """
+    Compare a submitted name with an HCP customer's name.
+
+    Args:
+        name: Name from the form
+        customer: Customer dictionary with first_name/last_name
+
+    Returns:
+        Similarity between 0 and 1, or None if either side has no name
+    """
+    if not name:
+        return None
+
+    query = normalize_name(name)
+    candidate = customer_name_key(customer)
+    if not query or not candidate:
+        return None
+
+    return _pair_similarity(query, candidate)
+
+
+def score_candidates(name: Optional[str], candidates: List[Dict[str, Any]]) -> List[Optional[float]]:
+    """
+    Compare a submitted name with several HCP customers.
+
+    Args:
+        name: Name from the form
+        candidates: Customer dictionaries
+
+    Returns:
+        Similarity for each candidate (None where either side has no name), in order
+    """
+    query = normalize_name(name) if name else ""
+    if not query:
+        return [None] * len(candidates)
+
+    scores: List[Optional[float]] = []
+    for candidate in candidates:
+        candidate_name = customer_name_key(candidate)
+        scores.append(_pair_similarity(query, candidate_name) if candidate_name else None)
+    return scores
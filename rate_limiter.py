@@ -0,0 +1,279 @@
+"""
+Token-bucket rate limiting for HCP API calls.
+
+A single RateLimiter is shared by every HCPClient in the process, so all
+request threads draw from the same budget. Requests go out immediately while
+tokens remain and are spaced at the sustained rate once the burst is spent.
+
+When several worker processes run on one host (gunicorn --workers N), set
+HCP_RATE_LIMIT_STATE_DIR: the buckets then keep their state in small
+memory-mapped files in that directory, updated under an flock, so every
+process draws from one budget and the combined call rate stays under the cap.
+"""
+
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, burst: float, name: str = "bucket"):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Sustained rate in tokens per second (0 or less disables limiting)
+            burst: Maximum tokens that can accumulate while idle
+            name: Name used in log messages
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.name = name
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, going into debt if necessary.
+
+        The caller must wait the returned number of seconds before using the
+        reservation. Reserving under the lock and waiting outside it keeps
+        concurrent callers in arrival order without holding the lock while asleep.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds to wait before proceeding (0 if tokens were available)
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug("Rate limiter '%s': waiting %.2fs", self.name, wait)
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Wait without blocking the event loop until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug("Rate limiter '%s': waiting %.2fs", self.name, wait)
+            await asyncio.sleep(wait)
+        return wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state is shared by every process on the host.
+
+    The token count and last update time live in a memory-mapped file and are
+    read and written under an exclusive flock, so reservations from all
+    processes are serialized. time.monotonic() is system-wide on Linux, so
+    timestamps written by one process are valid in the others.
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, rate: float, burst: float, path: str, name: str = "bucket"):
+        """
+        Initialize shared token bucket.
+
+        Args:
+            rate: Sustained rate in tokens per second (0 or less disables limiting)
+            burst: Maximum tokens that can accumulate while idle
+            path: State file (created if missing; all processes must use the same path)
+            name: Name used in log messages
+        """
+        super().__init__(rate, burst, name)
+        self.path = path
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+
+    def _open(self) -> None:
+        """Open the state file in this process (again after a fork, as flock is per open file)"""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < self._STATE.size:
+                os.ftruncate(fd, self._STATE.size)
+                os.pwrite(fd, self._STATE.pack(self.burst, time.monotonic()), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self._fd = fd
+        self._map = mmap.mmap(fd, self._STATE.size)
+        self._pid = os.getpid()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the shared bucket, going into debt if necessary.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds to wait before proceeding (0 if tokens were available)
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        # The thread lock serializes threads of this process (flock does not,
+        # as they share one open file); the flock serializes processes
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                available, updated = self._STATE.unpack_from(self._map)
+                now = time.monotonic()
+                if now < updated:
+                    # State written before a reboot
+                    available, updated = self.burst, now
+                available = min(self.burst, available + (now - updated) * self.rate) - tokens
+                self._STATE.pack_into(self._map, 0, available, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        if available >= 0:
+            return 0.0
+        return -available / self.rate
+
+
+class RateLimiter:
+    """Separate read and write token buckets for the HCP API"""
+
+    def __init__(
+        self,
+        read_rate: Optional[float] = None,
+        read_burst: Optional[float] = None,
+        write_rate: Optional[float] = None,
+        write_burst: Optional[float] = None,
+        state_dir: Optional[str] = None
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            read_rate: Read requests per second (defaults to Config.HCP_READ_RATE)
+            read_burst: Read burst size (defaults to Config.HCP_READ_BURST)
+            write_rate: Write requests per second (defaults to Config.HCP_WRITE_RATE)
+            write_burst: Write burst size (defaults to Config.HCP_WRITE_BURST)
+            state_dir: Directory for bucket state shared between processes
+                (defaults to Config.HCP_RATE_LIMIT_STATE_DIR; empty means per-process buckets)
+        """
+        state_dir = state_dir if state_dir is not None else Config.HCP_RATE_LIMIT_STATE_DIR
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+            logger.info("Sharing HCP rate limits between processes via %s", state_dir)
+
+        self.read_bucket = self._make_bucket(
+            rate=read_rate if read_rate is not None else Config.HCP_READ_RATE,
+            burst=read_burst if read_burst is not None else Config.HCP_READ_BURST,
+            name="read",
+            state_dir=state_dir
+        )
+        self.write_bucket = self._make_bucket(
+            rate=write_rate if write_rate is not None else Config.HCP_WRITE_RATE,
+            burst=write_burst if write_burst is not None else Config.HCP_WRITE_BURST,
+            name="write",
+            state_dir=state_dir
+        )
+
+    @staticmethod
+    def _make_bucket(rate: float, burst: float, name: str, state_dir: str) -> TokenBucket:
+        """Create a process-local bucket, or a shared one if state_dir is set"""
+        if state_dir:
+            return SharedTokenBucket(rate, burst, os.path.join(state_dir, f"hcp-{name}.bucket"), name)
+        return TokenBucket(rate, burst, name)
+
+    def bucket_for(self, method: str) -> TokenBucket:
+        """Get the bucket that governs an HTTP method"""
+        return self.read_bucket if method.upper() in READ_METHODS else self.write_bucket
+
+    def acquire(self, method: str) -> float:
+        """
+        Block until a request with this HTTP method may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        return self.bucket_for(method).acquire()
+
+    async def acquire_async(self, method: str) -> float:
+        """
+        Wait (asynchronously) until a request with this HTTP method may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        return await self.bucket_for(method).acquire_async()
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter, creating it on first use.
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _shared_limiter
+
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
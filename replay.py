@@ -0,0 +1,284 @@
+"""
+Batch replay of exported Elfsight submissions into HCP.
+
+Reads a JSONL or CSV export, runs each submission through
+parse_elfsight_payload and create_lead, and processes several submissions
+at once under the shared HCP rate limit. Progress is checkpointed so a
+killed run can be resumed; already-created leads are skipped.
+
+Input formats:
+    JSONL - one submission per line: either the raw Elfsight payload (list
+            of field objects), or {"id": "...", "payload": [...]}
+    CSV   - one submission per row, column headers are the form field names
+
+Usage:
+    python replay.py submissions.jsonl
+    python replay.py export.csv --id-column "Submission ID" --concurrency 4
+    python replay.py submissions.jsonl --base-url http://localhost:8081   # local HCP stand-in
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, Iterator, Tuple, Set
+from logging_setup import configure_logging, log_context, new_request_id
+
+logger = logging.getLogger(__name__)
+
+
+def read_submissions(
+    path: str,
+    input_format: Optional[str] = None,
+    id_column: Optional[str] = None
+) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """
+    Stream submissions from an export file.
+
+    Args:
+        path: Path to JSONL or CSV file
+        input_format: "jsonl" or "csv" (detected from the extension if omitted)
+        id_column: CSV column holding a submission ID
+
+    Yields:
+        Tuples of (record_key, submission_id, payload). record_key identifies
+        the record in the checkpoint file.
+    """
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            for row_number, row in enumerate(csv.DictReader(f), start=1):
+                submission_id = row.get(id_column) if id_column else None
+                payload = [
+                    {"name": name, "value": value, "type": ""}
+                    for name, value in row.items()
+                    if name and name != id_column
+                ]
+                yield f"row:{row_number}", submission_id, payload
+        else:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                submission_id = None
+                if isinstance(record, dict) and "payload" in record:
+                    submission_id = record.get("id")
+                    record = record["payload"]
+                yield f"line:{line_number}", submission_id, record
+
+
+class Checkpoint:
+    """Append-only record of submissions that were replayed successfully"""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a checkpoint file.
+
+        Args:
+            path: Checkpoint file path
+        """
+        self.path = path
+        self.completed: Set[str] = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.completed.add(entry["key"])
+            logger.info("Resuming: %s submissions already replayed", len(self.completed))
+
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, key: str, result: Dict[str, Any]) -> None:
+        """Record a successfully replayed submission"""
+        with self._lock:
+            self._file.write(json.dumps({
+                "key": key,
+                "customer_id": result.get("customer_id"),
+                "job_id": result.get("job_id")
+            }) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.completed.add(key)
+
+    def close(self) -> None:
+        """Close the checkpoint file"""
+        self._file.close()
+
+
+class ReplayStats:
+    """Thread-safe replay counters"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, succeeded: bool) -> None:
+        """Count one finished submission"""
+        with self._lock:
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def leads_per_minute(self) -> float:
+        """Successful leads per minute since the run started"""
+        elapsed = time.monotonic() - self.started
+        return self.succeeded / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """One-line progress summary"""
+        elapsed = time.monotonic() - self.started
+        return (
+            f"{self.succeeded} succeeded, {self.failed} failed, {self.skipped} skipped "
+            f"in {elapsed:.1f}s ({self.leads_per_minute():.1f} leads/minute)"
+        )
+
+
+def replay_one(
+    lead_creator,
+    submission_id: Optional[str],
+    payload: Any,
+    form_id: Optional[str] = None
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Replay a single submission.
+
+    Returns:
+        Tuple of (success, result dictionary)
+    """
+    with log_context(request_id=new_request_id(), submission_id=submission_id):
+        return _replay_one(lead_creator, submission_id, payload, form_id)
+
+
+def _replay_one(
+    lead_creator,
+    submission_id: Optional[str],
+    payload: Any,
+    form_id: Optional[str] = None
+) -> Tuple[bool, Dict[str, Any]]:
+    """Parse and create the lead for one submission (see replay_one)"""
+    form_data = lead_creator.parse_elfsight_payload(payload, form_id=form_id)
+
+    if not form_data.get("name") and not form_data.get("email") and not form_data.get("phone"):
+        return False, {"error": "Missing required fields: at least one of name, email, or phone is required"}
+
+    result = lead_creator.create_lead(form_data, submission_id)
+    return result.success, result.to_dict()
+
+
+def run_replay(
+    lead_creator,
+    path: str,
+    checkpoint: Checkpoint,
+    concurrency: int = 4,
+    input_format: Optional[str] = None,
+    id_column: Optional[str] = None,
+    progress_every: int = 25,
+    form_id: Optional[str] = None
+) -> ReplayStats:
+    """
+    Replay every submission in an export file.
+
+    Args:
+        lead_creator: LeadCreator instance
+        path: Export file path
+        checkpoint: Checkpoint used to skip and record completed submissions
+        concurrency: Submissions processed at once
+        input_format: "jsonl" or "csv" (detected from the extension if omitted)
+        id_column: CSV column holding a submission ID
+        progress_every: Log progress after this many completed submissions
+        form_id: Form ID selecting a field mapping from FORM_FIELD_MAPPING_FILE
+
+    Returns:
+        ReplayStats for the run
+    """
+    stats = ReplayStats()
+    # Bound the number of submissions read ahead of the workers
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def finish(key: str, future: Future) -> None:
+        try:
+            try:
+                success, result = future.result()
+            except Exception as e:
+                logger.exception("%s: unexpected error: %s", key, e)
+                success, result = False, {"error": str(e)}
+
+            if success:
+                checkpoint.record(key, result)
+                logger.info("%s: lead %s for customer %s", key, result.get('job_id'), result.get('customer_id'))
+            else:
+                logger.error("%s: failed: %s", key, result.get('error'))
+
+            stats.add(success)
+            done = stats.succeeded + stats.failed
+            if done % progress_every == 0:
+                logger.info("Progress: %s", stats.summary())
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+        for key, submission_id, payload in read_submissions(path, input_format, id_column):
+            if key in checkpoint.completed:
+                stats.skipped += 1
+                continue
+
+            slots.acquire()
+            future = executor.submit(replay_one, lead_creator, submission_id, payload, form_id)
+            future.add_done_callback(lambda f, k=key: finish(k, f))
+
+    return stats
+
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Replay exported Elfsight submissions into HCP")
+    parser.add_argument("input", help="JSONL or CSV export of Elfsight submissions")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from file extension)")
+    parser.add_argument("--id-column", help="CSV column holding a submission ID (used for duplicate suppression)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Submissions processed at once (default: 4)")
+    parser.add_argument("--form", help="Form ID selecting a field mapping (as /webhook?form=<id>)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <input>.checkpoint)")
+    parser.add_argument("--base-url", help="HCP API base URL (e.g. a local HCP stand-in)")
+    parser.add_argument("--api-key", help="HCP API key (default: HCP_API_KEY)")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    from hcp_client import HCPClient
+    from lead_creator import LeadCreator
+
+    lead_creator = LeadCreator(hcp_client=HCPClient(api_key=args.api_key, base_url=args.base_url))
+    checkpoint = Checkpoint(args.checkpoint or f"{args.input}.checkpoint")
+
+    try:
+        stats = run_replay(
+            lead_creator,
+            args.input,
+            checkpoint,
+            concurrency=args.concurrency,
+            input_format=args.format,
+            id_column=args.id_column,
+            form_id=args.form
+        )
+    finally:
+        checkpoint.close()
+
+    logger.info("Replay complete: %s", stats.summary())
+    return 0 if stats.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Retry policy for HCP API requests.
+
+Decides whether a failed request is retried and how long to wait first:
+
+- Timeouts, 408, 425, 429 and 5xx (except 501/505) are retried; other 4xx
+  responses (validation errors, bad IDs, auth) fail on the first attempt.
+- Waits use decorrelated jitter (each delay drawn between the base delay and
+  three times the previous one, capped), so clients that failed together do
+  not retry together. A Retry-After header, in seconds or as an HTTP date,
+  takes precedence.
+- Each request has a deadline covering all of its attempts and waits; a retry
+  that would end past it is not made.
+- A process-wide retry budget allows retries at a fraction of the request
+  rate, so a failing HCP is not hit with several times the normal load.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt (5xx except "not implemented"/"version not supported")
+RETRYABLE_STATUSES = frozenset({408, 425, 429}) | frozenset(range(500, 600)) - {501, 505}
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """Whether a response with this status may succeed if sent again"""
+    return status_code in RETRYABLE_STATUSES
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value: delay in seconds ("120") or an HTTP date
+            ("Wed, 21 Oct 2026 07:28:00 GMT")
+        now: Current time for HTTP dates (defaults to now, UTC)
+
+    Returns:
+        Seconds to wait (0 for dates in the past), or None if missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning("Ignoring invalid Retry-After header: %r", value)
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class RetryBudget:
+    """
+    Limit retries to a fraction of requests.
+
+    Every request deposits `ratio` tokens and every retry spends one, with
+    `min_per_second` tokens added over time so that a quiet process can still
+    retry. Tokens are capped at `burst`.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, burst: float):
+        """
+        Initialize retry budget.
+
+        Args:
+            ratio: Retries allowed per request (e.g. 0.2 = one retry per five requests)
+            min_per_second: Retries allowed per second regardless of traffic
+            burst: Maximum retries that can be saved up
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, deposit: float = 0.0) -> None:
+        """Add time-based tokens plus a deposit (call with the lock held)"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.min_per_second + deposit)
+        self._updated = now
+
+    def record_request(self) -> None:
+        """Deposit tokens for a first attempt"""
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        Take one token for a retry.
+
+        Returns:
+            True if the retry may go ahead
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryState:
+    """Attempt count, deadline and previous delay of one request"""
+
+    def __init__(self, policy: "RetryPolicy", max_attempts: int, deadline: float):
+        self.policy = policy
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.attempts = 0
+        self._delay = policy.base_delay
+        self.give_up_reason: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        """Attempts made after the first one"""
+        return max(0, self.attempts - 1)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def start_attempt(self) -> None:
+        """Count an attempt (the first one deposits into the retry budget)"""
+        if self.attempts == 0:
+            self.policy.budget.record_request()
+        self.attempts += 1
+
+    def next_delay(self, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Decide whether to retry after a retryable failure.
+
+        Args:
+            retry_after: Server-requested wait in seconds, if any
+
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+            (give_up_reason is then "attempts", "deadline" or "budget")
+        """
+        if self.attempts >= self.max_attempts:
+            self.give_up_reason = "attempts"
+            return None
+
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # Decorrelated jitter
+            delay = min(self.policy.max_delay, random.uniform(self.policy.base_delay, self._delay * 3))
+            self._delay = delay
+
+        if delay >= self.remaining():
+            self.give_up_reason = "deadline"
+            return None
+
+        if not self.policy.budget.try_spend():
+            self.give_up_reason = "budget"
+            return None
+
+        return delay
+
+
+class RetryPolicy:
+    """Retry settings shared by HCP clients"""
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        deadline: Optional[float] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_attempts: Attempts per request, including the first
+                (defaults to Config.HCP_RETRY_MAX_ATTEMPTS)
+            base_delay: Smallest backoff in seconds (defaults to Config.HCP_RETRY_BASE_DELAY)
+            max_delay: Largest backoff in seconds (defaults to Config.HCP_RETRY_MAX_DELAY)
+            deadline: Seconds a request may take across all attempts
+                (defaults to Config.HCP_REQUEST_DEADLINE)
+            budget: RetryBudget (created from Config.HCP_RETRY_BUDGET_* if not provided)
+        """
+        self.max_attempts = max_attempts if max_attempts is not None else Config.HCP_RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else Config.HCP_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.HCP_RETRY_MAX_DELAY
+        self.deadline = deadline if deadline is not None else Config.HCP_REQUEST_DEADLINE
+        self.budget = budget or RetryBudget(
+            ratio=Config.HCP_RETRY_BUDGET_RATIO,
+            min_per_second=Config.HCP_RETRY_BUDGET_MIN_PER_SECOND,
+            burst=Config.HCP_RETRY_BUDGET_BURST
+        )
+
+    def begin(self, max_attempts: Optional[int] = None) -> RetryState:
+        """
+        Start tracking a request.
+
+        Args:
+            max_attempts: Override for this request's attempt limit
+
+        Returns:
+            RetryState for the request
+        """
+        return RetryState(
+            self,
+            max_attempts=max_attempts or self.max_attempts,
+            deadline=time.monotonic() + self.deadline
+        )
+
+
+_shared_policy: Optional[RetryPolicy] = None
+_shared_policy_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Get the process-wide retry policy, creating it on first use.
+
+    Returns:
+        Shared RetryPolicy instance
+    """
+    global _shared_policy
+
+    if _shared_policy is None:
+        with _shared_policy_lock:
+            if _shared_policy is None:
+                _shared_policy = RetryPolicy()
+    return _shared_policy
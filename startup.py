@@ -0,0 +1,105 @@
+"""
+Startup-time budget report.
+
+main.py times each phase of startup (module imports, configuration check,
+lead creator, background services, HCP pre-connect, cache preload) with a
+StartupReport. When startup finishes, the report is logged as one line,
+each phase is exported as startup_phase_seconds, and a warning is logged if
+the total is over STARTUP_BUDGET_SECONDS, so slow cold starts show up
+before they show up as slow first requests.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import Config
+from metrics import observe_startup_phase
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Durations of the startup phases, checked against a time budget"""
+
+    def __init__(self, budget: Optional[float] = None):
+        """
+        Initialize startup report.
+
+        Args:
+            budget: Seconds startup should take at most (defaults to Config.STARTUP_BUDGET_SECONDS)
+        """
+        self.budget = budget if budget is not None else Config.STARTUP_BUDGET_SECONDS
+        self.phases: List[Tuple[str, float]] = []
+        self.failed: List[str] = []
+        self._done = threading.Event()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Add a phase timed elsewhere (e.g. module imports)"""
+        self.phases.append((phase, seconds))
+        observe_startup_phase(phase, seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a startup phase.
+
+        An error in the phase is logged and the phase marked failed; startup
+        carries on, and whatever the phase set up is done again on first use.
+
+        Example:
+            >>> with report.phase("caches"):
+            ...     get_field_mapper()
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            logger.exception("Startup phase '%s' failed: %s", name, e)
+            self.failed.append(name)
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @property
+    def total(self) -> float:
+        """Seconds spent in all phases"""
+        return sum(seconds for _, seconds in self.phases)
+
+    @property
+    def finished(self) -> bool:
+        """True once finish() has been called"""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for startup to finish.
+
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True if startup finished
+        """
+        return self._done.wait(timeout)
+
+    def finish(self) -> None:
+        """Log the report (a warning if over budget) and mark startup finished"""
+        summary = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phases)
+        if self.budget and self.total > self.budget:
+            logger.warning("Startup took %.3fs, over the %.1fs budget: %s", self.total, self.budget, summary)
+        else:
+            logger.info("Startup took %.3fs (budget %.1fs): %s", self.total, self.budget, summary)
+        if self.failed:
+            logger.warning("Startup phases failed (set up again on first use): %s", ", ".join(self.failed))
+        self._done.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Report for /health"""
+        return {
+            "finished": self.finished,
+            "seconds": round(self.total, 3),
+            "budget_seconds": self.budget,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases},
+            "failed": list(self.failed),
+        }
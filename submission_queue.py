@@ -0,0 +1,575 @@
+"""
+Durable local submission queue.
+
+Stores accepted webhook submissions in SQLite so they survive a restart, and
+drains them through LeadCreator.create_lead on a background worker pool.
+Also holds submissions spilled while an HCP circuit breaker is open; those
+(and any claimed while a circuit is still open) wait until it recovers.
+
+Failed submissions are retried with exponential backoff up to
+QUEUE_MAX_ATTEMPTS. If an attempt created the customer but not the lead, the
+customer ID is kept and the next attempt continues from there. Workers go
+through the shared HCP rate limiter, so the queue drains no faster than HCP
+allows.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+from config import Config
+from metrics import observe_queue_depth, observe_queue_outcome
+from logging_setup import get_request_id, log_context, new_request_id
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionStatus:
+    """Lifecycle states of a queued submission"""
+
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SubmissionQueue:
+    """SQLite-backed queue of form submissions awaiting lead creation"""
+
+    def __init__(self, db_path: Optional[str] = None, processing_timeout: Optional[float] = None):
+        """
+        Initialize submission queue.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to Config.QUEUE_DB_PATH)
+            processing_timeout: Seconds after which a submission stuck in
+                'processing' is handed back to the queue (defaults to
+                Config.QUEUE_PROCESSING_TIMEOUT)
+        """
+        self.db_path = db_path or Config.QUEUE_DB_PATH
+        self.processing_timeout = (
+            processing_timeout if processing_timeout is not None else Config.QUEUE_PROCESSING_TIMEOUT
+        )
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's database connection (one per thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly where needed
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode, NORMAL syncs at checkpoints rather than on every
+            # commit: committed rows survive a process crash, and fsyncs are batched
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        """Create the submissions table if it does not exist"""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                form_data TEXT NOT NULL,
+                idempotency_key TEXT,
+                customer_id TEXT,
+                request_id TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._ensure_column(conn, "idempotency_key", "TEXT")
+        self._ensure_column(conn, "customer_id", "TEXT")
+        self._ensure_column(conn, "request_id", "TEXT")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_submissions_ready "
+            "ON submissions (status, available_at)"
+        )
+
+    def _ensure_column(self, conn: sqlite3.Connection, name: str, definition: str) -> None:
+        """Add a column to a submissions table created by an older version"""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(submissions)")}
+        if name not in columns:
+            conn.execute(f"ALTER TABLE submissions ADD COLUMN {name} {definition}")
+
+    def enqueue(
+        self,
+        form_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        delay: float = 0.0,
+        customer_id: Optional[str] = None,
+        attempts: int = 0,
+        error: Optional[str] = None,
+        request_id: Optional[str] = None
+    ) -> str:
+        """
+        Add a parsed submission to the queue.
+
+        Args:
+            form_data: Parsed form data (output of parse_elfsight_payload)
+            idempotency_key: Optional client-supplied submission ID passed on to create_lead
+            delay: Seconds before the submission may be claimed
+            customer_id: Customer already created for this submission (see create_lead)
+            attempts: Attempts already made (for a submission that failed inline)
+            error: Error of the last attempt, if any
+            request_id: Correlation ID the workers log it under (defaults to
+                the ID of the request being handled)
+
+        Returns:
+            Submission ID
+        """
+        submission_id = uuid.uuid4().hex
+        now = time.time()
+
+        self._connect().execute(
+            "INSERT INTO submissions "
+            "(id, status, form_data, idempotency_key, customer_id, request_id, error, attempts, "
+            "available_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                submission_id,
+                SubmissionStatus.QUEUED,
+                json.dumps(form_data),
+                idempotency_key,
+                customer_id,
+                request_id or get_request_id(),
+                error,
+                attempts,
+                now + delay,
+                now,
+                now
+            )
+        )
+
+        if delay:
+            logger.info("Queued submission %s (available in %.0fs)", submission_id, delay)
+        else:
+            logger.info("Queued submission %s", submission_id)
+        return submission_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim the oldest ready submission for processing.
+
+        Returns:
+            Dictionary with 'id', 'form_data', 'idempotency_key', 'customer_id',
+            'request_id' and 'attempts' (including this one), or None if the
+            queue is empty
+        """
+        conn = self._connect()
+        now = time.time()
+
+        # BEGIN IMMEDIATE takes the write lock up front so two workers
+        # (or two processes) can never claim the same row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, form_data, idempotency_key, customer_id, request_id, attempts FROM submissions "
+                "WHERE status = ? AND available_at <= ? "
+                "ORDER BY available_at, created_at LIMIT 1",
+                (SubmissionStatus.QUEUED, now)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE submissions SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (SubmissionStatus.PROCESSING, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return {
+            "id": row["id"],
+            "form_data": json.loads(row["form_data"]),
+            "idempotency_key": row["idempotency_key"],
+            "customer_id": row["customer_id"],
+            "request_id": row["request_id"],
+            "attempts": row["attempts"] + 1
+        }
+
+    def complete(self, submission_id: str, result: Dict[str, Any]) -> None:
+        """
+        Mark submission as successfully processed.
+
+        Args:
+            submission_id: Submission ID
+            result: LeadCreationResult as dictionary
+        """
+        self._finish(submission_id, SubmissionStatus.SUCCEEDED, result, None)
+
+    def fail(self, submission_id: str, error: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark submission as failed.
+
+        Args:
+            submission_id: Submission ID
+            error: Error message
+            result: LeadCreationResult as dictionary, if one was produced
+        """
+        self._finish(submission_id, SubmissionStatus.FAILED, result, error)
+
+    def _finish(
+        self,
+        submission_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str]
+    ) -> None:
+        """Record the final state of a submission"""
+        self._connect().execute(
+            "UPDATE submissions SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (
+                status,
+                json.dumps(result) if result is not None else None,
+                error,
+                time.time(),
+                submission_id
+            )
+        )
+
+    def defer(self, submission_id: str, delay: float) -> None:
+        """
+        Hand a claimed submission back to the queue for later.
+
+        The claim does not count towards QUEUE_MAX_ATTEMPTS.
+
+        Args:
+            submission_id: Submission ID
+            delay: Seconds before it may be claimed again
+        """
+        now = time.time()
+        self._connect().execute(
+            "UPDATE submissions SET status = ?, available_at = ?, updated_at = ?, "
+            "attempts = MAX(attempts - 1, 0) WHERE id = ?",
+            (SubmissionStatus.QUEUED, now + delay, now, submission_id)
+        )
+        logger.info("Deferred submission %s for %.0fs", submission_id, delay)
+
+    def retry(
+        self,
+        submission_id: str,
+        error: str,
+        delay: float,
+        customer_id: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Hand a failed submission back to the queue for another attempt.
+
+        Args:
+            submission_id: Submission ID
+            error: Error of the failed attempt
+            delay: Seconds before it may be claimed again
+            customer_id: Customer the attempt created, to resume from (kept if None)
+            result: LeadCreationResult as dictionary, if one was produced
+        """
+        now = time.time()
+        self._connect().execute(
+            "UPDATE submissions SET status = ?, error = ?, result = ?, "
+            "customer_id = COALESCE(?, customer_id), available_at = ?, updated_at = ? WHERE id = ?",
+            (
+                SubmissionStatus.QUEUED,
+                error,
+                json.dumps(result) if result is not None else None,
+                customer_id,
+                now + delay,
+                now,
+                submission_id
+            )
+        )
+        logger.info("Submission %s will be retried in %.0fs", submission_id, delay)
+
+    def requeue_stale(self) -> int:
+        """
+        Hand submissions stuck in 'processing' back to the queue.
+
+        A submission stays in 'processing' if the worker that claimed it died
+        (e.g. the container was stopped mid-request).
+
+        Returns:
+            Number of submissions requeued
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE submissions SET status = ?, available_at = ?, updated_at = ? "
+            "WHERE status = ? AND updated_at < ?",
+            (SubmissionStatus.QUEUED, now, now, SubmissionStatus.PROCESSING, now - self.processing_timeout)
+        )
+
+        if cursor.rowcount:
+            logger.warning("Requeued %s stale submissions", cursor.rowcount)
+        return cursor.rowcount
+
+    def get_status(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the current state of a submission.
+
+        Args:
+            submission_id: Submission ID
+
+        Returns:
+            Status dictionary, or None if the submission is unknown
+        """
+        row = self._connect().execute(
+            "SELECT id, status, result, error, attempts, available_at, created_at, updated_at "
+            "FROM submissions WHERE id = ?",
+            (submission_id,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "submission_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "next_attempt_at": (
+                _format_timestamp(row["available_at"]) if row["status"] == SubmissionStatus.QUEUED else None
+            ),
+            "created_at": _format_timestamp(row["created_at"]),
+            "updated_at": _format_timestamp(row["updated_at"])
+        }
+
+    def depth(self) -> int:
+        """Number of submissions waiting to be processed"""
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM submissions WHERE status = ?",
+            (SubmissionStatus.QUEUED,)
+        ).fetchone()
+        return row[0]
+
+    def depth_by_state(self) -> Dict[str, int]:
+        """
+        Count unfinished submissions.
+
+        Returns:
+            Dictionary with 'ready' (queued and claimable now), 'delayed'
+            (queued for a retry or an HCP outage) and 'processing'
+        """
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT "
+            "COALESCE(SUM(status = ? AND available_at <= ?), 0), "
+            "COALESCE(SUM(status = ? AND available_at > ?), 0), "
+            "COALESCE(SUM(status = ?), 0) "
+            "FROM submissions WHERE status IN (?, ?)",
+            (
+                SubmissionStatus.QUEUED, now,
+                SubmissionStatus.QUEUED, now,
+                SubmissionStatus.PROCESSING,
+                SubmissionStatus.QUEUED, SubmissionStatus.PROCESSING
+            )
+        ).fetchone()
+        return {"ready": row[0], "delayed": row[1], "processing": row[2]}
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Backoff before the next attempt of a failed submission.
+
+    Args:
+        attempts: Attempts made so far
+
+    Returns:
+        Seconds: QUEUE_RETRY_BASE_DELAY doubled per attempt, capped at QUEUE_RETRY_MAX_DELAY
+    """
+    return min(Config.QUEUE_RETRY_MAX_DELAY, Config.QUEUE_RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+
+
+class SubmissionWorkerPool:
+    """Background threads that drain the submission queue through LeadCreator"""
+
+    def __init__(
+        self,
+        queue: SubmissionQueue,
+        lead_creator,
+        num_workers: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        """
+        Initialize worker pool.
+
+        Args:
+            queue: SubmissionQueue to drain
+            lead_creator: LeadCreator instance used to process submissions
+            num_workers: Number of worker threads (defaults to Config.QUEUE_WORKERS)
+            poll_interval: Seconds an idle worker waits before checking the
+                queue again (defaults to Config.QUEUE_POLL_INTERVAL)
+            max_attempts: Attempts before a failing submission is marked failed
+                (defaults to Config.QUEUE_MAX_ATTEMPTS; 1 if QUEUE_RETRY_FAILED is off)
+        """
+        self.queue = queue
+        self.lead_creator = lead_creator
+        self.num_workers = num_workers or Config.QUEUE_WORKERS
+        self.poll_interval = poll_interval if poll_interval is not None else Config.QUEUE_POLL_INTERVAL
+        if max_attempts is None:
+            max_attempts = Config.QUEUE_MAX_ATTEMPTS if Config.QUEUE_RETRY_FAILED else 1
+        self.max_attempts = max_attempts
+        self._depth_updated = 0.0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start worker threads"""
+        if self._threads:
+            return
+
+        self.queue.requeue_stale()
+        self._stopping.clear()
+
+        for index in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"submission-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info("Started %s submission workers", self.num_workers)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stop worker threads after their current submission.
+
+        Args:
+            timeout: Seconds to wait for each thread to finish
+        """
+        self._stopping.set()
+        self._wakeup.set()
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+        self._threads = []
+        logger.info("Stopped submission workers")
+
+    def notify(self) -> None:
+        """Wake idle workers after a new submission was queued"""
+        self._wakeup.set()
+
+    def _update_depth(self) -> None:
+        """Refresh the queue depth gauge (at most once per poll interval)"""
+        now = time.monotonic()
+        if now - self._depth_updated < self.poll_interval:
+            return
+        self._depth_updated = now
+        observe_queue_depth(self.queue.depth_by_state())
+
+    def _run(self) -> None:
+        """Worker loop: claim, process, repeat"""
+        while not self._stopping.is_set():
+            try:
+                self._update_depth()
+                item = self.queue.claim()
+            except sqlite3.Error as e:
+                logger.error("Error claiming submission: %s", e)
+                item = None
+
+            if item is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            # Log under the ID of the request that queued the submission
+            with log_context(request_id=item["request_id"] or new_request_id(), submission_id=item["id"]):
+                self._process(item)
+
+    def _process(self, item: Dict[str, Any]) -> None:
+        """
+        Run one submission through lead creation and record the outcome.
+
+        Args:
+            item: Claimed submission from SubmissionQueue.claim
+        """
+        submission_id = item["id"]
+        breakers = self.lead_creator.hcp_client.breakers
+
+        # Wait out an HCP outage instead of failing the submission
+        if breakers.open_groups():
+            self.queue.defer(submission_id, max(breakers.retry_in(), self.poll_interval))
+            observe_queue_outcome("deferred")
+            return
+
+        logger.info("Processing submission %s (attempt %s)", submission_id, item['attempts'])
+
+        try:
+            result = self.lead_creator.create_lead(item["form_data"], item["idempotency_key"], item["customer_id"])
+        except Exception as e:
+            logger.exception("Unexpected error processing submission %s: %s", submission_id, e)
+            self.queue.fail(submission_id, str(e))
+            observe_queue_outcome("failed")
+            return
+
+        if result.in_progress:
+            # Another delivery of the same submission is running; check back once it has finished
+            logger.info("Submission %s is being processed elsewhere; deferring", submission_id)
+            self.queue.defer(submission_id, self.poll_interval)
+            observe_queue_outcome("deferred")
+            return
+
+        if not result.success and not result.retryable:
+            # HCP rejected the submission itself; retrying would fail the same way
+            logger.error("Submission %s rejected by HCP, not retrying: %s", submission_id, result.error)
+            self.queue.fail(submission_id, result.error or "Unknown error", result.to_dict())
+            observe_queue_outcome("failed")
+            return
+
+        if not result.success and not breakers.all_closed():
+            logger.warning("Submission %s failed while HCP is unavailable: %s", submission_id, result.error)
+            self.queue.defer(submission_id, max(breakers.retry_in(), self.poll_interval))
+            observe_queue_outcome("deferred")
+            return
+
+        if result.success:
+            logger.info("Submission %s processed: customer=%s, job=%s", submission_id, result.customer_id, result.job_id)
+            self.queue.complete(submission_id, result.to_dict())
+            observe_queue_outcome("succeeded")
+
+        elif item["attempts"] < self.max_attempts:
+            delay = retry_delay(item["attempts"])
+            logger.warning(
+                "Submission %s failed (attempt %s/%s): %s; retrying in %.0fs",
+                submission_id, item["attempts"], self.max_attempts, result.error, delay
+            )
+            self.queue.retry(
+                submission_id,
+                result.error or "Unknown error",
+                delay,
+                customer_id=result.customer_id if result.customer_created else None,
+                result=result.to_dict()
+            )
+            observe_queue_outcome("retried")
+
+        else:
+            logger.error("Submission %s failed after %s attempts: %s", submission_id, item['attempts'], result.error)
+            self.queue.fail(submission_id, result.error or "Unknown error", result.to_dict())
+            observe_queue_outcome("failed")
+
+
+def _format_timestamp(timestamp: float) -> str:
+    """Format epoch seconds as an ISO 8601 UTC string"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
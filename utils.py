@@ -4,7 +4,8 @@ Utility functions for data normalization and parsing.
 
 import re
 import logging
-from typing import Optional, Dict, Tuple
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple, Any
 from difflib import SequenceMatcher
 
 logger = logging.getLogger(__name__)
@@ -50,10 +51,10 @@ def normalize_phone(phone: str, default_area_code: str = "415") -> Optional[str]
     elif len(digits) > 11:
         # Too many digits, try to extract last 10
         last_10 = digits[-10:]
-        logger.warning(f"Phone number too long ({len(digits)} digits), using last 10: {last_10}")
+        logger.warning("Phone number too long (%s digits), using last 10: %s", len(digits), last_10)
         return f"+1{last_10}"
     else:
-        logger.warning(f"Invalid phone number format: {phone} ({len(digits)} digits)")
+        logger.warning("Invalid phone number format: %s (%s digits)", phone, len(digits))
         return None
 
 
@@ -93,10 +94,51 @@ def parse_name(full_name: str) -> Tuple[str, str]:
         return " ".join(parts[:-1]), parts[-1]
 
 
+# USPS two-letter state and territory codes
+USPS_STATES = frozenset({
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL",
+    "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE",
+    "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD",
+    "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY", "AS", "GU", "MP", "PR", "VI",
+    "AA", "AE", "AP"
+})
+
+# Common USPS street suffixes (Publication 28), full and abbreviated, lowercase
+USPS_STREET_SUFFIXES = frozenset({
+    "alley", "aly", "avenue", "ave", "av", "boulevard", "blvd", "circle", "cir", "court",
+    "ct", "cove", "cv", "drive", "dr", "expressway", "expy", "freeway", "fwy", "highway",
+    "hwy", "lane", "ln", "loop", "parkway", "pkwy", "place", "pl", "plaza", "plz", "road",
+    "rd", "row", "square", "sq", "street", "st", "terrace", "ter", "trail", "trl", "way",
+    "wy"
+})
+
+# Words that start a unit designator rather than a city ("123 Main St Apt 4")
+_UNIT_DESIGNATORS = frozenset({"apt", "unit", "ste", "suite", "fl", "floor", "bldg", "rm", "room"})
+
+# Street directionals, which follow a suffix as part of the street ("500 Park Ave S")
+_DIRECTIONALS = frozenset({
+    "n", "s", "e", "w", "ne", "nw", "se", "sw", "north", "south", "east", "west",
+    "northeast", "northwest", "southeast", "southwest"
+})
+
+# Street, City, State Zip - e.g. "123 Main St, San Francisco, CA 94102"
+_ADDRESS_WITH_STATE_COMMA = re.compile(r'^(.+?),\s*(.+?),\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$')
+# Street, City State Zip (no comma before state) - e.g. "123 Main St, San Francisco CA 94102"
+_ADDRESS_WITHOUT_STATE_COMMA = re.compile(r'^(.+?),\s*(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$')
+_ZIP_SEARCH = re.compile(r'\b(\d{5}(?:-\d{4})?)\b')
+_ZIP_TOKEN = re.compile(r'\d{5}(?:-\d{4})?')
+_STATE_AT_END = re.compile(r'\b([A-Z]{2})\s*$')
+_WORD = re.compile(r'\S+')
+
+ADDRESS_CACHE_SIZE = 4096
+
+
 def parse_address(address_string: str) -> Dict[str, Optional[str]]:
     """
     Parse address string into components.
 
+    Repeated strings are answered from an LRU memo; each call gets its own dict.
+
     Args:
         address_string: Full address string
 
@@ -109,66 +151,190 @@ def parse_address(address_string: str) -> Dict[str, Optional[str]]:
         >>> parse_address("456 Oak Ave, Oakland CA 94601")
         {'street': '456 Oak Ave', 'city': 'Oakland', 'state': 'CA', 'zip': '94601'}
     """
-    result: Dict[str, Optional[str]] = {
-        "street": None,
-        "city": None,
-        "state": None,
-        "zip": None
-    }
-
     if not address_string:
-        return result
+        return {"street": None, "city": None, "state": None, "zip": None}
+
+    street, city, state, zip_code = _parse_address_cached(address_string.strip())
+    return {"street": street, "city": city, "state": state, "zip": zip_code}
+
+
+def parse_addresses(address_strings: List[str]) -> List[Dict[str, Optional[str]]]:
+    """
+    Parse many address strings (e.g. a backfill or sync batch).
+
+    Duplicate strings within the batch are parsed once.
+
+    Args:
+        address_strings: Address strings
+
+    Returns:
+        Parsed address dictionaries, in input order
+    """
+    parsed: Dict[str, Tuple[Optional[str], ...]] = {}
+    results = []
+
+    for address_string in address_strings:
+        if not address_string:
+            results.append({"street": None, "city": None, "state": None, "zip": None})
+            continue
+
+        key = address_string.strip()
+        fields = parsed.get(key)
+        if fields is None:
+            fields = parsed[key] = _parse_address_cached(key)
+
+        street, city, state, zip_code = fields
+        results.append({"street": street, "city": city, "state": state, "zip": zip_code})
+
+    return results
 
-    address_string = address_string.strip()
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _parse_address_cached(address_string: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Parse a stripped address string into (street, city, state, zip)"""
+    fields = _parse_common_format(address_string)
+    if fields is not None:
+        return fields
 
     # Pattern 1: Street, City, State Zip
-    # Example: "123 Main St, San Francisco, CA 94102"
-    pattern1 = r'^(.+?),\s*(.+?),\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$'
-    match = re.match(pattern1, address_string)
-    if match:
-        result["street"] = match.group(1).strip()
-        result["city"] = match.group(2).strip()
-        result["state"] = match.group(3).strip()
-        result["zip"] = match.group(4).strip()
-        return result
-
-    # Pattern 2: Street, City State Zip (no comma before state)
-    # Example: "123 Main St, San Francisco CA 94102"
-    pattern2 = r'^(.+?),\s*(.+?)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)$'
-    match = re.match(pattern2, address_string)
+    match = _ADDRESS_WITH_STATE_COMMA.match(address_string)
+    if match is None:
+        # Pattern 2: Street, City State Zip
+        match = _ADDRESS_WITHOUT_STATE_COMMA.match(address_string)
     if match:
-        result["street"] = match.group(1).strip()
-        result["city"] = match.group(2).strip()
-        result["state"] = match.group(3).strip()
-        result["zip"] = match.group(4).strip()
-        return result
+        return (
+            match.group(1).strip(),
+            match.group(2).strip(),
+            match.group(3).strip(),
+            match.group(4).strip()
+        )
 
     # Pattern 3: Try to extract zip code and work backwards
-    zip_match = re.search(r'\b(\d{5}(?:-\d{4})?)\b', address_string)
+    street = city = state = zip_code = None
+    zip_match = _ZIP_SEARCH.search(address_string)
     if zip_match:
-        result["zip"] = zip_match.group(1)
+        zip_code = zip_match.group(1)
         before_zip = address_string[:zip_match.start()].strip()
 
         # Try to find state (2 capital letters before zip)
-        state_match = re.search(r'\b([A-Z]{2})\s*$', before_zip)
+        state_match = _STATE_AT_END.search(before_zip)
         if state_match:
-            result["state"] = state_match.group(1)
+            state = state_match.group(1)
             before_state = before_zip[:state_match.start()].strip()
 
             # Split remaining by comma
             parts = [p.strip() for p in before_state.split(',')]
             if len(parts) >= 2:
-                result["street"] = parts[0]
-                result["city"] = parts[1]
-            elif len(parts) == 1:
-                # Ambiguous: could be street or city
-                result["street"] = parts[0]
+                street, city = parts[0], parts[1]
+            else:
+                # No comma between street and city: split after the street suffix
+                street, city = _split_street_and_city(parts[0])
 
     # If we couldn't parse it, put everything in street
-    if not any(result.values()):
-        result["street"] = address_string
+    if not any((street, city, state, zip_code)):
+        street = address_string
 
-    return result
+    return street, city, state, zip_code
+
+
+def _parse_common_format(address_string: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Tokenizer fast path for "Street, City, ST Zip" and "Street, City ST Zip".
+
+    Only accepts input where the result is exactly what patterns 1 and 2
+    would produce; returns None so the caller falls back to them otherwise.
+    """
+    if "\n" in address_string or not address_string.isascii():
+        return None
+
+    tokens = address_string.rsplit(None, 2)
+    if len(tokens) != 3:
+        return None
+
+    head, state, zip_code = tokens
+    if state not in USPS_STATES or not _ZIP_TOKEN.fullmatch(zip_code):
+        return None
+
+    if head.endswith(","):
+        # Pattern 1: comma before the state
+        street, comma, city = head[:-1].partition(",")
+    else:
+        # Pattern 2: no comma before the state
+        street, comma, city = head.partition(",")
+
+    if not comma or not street or not city:
+        return None
+
+    return street.strip(), city.strip(), state, zip_code
+
+
+def _split_street_and_city(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Split "123 Main St San Francisco" after the last street suffix.
+
+    Returns the text unchanged as the street when there is no suffix
+    followed by a city-like word (e.g. "123 Main St Apt 4"), or when the
+    suffix word may be part of the street name: the rest ends in a suffix
+    ("100 Court St", "12 St James Pl") or starts with a directional or
+    another suffix ("500 Park Ave S New York").
+    """
+    spans = list(_WORD.finditer(text))
+    words = [span.group().lower().rstrip(".") for span in spans]
+    if words and words[-1] in USPS_STREET_SUFFIXES:
+        return text, None
+
+    for index in range(len(words) - 2, 0, -1):
+        if words[index] in USPS_STREET_SUFFIXES:
+            next_word = spans[index + 1].group()
+            if (
+                not next_word.isalpha()
+                or words[index + 1] in _UNIT_DESIGNATORS
+                or words[index + 1] in _DIRECTIONALS
+                or words[index + 1] in USPS_STREET_SUFFIXES
+            ):
+                break
+            return text[:spans[index].end()], text[spans[index + 1].start():]
+    return text, None
+
+
+# Field order of normalized address keys, and each field's weight in the similarity score
+ADDRESS_FIELDS = ("street", "city", "state", "zip")
+_ADDRESS_WEIGHTS = (0.3, 0.2, 0.1, 0.4)  # zip is most important, then street
+_ADDRESS_WEIGHT_TOTAL = 0.4 + 0.3 + 0.2 + 0.1
+
+AddressKey = Tuple[str, str, str, str]
+_EMPTY_ADDRESS_KEY: AddressKey = ("", "", "", "")
+
+
+def address_key(address: Optional[Dict[str, Any]]) -> AddressKey:
+    """
+    Normalize an address (parsed or from the HCP API) for comparison.
+
+    Args:
+        address: Address dictionary with street, city, state and zip
+
+    Returns:
+        Tuple of lowercased, stripped (street, city, state, zip)
+    """
+    if not address:
+        return _EMPTY_ADDRESS_KEY
+    return _normalize_address_fields(
+        address.get("street"),
+        address.get("city"),
+        address.get("state"),
+        address.get("zip")
+    )
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize_address_fields(street: Any, city: Any, state: Any, zip_code: Any) -> AddressKey:
+    """Lowercase and strip each address field (memoized; HCP addresses are compared repeatedly)"""
+    return (
+        (street or "").lower().strip(),
+        (city or "").lower().strip(),
+        (state or "").lower().strip(),
+        (zip_code or "").lower().strip()
+    )
 
 
 def compare_addresses(addr1: Dict[str, Optional[str]], addr2: Dict[str, Optional[str]]) -> float:
@@ -182,51 +348,63 @@ def compare_addresses(addr1: Dict[str, Optional[str]], addr2: Dict[str, Optional
     Returns:
         Similarity score between 0 and 1
     """
-    if not addr1 or not addr2:
-        return 0.0
+    # addr1 stays SequenceMatcher's first sequence, as it always has been
+    return compare_address_to_candidates(addr2, [addr1])[0]
+
+
+def compare_address_to_candidates(
+    address: Optional[Dict[str, Optional[str]]],
+    candidates: List[Dict[str, Any]]
+) -> List[float]:
+    """
+    Compare one address against several candidate addresses.
+
+    The address is normalized once and each field similarity is computed
+    once per candidate. Street and zip both matching exactly scores 1.0
+    without looking at city or state.
+
+    Args:
+        address: Address to compare
+        candidates: Candidate addresses (parsed or from the HCP API)
+
+    Returns:
+        Similarity score between 0 and 1 for each candidate, in order
+    """
+    key = address_key(address)
+    if key == _EMPTY_ADDRESS_KEY:
+        return [0.0] * len(candidates)
 
+    # One matcher per field with the address as the fixed second sequence,
+    # so SequenceMatcher indexes it only once
+    matchers: List[Optional[SequenceMatcher]] = [None] * len(ADDRESS_FIELDS)
     scores = []
 
-    # Compare each field
-    for field in ["street", "city", "state", "zip"]:
-        val1 = (addr1.get(field) or "").lower().strip()
-        val2 = (addr2.get(field) or "").lower().strip()
+    for candidate in candidates:
+        candidate_key = address_key(candidate)
 
-        if not val1 or not val2:
+        if key[0] and key[3] and key[0] == candidate_key[0] and key[3] == candidate_key[3]:
+            scores.append(1.0)
             continue
 
-        if val1 == val2:
-            scores.append(1.0)
-        else:
-            # Use sequence matcher for fuzzy comparison
-            similarity = SequenceMatcher(None, val1, val2).ratio()
-            scores.append(similarity)
-
-    if not scores:
-        return 0.0
-
-    # Weighted average: zip is most important, then street
-    weights = {
-        "zip": 0.4,
-        "street": 0.3,
-        "city": 0.2,
-        "state": 0.1
-    }
-
-    weighted_scores = []
-    field_index = 0
-    for field in ["street", "city", "state", "zip"]:
-        val1 = (addr1.get(field) or "").lower().strip()
-        val2 = (addr2.get(field) or "").lower().strip()
-        if val1 and val2:
-            similarity = SequenceMatcher(None, val1, val2).ratio()
-            weighted_scores.append(similarity * weights[field])
-            field_index += 1
-
-    if not weighted_scores:
-        return 0.0
-
-    return sum(weighted_scores) / sum(weights.values())
+        score = 0.0
+        for index, weight in enumerate(_ADDRESS_WEIGHTS):
+            value, candidate_value = key[index], candidate_key[index]
+            if not value or not candidate_value:
+                continue
+
+            if value == candidate_value:
+                score += weight
+            else:
+                matcher = matchers[index]
+                if matcher is None:
+                    matcher = matchers[index] = SequenceMatcher(None)
+                    matcher.set_seq2(value)
+                matcher.set_seq1(candidate_value)
+                score += matcher.ratio() * weight
+
+        scores.append(score / _ADDRESS_WEIGHT_TOTAL)
+
+    return scores
 
 
 def sanitize_string(s: Optional[str]) -> str: